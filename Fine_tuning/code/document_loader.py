@@ -0,0 +1,226 @@
+# Text extraction shared by the RAG index and the fine-tuning data pipeline
+
+import csv
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".docx", ".doc", ".csv")
+# Extracted text per file content hash, so repeated runs and both pipelines skip re-parsing
+TEXT_CACHE_DIR = os.getenv(
+    "DOCUMENT_TEXT_CACHE", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "document_text_cache")
+)
+LOADER_WORKERS = int(os.getenv("DOCUMENT_LOADER_WORKERS", str(min(8, os.cpu_count() or 1))))
+# CSV files are streamed in chunks of this many rows instead of parsed and cached whole
+CSV_CHUNK_ROWS = int(os.getenv("DOCUMENT_CSV_CHUNK_ROWS", "1000"))
+# Column holding each row's text; the other columns become metadata (e.g. Category).
+# CSVs without it get LangChain CSVLoader's "column: value" text.
+CSV_TEXT_COLUMN = os.getenv("DOCUMENT_CSV_TEXT_COLUMN", "Resume")
+# Bump when extraction changes, so cached text from the old extractors is ignored
+EXTRACTOR_VERSION = 1
+
+
+class DocumentLoadError(Exception):
+    pass
+
+
+def file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_documents(folder_path):
+    """Content hash of every supported file in the folder."""
+    return {
+        filename: file_hash(os.path.join(folder_path, filename))
+        for filename in sorted(os.listdir(folder_path))
+        if filename.lower().endswith(SUPPORTED_EXTENSIONS)
+    }
+
+
+# Extractors return a list of records: {"text": ..., "metadata": {...}}
+def _pdf_records(file_path):
+    from pypdf import PdfReader
+
+    # extract_text() gives None or "" for image-only pages; those are skipped, not concatenated
+    return [
+        {"text": text, "metadata": {"page": number}}
+        for number, text in enumerate(page.extract_text() or "" for page in PdfReader(file_path).pages)
+        if text.strip()
+    ]
+
+
+def _docx_records(file_path):
+    import docx2txt
+
+    return [{"text": docx2txt.process(file_path) or "", "metadata": {}}]
+
+
+def _doc_records(file_path):
+    """Legacy Word files, through antiword or a headless LibreOffice conversion."""
+    if shutil.which("antiword"):
+        result = subprocess.run(["antiword", file_path], capture_output=True, text=True, check=True)
+        return [{"text": result.stdout, "metadata": {}}]
+    office = shutil.which("soffice") or shutil.which("libreoffice")
+    if office:
+        with tempfile.TemporaryDirectory() as out_dir:
+            subprocess.run([office, "--headless", "--convert-to", "txt:Text", "--outdir", out_dir, file_path],
+                           capture_output=True, check=True)
+            txt_path = os.path.join(out_dir, os.path.splitext(os.path.basename(file_path))[0] + ".txt")
+            with open(txt_path, "r", encoding="utf-8", errors="replace") as f:
+                return [{"text": f.read(), "metadata": {}}]
+    raise DocumentLoadError("reading .doc files needs antiword or LibreOffice installed")
+
+
+def _txt_records(file_path):
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        return [{"text": f.read(), "metadata": {}}]
+
+
+def _csv_record(row, number):
+    if CSV_TEXT_COLUMN in row:
+        metadata = {k: (v or "").strip() for k, v in row.items() if k and k != CSV_TEXT_COLUMN}
+        return {"text": (row[CSV_TEXT_COLUMN] or "").strip(), "metadata": {"row": number, **metadata}}
+    return {"text": "\n".join(f"{k.strip()}: {(v or '').strip()}" for k, v in row.items() if k), "metadata": {"row": number}}
+
+
+def iter_csv_records(file_path, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    One record per row, yielded in lists of ``chunk_rows``; only one chunk is
+    in memory at a time, however large the file. Prints rows/sec when done.
+    """
+    # Resume cells are longer than the csv module's default 128 KB field limit allows
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    start, rows, chunk = time.perf_counter(), 0, []
+    with open(file_path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        for row in csv.DictReader(f):
+            record = _csv_record(row, rows)
+            rows += 1
+            if record["text"]:
+                chunk.append(record)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+    seconds = time.perf_counter() - start
+    print(f"📄 {os.path.basename(file_path)}: {rows} rows in {seconds:.1f}s ({rows / max(seconds, 1e-9):.0f} rows/s)")
+
+
+EXTRACTORS = {
+    ".pdf": _pdf_records,
+    ".docx": _docx_records,
+    ".doc": _doc_records,
+    ".txt": _txt_records,
+}
+
+
+def extract_records(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".csv":
+        return [record for chunk in iter_csv_records(file_path) for record in chunk]
+    if extension not in EXTRACTORS:
+        return []
+    return EXTRACTORS[extension](file_path)
+
+
+def _extract_safely(file_path):
+    # Runs in a worker process; errors come back as values so one bad file does not stop the rest
+    try:
+        return extract_records(file_path), None
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
+
+def _cache_path(cache_dir, digest):
+    return os.path.join(cache_dir, f"{digest}.v{EXTRACTOR_VERSION}.json")
+
+
+def _read_cache(cache_dir, digest):
+    if not cache_dir:
+        return None
+    try:
+        with open(_cache_path(cache_dir, digest), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache_dir, digest, records):
+    if not cache_dir:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, digest)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(records, f)
+    os.replace(path + ".tmp", path)
+
+
+def iter_documents(folder_path, files=None, workers=LOADER_WORKERS, cache_dir=TEXT_CACHE_DIR):
+    """
+    Yield ``(filename, digest, records)`` for each file as soon as its text is
+    available: cached files first, then parsed files in completion order,
+    then CSV files, which are streamed as several chunks of rows each.
+    ``files`` maps filename to content hash (as returned by
+    ``scan_documents``) and defaults to every supported file in the folder.
+    Files that fail to parse are logged and skipped.
+    """
+    if files is None:
+        files = scan_documents(folder_path)
+    csv_files = {name: digest for name, digest in files.items() if name.lower().endswith(".csv")}
+    files = {name: digest for name, digest in files.items() if name not in csv_files}
+
+    def with_source(filename, records):
+        source = os.path.join(folder_path, filename)
+        return [{"text": r["text"], "metadata": {"source": source, **r["metadata"]}} for r in records]
+
+    misses = []
+    for filename, digest in files.items():
+        records = _read_cache(cache_dir, digest)
+        if records is None:
+            misses.append(filename)
+        else:
+            yield filename, digest, with_source(filename, records)
+
+    def finish(filename, records, error):
+        if error:
+            logging.warning(f"⚠ Could not extract text from {filename}: {error}")
+            return None
+        _write_cache(cache_dir, files[filename], records)
+        return filename, files[filename], with_source(filename, records)
+
+    if workers <= 1 or len(misses) <= 1:
+        for filename in misses:
+            result = finish(filename, *_extract_safely(os.path.join(folder_path, filename)))
+            if result:
+                yield result
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(misses))) as pool:
+            futures = {pool.submit(_extract_safely, os.path.join(folder_path, name)): name for name in misses}
+            for future in as_completed(futures):
+                result = finish(futures[future], *future.result())
+                if result:
+                    yield result
+
+    # The CSV is its own text store already; caching a copy would only double the disk and memory use
+    for filename, digest in csv_files.items():
+        try:
+            for chunk in iter_csv_records(os.path.join(folder_path, filename)):
+                yield filename, digest, with_source(filename, chunk)
+        except (OSError, csv.Error) as e:
+            logging.warning(f"⚠ Could not read {filename}: {e}")
+
+
+def document_text(records):
+    """All text of one file as a single string."""
+    return "\n".join(record["text"] for record in records)
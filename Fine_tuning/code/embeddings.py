@@ -0,0 +1,82 @@
+# Embedding backends for the RAG index
+
+import os
+
+from langchain.embeddings.base import Embeddings
+
+# "sentence-transformers" (small dedicated model, batched on CPU) or "ollama" (the old mistral setup)
+EMBEDDING_BACKEND = os.getenv("RAG_EMBEDDING_BACKEND", "sentence-transformers")
+DEFAULT_MODELS = {"sentence-transformers": "sentence-transformers/all-MiniLM-L6-v2", "ollama": "mistral"}
+EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL") or DEFAULT_MODELS.get(EMBEDDING_BACKEND)
+EMBEDDING_BATCH_SIZE = int(os.getenv("RAG_EMBEDDING_BATCH_SIZE", "64"))
+# Worker processes for very large batches; 1 keeps encoding in this process (still multi-threaded)
+EMBEDDING_PROCESSES = int(os.getenv("RAG_EMBEDDING_PROCESSES", "1"))
+# On-disk cache of chunk vectors, keyed by model and chunk text hash
+EMBEDDING_CACHE_DIR = os.getenv("RAG_EMBEDDING_CACHE", "embedding_cache")
+
+# Below this many texts a process pool costs more than it saves
+MULTI_PROCESS_MIN_TEXTS = 2000
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """
+    LangChain embeddings backed by a sentence-transformers model, encoding
+    whole batches at a time and returning unit-length vectors.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL, batch_size=EMBEDDING_BATCH_SIZE, processes=EMBEDDING_PROCESSES):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.batch_size = batch_size
+        self.processes = processes
+        self.pool = None
+
+    def embed_documents(self, texts):
+        if self.processes > 1 and len(texts) >= MULTI_PROCESS_MIN_TEXTS:
+            if self.pool is None:
+                self.pool = self.model.start_multi_process_pool(["cpu"] * self.processes)
+            vectors = self.model.encode_multi_process(
+                texts, self.pool, batch_size=self.batch_size, normalize_embeddings=True
+            )
+        else:
+            vectors = self.model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True)
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.model.encode(text, normalize_embeddings=True).tolist()
+
+
+def _model_for(backend, model_name):
+    if model_name:
+        return model_name
+    return EMBEDDING_MODEL if backend == EMBEDDING_BACKEND else DEFAULT_MODELS[backend]
+
+
+def get_embeddings(backend=EMBEDDING_BACKEND, model_name=None, cache_dir=EMBEDDING_CACHE_DIR):
+    """The configured embedding model, wrapped in an on-disk cache unless ``cache_dir`` is empty."""
+    model_name = _model_for(backend, model_name)
+    if backend == "ollama":
+        from langchain.embeddings import OllamaEmbeddings
+
+        embeddings = OllamaEmbeddings(model=model_name)
+    elif backend == "sentence-transformers":
+        embeddings = SentenceTransformerEmbeddings(model_name)
+    else:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    if not cache_dir:
+        return embeddings
+    from langchain.embeddings import CacheBackedEmbeddings
+    from langchain.storage import LocalFileStore
+
+    # Keys are a hash of the chunk text inside a per-model namespace, so
+    # switching models never returns stale vectors.
+    return CacheBackedEmbeddings.from_bytes_store(
+        embeddings, LocalFileStore(cache_dir), namespace=embedding_signature(backend, model_name).replace("/", "_").replace(":", "_")
+    )
+
+
+def embedding_signature(backend=EMBEDDING_BACKEND, model_name=None):
+    """Identifies the vector space; an index built with another signature has to be rebuilt."""
+    return f"{backend}:{_model_for(backend, model_name)}"
@@ -0,0 +1,108 @@
+"""
+Merge the trained LoRA adapter into its base model and export a CPU-servable
+matcher for ``linkedin_auto_apply/local_matcher.py``.
+
+With a llama.cpp checkout (``LLAMA_CPP_DIR``) the merged model is converted
+to a quantized GGUF (q8_0 directly, other types through ``llama-quantize``);
+without one the merged Hugging Face model is exported in float16 and
+quantized to int8 when the matcher loads it. Either way ``matcher.json``
+describes what to load.
+
+    python code/export_matcher.py --adapter finetuned_model --output ../matcher_model --quantization q4_k_m
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+LLAMA_CPP_DIR = os.getenv("LLAMA_CPP_DIR", "")
+MANIFEST_FILE = "matcher.json"  # read by linkedin_auto_apply/local_matcher.py
+
+
+def merge_adapter(adapter_dir, merged_dir, base_model=None):
+    """Fold the LoRA weights into the base model; returns the base model id."""
+    import torch
+    from peft import PeftConfig, PeftModel
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    base_model = base_model or PeftConfig.from_pretrained(adapter_dir).base_model_name_or_path
+    model = AutoModelForCausalLM.from_pretrained(base_model, torch_dtype=torch.float32)
+    model = PeftModel.from_pretrained(model, adapter_dir).merge_and_unload()
+    model.to(torch.float16).save_pretrained(merged_dir, safe_serialization=True)
+    tokenizer_source = adapter_dir if os.path.exists(os.path.join(adapter_dir, "tokenizer_config.json")) else base_model
+    AutoTokenizer.from_pretrained(tokenizer_source).save_pretrained(merged_dir)
+    return base_model
+
+
+def _llama_quantize_binary():
+    candidates = [os.path.join(LLAMA_CPP_DIR, "build", "bin", "llama-quantize"), os.path.join(LLAMA_CPP_DIR, "llama-quantize")]
+    return next((path for path in candidates if os.path.isfile(path)), None) or shutil.which("llama-quantize")
+
+
+def convert_to_gguf(merged_dir, output_path, quantization):
+    """Quantized GGUF of the merged model, or None when llama.cpp is not available."""
+    script = os.path.join(LLAMA_CPP_DIR, "convert_hf_to_gguf.py") if LLAMA_CPP_DIR else ""
+    if not os.path.isfile(script):
+        return None
+    direct = quantization in ("q8_0", "f16")
+    convert_to = output_path if direct else output_path + ".f16.gguf"
+    subprocess.run([sys.executable, script, merged_dir, "--outfile", convert_to, "--outtype", quantization if direct else "f16"],
+                   check=True)
+    if direct:
+        return output_path
+    binary = _llama_quantize_binary()
+    if binary is None:
+        os.remove(convert_to)
+        return None
+    subprocess.run([binary, convert_to, output_path, quantization.upper()], check=True)
+    os.remove(convert_to)
+    return output_path
+
+
+def export_matcher(adapter_dir, output_dir, quantization="q8_0", base_model=None, keep_merged=False):
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    merged_dir = os.path.join(output_dir, "merged")
+    base_model = merge_adapter(adapter_dir, merged_dir, base_model)
+    print(f"Merged adapter into {base_model} in {time.perf_counter() - start:.1f}s")
+
+    gguf_path = convert_to_gguf(merged_dir, os.path.join(output_dir, f"matcher-{quantization}.gguf"), quantization)
+    if gguf_path:
+        manifest = {"format": "gguf", "model": os.path.basename(gguf_path), "quantization": quantization}
+        if not keep_merged:
+            shutil.rmtree(merged_dir)
+    else:
+        print("llama.cpp not found (set LLAMA_CPP_DIR); exporting the merged model for int8 quantization at load time.")
+        manifest = {"format": "transformers", "model": "merged", "quantization": "int8-dynamic"}
+    manifest.update({
+        "base_model": base_model,
+        "adapter": os.path.abspath(adapter_dir),
+        # training_data.format_prompt ends an instruction-only example with one newline
+        "prompt_suffix": "\n",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(output_dir) for name in names)
+    print(f"✅ Matcher exported to {output_dir} ({manifest['format']}, {manifest['quantization']}, {size / 1e6:.0f} MB) "
+          f"in {time.perf_counter() - start:.1f}s. Use it with MATCH_LOCAL_MODEL={os.path.abspath(output_dir)}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the LoRA adapter and export a CPU matcher.")
+    parser.add_argument("--adapter", default="./finetuned_model/")
+    parser.add_argument("--output", default="../matcher_model")
+    parser.add_argument("--base-model", help="Defaults to the base model recorded in the adapter config.")
+    parser.add_argument("--quantization", default="q8_0", help="GGUF type: q8_0, f16, q4_k_m, q5_k_m, ...")
+    parser.add_argument("--keep-merged", action="store_true", help="Keep the merged HF model next to the GGUF.")
+    args = parser.parse_args()
+    export_matcher(args.adapter, args.output, args.quantization, args.base_model, args.keep_merged)
+
+
+if __name__ == "__main__":
+    main()
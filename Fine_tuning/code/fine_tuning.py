@@ -1,39 +1,47 @@
 # import necessary modules
 #RAG
-from langchain.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader, CSVLoader
+from langchain.docstore.document import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.embeddings import OllamaEmbeddings
-from langchain.vectorstores import FAISS
 from langchain.llms import Ollama
-from langchain.chains import RetrievalQA
 
+import json
 import os
-import pickle
+import shutil
+import time
+
+from document_loader import iter_documents, scan_documents, file_hash, SUPPORTED_EXTENSIONS
+from retrieval import HybridRetriever, CachedQA
+from embeddings import get_embeddings, embedding_signature
+from vector_index import (
+    new_store, load_store, is_mappable, supports_removal, index_size_bytes, INDEX_TYPE, INDEX_PRECISION, INDEX_MMAP,
+    TRAIN_SAMPLE_SIZE,
+)
 
 # Define paths
 VECTORSTORE_DIR = "faiss_store"
 DOCUMENTS_DIR = "documents"
+# Saved next to the index: per-file content hash and the ids of its chunks
+MANIFEST_FILE = "manifest.json"
+# Chunks embedded and added to the index per call
+INDEX_BATCH_SIZE = 4096
+
+# 1. Load Documents (parsed in a process pool by document_loader, text cached by file hash)
+def to_documents(records):
+    return [Document(page_content=record["text"], metadata=record["metadata"]) for record in records]
+
+def load_file(file_path):
+    folder_path, filename = os.path.split(file_path)
+    if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        return []  # Skip unsupported files
+    documents = []
+    for _, _, records in iter_documents(folder_path, {filename: file_hash(file_path)}, workers=1):
+        documents.extend(to_documents(records))
+    return documents
 
-# 1. Load Documents
 def load_documents(folder_path):
     all_docs = []
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
-        
-        if filename.endswith(".pdf"):
-            loader = PyPDFLoader(file_path)
-        elif filename.endswith(".txt"):
-            loader = TextLoader(file_path)
-        elif filename.endswith(".docx"):
-            loader = Docx2txtLoader(file_path)
-        elif filename.endswith(".csv"):
-            loader = CSVLoader(file_path)
-        else:
-            continue  # Skip unsupported files
-        
-        documents = loader.load()
-        all_docs.extend(documents)
-    
+    for _, _, records in iter_documents(folder_path):
+        all_docs.extend(to_documents(records))
     return all_docs
 
 # 2. Split documents into small chunks
@@ -45,42 +53,139 @@ def split_documents(documents):
     chunks = splitter.split_documents(documents)
     return chunks
 
-# 3. Create Embeddings and FAISS Vector Store
-def create_or_load_faiss_vector_store():
-    # Check if FAISS index already exists
+# 3. Create Embeddings and FAISS Vector Store, kept in sync with DOCUMENTS_DIR
+def chunk_file(filename, digest, records, first=0):
+    """
+    Chunks of one file (or of one batch of its CSV rows) with ids derived from
+    its name and content hash; ``first`` numbers them after earlier batches.
+    """
+    chunks = split_documents(to_documents(records))
+    ids = [f"{filename}#{digest[:16]}#{i}" for i in range(first, first + len(chunks))]
+    return chunks, ids
+
+def load_manifest():
+    path = os.path.join(VECTORSTORE_DIR, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_vector_store(vector_store, manifest):
+    """
+    Write index and manifest to a temporary directory, then swap it in, so an
+    interrupted save never leaves an index that disagrees with its manifest.
+    """
+    tmp_dir, old_dir = VECTORSTORE_DIR + ".tmp", VECTORSTORE_DIR + ".old"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    vector_store.save_local(tmp_dir)
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    shutil.rmtree(old_dir, ignore_errors=True)
     if os.path.exists(VECTORSTORE_DIR):
-        print("FAISS vector store already exists. Loading it...")
-        embedding_model = OllamaEmbeddings(model="mistral")
-        vector_store = FAISS.load_local(VECTORSTORE_DIR, embedding_model)
+        os.replace(VECTORSTORE_DIR, old_dir)
+    os.replace(tmp_dir, VECTORSTORE_DIR)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+def create_or_load_faiss_vector_store():
+    """
+    Load the saved index and bring it up to date with DOCUMENTS_DIR: only
+    added or changed files are embedded, vectors of removed or changed files
+    are deleted, and the index is saved only when something changed. An
+    index with nothing to update is memory-mapped rather than read into RAM.
+    """
+    start = time.perf_counter()
+    embedding_model = get_embeddings()
+    signature = {"embedding": embedding_signature(), "index_type": INDEX_TYPE, "precision": INDEX_PRECISION}
+
+    # A crash between the two renames of save_vector_store leaves only the old copy
+    if not os.path.exists(VECTORSTORE_DIR) and os.path.exists(VECTORSTORE_DIR + ".old"):
+        os.replace(VECTORSTORE_DIR + ".old", VECTORSTORE_DIR)
+
+    saved = load_manifest() if os.path.exists(VECTORSTORE_DIR) else None
+    compatible = saved is not None and "files" in saved and saved.get("index") == signature
+    manifest = saved["files"] if compatible else {}
+
+    current = scan_documents(DOCUMENTS_DIR)
+    removed = [name for name in manifest if name not in current]
+    changed = [name for name in manifest if name in current and manifest[name]["hash"] != current[name]]
+    added = [name for name in current if name not in manifest]
+
+    if compatible and not (added or changed or removed):
+        vector_store = load_store(VECTORSTORE_DIR, embedding_model, mmap=INDEX_MMAP)
+        mapped = INDEX_MMAP and is_mappable(os.path.join(VECTORSTORE_DIR, "index.faiss"))
+        print(f"FAISS vector store is up to date ({vector_store.index.ntotal} vectors, "
+              f"loaded in {time.perf_counter() - start:.2f}s{', IVF lists memory-mapped' if mapped else ''}).")
+        return vector_store
+
+    vector_store = None
+    if compatible:
+        print("FAISS vector store found. Updating it for changed documents...")
+        vector_store = load_store(VECTORSTORE_DIR, embedding_model, mmap=False)
+        if (removed or changed) and not supports_removal(vector_store.index):
+            # Re-adding everything only rebuilds the graph; the vectors come from the embedding cache
+            print("The index cannot delete vectors. Rebuilding it from cached embeddings...")
+            vector_store, manifest, changed, added = None, {}, [], list(current)
+    elif os.path.exists(VECTORSTORE_DIR):
+        print(f"FAISS vector store was built with other settings or an older version. Rebuilding it for {signature}...")
     else:
         print("No existing vector store found. Creating new one...")
-        documents = load_documents(DOCUMENTS_DIR)
-        print(f"Loaded {len(documents)} documents.")
-        
-        chunks = split_documents(documents)
-        print(f"Created {len(chunks)} chunks.")
-        
-        embedding_model = OllamaEmbeddings(model="mistral")
-        vector_store = FAISS.from_documents(chunks, embedding_model)
-        
-        # Save the vector store
-        vector_store.save_local(VECTORSTORE_DIR)
-        print("FAISS vector store saved successfully.")
-    
+
+    if vector_store is not None:
+        stale_ids = [chunk_id for name in removed + changed for chunk_id in manifest[name]["chunk_ids"]]
+        if stale_ids:
+            vector_store.delete(stale_ids)
+    for name in removed:
+        manifest.pop(name, None)
+
+    # Chunks are embedded in full batches as files stream in, so memory stays
+    # bounded by the batch size however large a file (e.g. a CSV) is. An index
+    # that needs training is created once a training sample worth of chunks is
+    # pending, or at the end for smaller updates.
+    pending_files = {name: current[name] for name in changed + added}
+    # Files that fail to parse stay in the manifest without chunks, so they are
+    # only retried once their content changes
+    for name, digest in pending_files.items():
+        manifest[name] = {"hash": digest, "chunk_ids": []}
+
+    pending_chunks, pending_ids, embedded = [], [], 0
+    embed_start = time.perf_counter()
+
+    def flush():
+        nonlocal vector_store, embedded
+        if vector_store is None:
+            vector_store = new_store(embedding_model, [chunk.page_content for chunk in pending_chunks])
+        for i in range(0, len(pending_chunks), INDEX_BATCH_SIZE):
+            vector_store.add_documents(pending_chunks[i:i + INDEX_BATCH_SIZE], ids=pending_ids[i:i + INDEX_BATCH_SIZE])
+        embedded += len(pending_chunks)
+        pending_chunks.clear()
+        pending_ids.clear()
+
+    for name, digest, records in iter_documents(DOCUMENTS_DIR, pending_files):
+        chunks, ids = chunk_file(name, digest, records, first=len(manifest[name]["chunk_ids"]))
+        manifest[name]["chunk_ids"].extend(ids)
+        pending_chunks.extend(chunks)
+        pending_ids.extend(ids)
+        if len(pending_chunks) >= (INDEX_BATCH_SIZE if vector_store is not None else TRAIN_SAMPLE_SIZE):
+            flush()
+    if pending_chunks or vector_store is None:
+        flush()
+    if embedded:
+        seconds = time.perf_counter() - embed_start
+        print(f"Embedded {embedded} chunks in {seconds:.1f}s ({embedded / seconds:.0f} chunks/s).")
+
+    print(f"Documents: {len(added)} added, {len(changed)} changed, {len(removed)} removed, "
+          f"{len(current) - len(added) - len(changed)} unchanged.")
+    save_vector_store(vector_store, {"index": signature, "files": manifest})
+    print(f"FAISS vector store saved successfully in {time.perf_counter() - start:.1f}s "
+          f"({vector_store.index.ntotal} vectors, {index_size_bytes(vector_store) / 1e6:.1f} MB).")
     return vector_store
 
-# 4. Create a QA Chain
+# 4. Create a QA Chain: BM25 + FAISS retrieval, with cached query embeddings and answers
 def create_qa_chain(vector_store):
     llm = Ollama(model="phi3-mini")
-    retriever = vector_store.as_retriever()
-    
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        retriever=retriever,
-        return_source_documents=True
-    )
-    
-    return qa_chain
+    retriever = HybridRetriever(vector_store)
+    print(f"BM25 index built over {len(retriever.bm25.ids)} chunks in {retriever.bm25.build_seconds:.1f}s.")
+    return CachedQA(retriever, llm)
 
 # 5. Main Function
 def main():
@@ -95,9 +200,11 @@ def main():
         if query.lower() == 'exit':
             break
         
-        result = qa_chain({"query": query})
+        result = qa_chain.ask(query)
         
         print("\nAnswer:", result['result'])
+        stages = ", ".join(f"{stage[:-3]} {ms:.1f}" for stage, ms in result['timings'].items())
+        print(f"[{result['cache'] or 'miss'}] ms: {stages}")
 
 # Run the script
 if __name__ == "__main__":
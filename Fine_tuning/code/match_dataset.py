@@ -0,0 +1,239 @@
+"""
+Resume / job description match examples for fine-tuning the local matcher.
+
+Each example is the exact prompt ``job_scoring.get_match_percentage`` sends
+(cut to the local matcher's lengths), with the JSON reply
+``{"match_percentage": ..., "reason": ...}`` as the target. Sources, best
+labels first:
+
+* cached matcher outputs: ``match.py`` JSONL results and the job store's
+  ``scores`` table, paired with the resume they were scored against; only
+  scores whose recorded source is a parsed JSON reply of the primary model
+  (Ollama) are used, never raw replies, fallbacks or unlabelled old rows;
+* ``dataset_training1.csv`` resumes against the ``job_desc_*.pdf`` files,
+  labelled from how the resume's Category relates to the role plus the share
+  of the job's key terms the resume mentions;
+* the other sample resumes in the documents folder, labelled by key terms only.
+
+    python code/match_dataset.py --scores job_scores.jsonl=resumes/me.docx --job-store ../job_store.sqlite
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "linkedin_auto_apply"))
+
+from document_loader import iter_documents, document_text, scan_documents
+from job_scoring import build_match_prompt, build_job_description, LOCAL_MAX_JOB_CHARS, LOCAL_MAX_RESUME_CHARS
+from job_store import text_hash
+from match import read_resume
+
+DOCUMENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "documents")
+MATCH_DATASET_PATH = "./fine_tuning/dataset/match_train.json"
+JOB_DESC_PATTERN = re.compile(r"^job_desc_(.+)\.pdf$")
+
+SOFTWARE = {
+    "Automation Testing", "Blockchain", "Data Science", "Database", "DevOps Engineer", "DotNet Developer",
+    "ETL Developer", "Hadoop", "Java Developer", "Network Security Engineer", "Python Developer",
+    "SAP Developer", "Testing", "Web Designing",
+}
+BUSINESS = {"Business Analyst", "Operations Manager", "PMO", "Sales", "HR"}
+# job_desc_<role>.pdf -> (categories that fit the role, categories in a related field)
+ROLE_CATEGORIES = {
+    "front_end_engineer": ({"Web Designing"}, SOFTWARE),
+    "full_stack_engineer": ({"Web Designing", "Java Developer", "Python Developer", "DotNet Developer"}, SOFTWARE),
+    "java_developer": ({"Java Developer"}, SOFTWARE),
+    "product_manager": ({"Business Analyst", "PMO", "Operations Manager"}, BUSINESS),
+}
+BASE_SCORES = {"fits": 60, "related": 30, "unrelated": 5, "unknown": 20}
+# score_match sources worth imitating: the primary model's parsed JSON replies. Not the local
+# matcher (its own output) and not Hugging Face, raw replies or the TF-IDF fallback.
+TRAINING_SOURCES = ("ollama",)
+KEY_TERMS = 25
+STOP_WORDS = set("""
+a about above across after all also an and any are as at be been being both but by can could do does
+each etc for from has have having how in into is it its may more most must need new not of on one or
+other our out over per role such team than that the their them they this those through to up us use
+using via was we well were what when which who will with within work working would you your years
+""".split())
+
+
+def terms(text):
+    return [t for t in re.findall(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]", text.lower())
+            if len(t) > 2 and t not in STOP_WORDS]
+
+
+def key_terms(job_text, k=KEY_TERMS):
+    return [term for term, _ in Counter(terms(job_text)).most_common(k)]
+
+
+def relation(category, role):
+    if category is None or role not in ROLE_CATEGORIES:
+        return "unknown"
+    fits, related = ROLE_CATEGORIES[role]
+    if category in fits:
+        return "fits"
+    return "related" if category in related else "unrelated"
+
+
+def heuristic_label(resume_text, category, job):
+    """A weak label: the category prior plus up to 40 points for the job's key terms the resume mentions."""
+    resume_terms = set(terms(resume_text))
+    shared = [t for t in job["key_terms"] if t in resume_terms]
+    missing = [t for t in job["key_terms"] if t not in resume_terms]
+    overlap = len(shared) / max(1, len(job["key_terms"]))
+    kind = relation(category, job["role"])
+    score = max(0, min(100, round(BASE_SCORES[kind] + 40 * overlap)))
+    title = job["role"].replace("_", " ")
+    background = {
+        "fits": f"Your {category} background fits the {title} role",
+        "related": f"Your {category} background is related to the {title} role but not a direct fit",
+        "unrelated": f"Your {category} background is in a different field from the {title} role",
+        "unknown": f"Your resume was compared with the {title} role",
+    }[kind]
+    reason = f"{background}. It mentions {', '.join(shared[:6]) or 'few of the key requirements'}"
+    if missing:
+        reason += f", but does not show {', '.join(missing[:4])}"
+    return score, reason + "."
+
+
+def example(job_text, resume_text, score, reason, source):
+    return {
+        # Empty input: training_data.format_prompt then matches the serving prompt + "\n"
+        "instruction": build_match_prompt(job_text, resume_text, LOCAL_MAX_JOB_CHARS, LOCAL_MAX_RESUME_CHARS),
+        "input": "",
+        "output": json.dumps({"match_percentage": int(score), "reason": reason}, ensure_ascii=False),
+        "source": source,
+    }
+
+
+def usable(score, reason, source):
+    """Cached outputs worth learning from: a parsed JSON reply of the primary model with a 0-100 score and a reason."""
+    if source not in TRAINING_SOURCES:
+        return False
+    try:
+        score = int(score)
+    except (TypeError, ValueError):
+        return False
+    reason = str(reason or "").strip()
+    # A reason that is itself JSON or a fallback notice was not written as a reason
+    return 0 <= score <= 100 and bool(reason) and not reason.startswith(("⚠", "{", "```"))
+
+
+# --- Sources ---
+def cached_score_examples(score_files, job_store_path, resume_paths, skipped=None):
+    """
+    Examples from match.py JSONL output (``scores=resume`` pairs) and the job
+    store's scores; rejected scores are counted by source in ``skipped``.
+    """
+    skipped = {} if skipped is None else skipped
+
+    def keep(score, reason, source):
+        if usable(score, reason, source):
+            return True
+        skipped[source or "unrecorded"] = skipped.get(source or "unrecorded", 0) + 1
+        return False
+
+    for pair in score_files:
+        scores_path, resume_path = pair.split("=", 1)
+        resume_text = read_resume(resume_path)
+        with open(scores_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                job_text = build_job_description(record)
+                if job_text and keep(record.get("Match Score"), record.get("Reason"), record.get("Score Source")):
+                    yield example(job_text, resume_text, record["Match Score"], record["Reason"], "matcher-cache")
+
+    if job_store_path:
+        resumes = {text_hash(text): text for text in map(read_resume, resume_paths)}
+        conn = sqlite3.connect(job_store_path)
+        try:
+            # Stores from before scores recorded their source have no such column; all their rows are skipped
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(scores)")}
+            source_column = "s.source" if "source" in columns else "NULL"
+            rows = conn.execute(
+                f"SELECT s.resume_hash, s.match_score, s.reason, {source_column}, p.about "
+                "FROM scores s JOIN postings p ON p.job_id = s.job_id"
+            )
+            for resume_hash, score, reason, source, about in rows:
+                if resume_hash in resumes and about and keep(score, reason, source):
+                    yield example(about, resumes[resume_hash], score, reason, "job-store")
+        finally:
+            conn.close()
+
+
+def load_jobs(documents_dir):
+    files = {name: digest for name, digest in scan_documents(documents_dir).items() if JOB_DESC_PATTERN.match(name)}
+    jobs = []
+    for name, _, records in iter_documents(documents_dir, files):
+        text = document_text(records)
+        jobs.append({"role": JOB_DESC_PATTERN.match(name).group(1), "text": text, "key_terms": key_terms(text)})
+    missing = set(files) - {f"job_desc_{job['role']}.pdf" for job in jobs}
+    if missing:
+        print(f"⚠ Could not read {', '.join(sorted(missing))}")
+    return jobs
+
+
+def synthetic_examples(documents_dir, jobs, max_rows=None):
+    """Every CSV resume (with its Category) and every other sample resume against every job description."""
+    rows = 0
+    for name, _, records in iter_documents(documents_dir):
+        if JOB_DESC_PATTERN.match(name):
+            continue
+        if name.lower().endswith(".csv"):
+            resumes = [(r["text"], r["metadata"].get("Category"), "csv-category") for r in records]
+        else:
+            resumes = [(document_text(records), None, "sample-resume")]
+        for resume_text, category, source in resumes:
+            if max_rows is not None and source == "csv-category":
+                if rows >= max_rows:
+                    continue
+                rows += 1
+            for job in jobs:
+                score, reason = heuristic_label(resume_text, category, job)
+                yield example(job["text"], resume_text, score, reason, source)
+
+
+def build_match_dataset(output_path=MATCH_DATASET_PATH, documents_dir=DOCUMENTS_DIR, score_files=(),
+                        job_store_path=None, resume_paths=(), max_csv_rows=None, seed=0):
+    """Write the shuffled examples as JSONL; returns the number of examples per source."""
+    jobs = load_jobs(documents_dir)
+    skipped = {}
+    examples = list(cached_score_examples(score_files, job_store_path, resume_paths, skipped))
+    if skipped:
+        print(f"Skipped cached scores not from a parsed {'/'.join(TRAINING_SOURCES)} reply: {skipped}")
+    if jobs:
+        examples.extend(synthetic_examples(documents_dir, jobs, max_csv_rows))
+    random.Random(seed).shuffle(examples)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        for item in examples:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    counts = Counter(item["source"] for item in examples)
+    print(f"Saved {len(examples)} match examples at {output_path}: {dict(counts)}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build resume/job match fine-tuning examples.")
+    parser.add_argument("--output", default=MATCH_DATASET_PATH)
+    parser.add_argument("--documents", default=DOCUMENTS_DIR)
+    parser.add_argument("--scores", action="append", default=[], metavar="SCORES.jsonl=RESUME",
+                        help="match.py output and the resume it was scored against (repeatable).")
+    parser.add_argument("--job-store", help="job_store.sqlite whose scores to include (needs --resume).")
+    parser.add_argument("--resume", action="append", default=[], help="Resumes behind the job store's scores.")
+    parser.add_argument("--max-csv-rows", type=int, help="Use only this many dataset CSV resumes.")
+    args = parser.parse_args()
+    build_match_dataset(args.output, args.documents, args.scores, args.job_store, args.resume, args.max_csv_rows)
+
+
+if __name__ == "__main__":
+    main()
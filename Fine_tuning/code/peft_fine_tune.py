@@ -1,94 +1,98 @@
 # fine_tuning.py
 
+import argparse
+import itertools
 import os
 import json
-import pandas as pd
-import pdfplumber
-from docx import Document
 
-from datasets import load_dataset, Dataset
-from transformers import AutoModelForCausalLM, AutoTokenizer, Trainer, TrainingArguments
+import torch
+from tabulate import tabulate
+from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig, Trainer, TrainingArguments
 from peft import LoraConfig, get_peft_model, prepare_model_for_kbit_training
 
+from document_loader import iter_documents, document_text
+from training_data import build_training_dataset, data_collator, PACKING, MAX_SEQ_LENGTH
+from training_telemetry import CountingCollator, TelemetryCallback
+
 # ========== CONFIG ==========
 MODEL_NAME = os.getenv("peft_model")
 OUTPUT_DIR = "./finetuned_model/"
-DOCUMENTS_DIR = "./fine_tuning/documents/"
+DOCUMENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "documents")
 DATASET_JSON_PATH = "./fine_tuning/dataset/train.json"
+# Match prompts carry a job description and a resume; they need longer sequences than the default
+MATCH_MAX_LENGTH = max(MAX_SEQ_LENGTH, 1024)
+BATCH_SIZE = 2
+TELEMETRY_PATH = os.path.join(OUTPUT_DIR, "telemetry.jsonl")
+# Used by --benchmark when peft_model is not set; small enough to step on a CPU
+TINY_MODEL = "hf-internal-testing/tiny-random-LlamaForCausalLM"
 
 # ========== 1. LOAD DOCUMENTS ==========
 def load_documents_from_folder(folder_path):
-    documents = []
-
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
-        if filename.endswith(".txt"):
-            with open(file_path, 'r', encoding="utf-8") as f:
-                documents.append(f.read())
-        elif filename.endswith(".pdf"):
-            with pdfplumber.open(file_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() + "\n"
-                documents.append(text)
-        elif filename.endswith(".docx"):
-            doc = Document(file_path)
-            text = "\n".join([p.text for p in doc.paragraphs])
-            documents.append(text)
-        elif filename.endswith(".csv"):
-            df = pd.read_csv(file_path)
-            text = df.to_string(index=False)
-            documents.append(text)
-    return documents
+    """
+    Yield one text per file, and one per row for CSV files (which are read in
+    row chunks, never whole). Parsing is parallel and shares the RAG index's
+    text cache.
+    """
+    for filename, _, records in iter_documents(folder_path):
+        if filename.lower().endswith(".csv"):
+            for record in records:
+                yield record["text"]
+        else:
+            text = document_text(records)
+            if text.strip():
+                yield text
 
 # ========== 2. PREPARE TRAINING DATA ==========
 def prepare_training_data(documents):
-    """Convert documents into instruction-output pairs."""
-    data = []
-    for doc in documents:
-        sample = {
-            "instruction": "Summarize the following document.",
-            "input": doc,
-            "output": f"This document discusses: {doc[:200]}..."  # For demo, output is partial content
-        }
-        data.append(sample)
-    
-    # Save to json
+    """Convert documents into instruction-output pairs, written as they arrive."""
     os.makedirs(os.path.dirname(DATASET_JSON_PATH), exist_ok=True)
+    count = 0
     with open(DATASET_JSON_PATH, 'w', encoding='utf-8') as f:
-        for entry in data:
-            f.write(json.dumps(entry) + "\n")
-    print(f"Saved training dataset with {len(data)} examples at {DATASET_JSON_PATH}")
-
-# ========== 3. LOAD DATASET ==========
-def load_training_dataset():
-    dataset = load_dataset('json', data_files=DATASET_JSON_PATH, split="train")
+        for doc in documents:
+            sample = {
+                "instruction": "Summarize the following document.",
+                "input": doc,
+                "output": f"This document discusses: {doc[:200]}..."  # For demo, output is partial content
+            }
+            f.write(json.dumps(sample) + "\n")
+            count += 1
+    print(f"Saved training dataset with {count} examples at {DATASET_JSON_PATH}")
+
+# ========== 3. TOKENIZE (multiprocess, optionally packed, cached on disk) ==========
+def load_training_dataset(tokenizer, data_path=DATASET_JSON_PATH, max_length=MAX_SEQ_LENGTH):
+    dataset, stats = build_training_dataset(tokenizer, data_path, max_length, batch_size=BATCH_SIZE)
+    print(f"{stats['sequences']} sequences, {stats['tokens']} tokens "
+          f"({'cached' if stats['cached'] else 'tokenized'} in {stats['seconds']}s, {stats['tokens_per_second']} tokens/s), "
+          f"padding waste {stats['padding_waste']:.1%} with {'packing' if stats['packing'] else 'length grouping'}")
     return dataset
 
-# ========== 4. TOKENIZE ==========
-def tokenize_function(example, tokenizer):
-    prompt = f"{example['instruction']}\n{example['input']}"
-    labels = example['output']
-    model_inputs = tokenizer(prompt, max_length=512, truncation=True)
-    labels = tokenizer(labels, max_length=128, truncation=True)
-    model_inputs["labels"] = labels["input_ids"]
-    return model_inputs
-
-# ========== 5. LOAD MODEL & APPLY LoRA ==========
-def load_model_with_lora():
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForCausalLM.from_pretrained(
-        MODEL_NAME,
-        load_in_8bit=True,  # Load model in 8-bit to save memory
-        device_map="auto"
-    )
-    
-    model = prepare_model_for_kbit_training(model)
+# ========== 4. LOAD MODEL & APPLY LoRA ==========
+def load_model_with_lora(model_name=MODEL_NAME, load_in_8bit=True, lora_rank=16,
+                         target_modules=("q_proj", "v_proj")):  # target modules depend on model architecture
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    # Packed examples are only kept apart by flash-attention (see training_data.pack_batch)
+    attention = {}
+    if PACKING:
+        if not torch.cuda.is_available():
+            raise RuntimeError("PEFT_PACKING=1 needs flash-attention on a CUDA GPU; unset it to use length grouping.")
+        attention = {"attn_implementation": "flash_attention_2"}  # runs in fp16 under the trainer's autocast
+    # bitsandbytes 8-bit needs a CUDA GPU; on CPU the model trains in full precision
+    load_in_8bit = load_in_8bit and torch.cuda.is_available()
+    if load_in_8bit:
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            quantization_config=BitsAndBytesConfig(load_in_8bit=True),  # Load model in 8-bit to save memory
+            device_map="auto",
+            **attention
+        )
+        model = prepare_model_for_kbit_training(model)
+    else:
+        model = AutoModelForCausalLM.from_pretrained(model_name, **attention)
     
     lora_config = LoraConfig(
-        r=16,
-        lora_alpha=32,
-        target_modules=["q_proj", "v_proj"],  # Depends on model architecture
+        r=lora_rank,
+        lora_alpha=2 * lora_rank,
+        target_modules=list(target_modules),
         lora_dropout=0.05,
         bias="none",
         task_type="CAUSAL_LM"
@@ -99,48 +103,129 @@ def load_model_with_lora():
     
     return model, tokenizer
 
-# ========== 6. TRAINING ==========
-def train_model(model, tokenizer, dataset):
-    tokenized_dataset = dataset.map(lambda x: tokenize_function(x, tokenizer), batched=True)
-
-    training_args = TrainingArguments(
+# ========== 5. TRAINING ==========
+def train_model(model, tokenizer, tokenized_dataset, telemetry_path=TELEMETRY_PATH, **overrides):
+    """
+    Train and save the adapter. Per-step timing, throughput and memory go to
+    ``telemetry_path`` as JSONL; ``overrides`` replace TrainingArguments
+    defaults (the benchmark uses them to run a fixed number of steps).
+    Returns the telemetry summary.
+    """
+    arguments = dict(
         output_dir=OUTPUT_DIR,
-        per_device_train_batch_size=2,
+        per_device_train_batch_size=BATCH_SIZE,
         gradient_accumulation_steps=4,
         evaluation_strategy="no",
         save_strategy="epoch",
         learning_rate=2e-4,
         num_train_epochs=2,
         save_total_limit=1,
-        fp16=True,
+        fp16=torch.cuda.is_available(),
+        group_by_length=not PACKING,
         logging_dir="./logs",
+        logging_steps=10,
         report_to="none"
     )
+    arguments.update(overrides)
+    training_args = TrainingArguments(**arguments)
 
+    collator = CountingCollator(data_collator(tokenizer, PACKING))
+    telemetry = TelemetryCallback(telemetry_path, collator)
     trainer = Trainer(
         model=model,
         args=training_args,
         train_dataset=tokenized_dataset,
-        tokenizer=tokenizer
+        data_collator=collator,
+        tokenizer=tokenizer,
+        callbacks=[telemetry]
     )
 
     trainer.train()
-    model.save_pretrained(OUTPUT_DIR)
-    print(f"Model saved at {OUTPUT_DIR}")
+    if training_args.save_strategy != "no":
+        model.save_pretrained(OUTPUT_DIR)
+        print(f"Model saved at {OUTPUT_DIR}")
+    summary = telemetry.summary()
+    print(f"Telemetry written to {telemetry_path}: {summary}")
+    return summary
+
+# ========== 6. BENCHMARK ==========
+def benchmark(args):
+    """
+    Short fixed-step runs over every combination of the given batch sizes,
+    accumulation steps, precisions and LoRA settings, one telemetry JSONL
+    per run, then a comparison table. Runs on CPU with a tiny model.
+    peak_rss_mb is sampled from each run's start, so runs are comparable
+    even though they share the process.
+    """
+    if not os.path.exists(DATASET_JSON_PATH):
+        prepare_training_data(load_documents_from_folder(DOCUMENTS_DIR))
+    os.makedirs(args.telemetry_dir, exist_ok=True)
+    precisions = args.precisions.split(",")
+    if "8bit" in precisions and not torch.cuda.is_available():
+        print("No CUDA GPU: skipping the 8bit runs (bitsandbytes needs one).")
+        precisions = [p for p in precisions if p != "8bit"]
+    results = []
+    for precision, rank, targets in itertools.product(precisions, args.ranks, args.targets):
+        model, tokenizer = load_model_with_lora(args.model or TINY_MODEL, precision == "8bit", rank, targets.split(","))
+        dataset = load_training_dataset(tokenizer)
+        initial_state = {k: v.clone() for k, v in model.state_dict().items() if "lora_" in k}
+        for batch_size, accumulation in itertools.product(args.batch_sizes, args.grad_accum):
+            model.load_state_dict(initial_state, strict=False)  # every run starts from the same adapter
+            name = f"{precision}_r{rank}_{targets.replace(',', '+')}_bs{batch_size}_ga{accumulation}"
+            print(f"\n▶ {name}")
+            summary = train_model(
+                model, tokenizer, dataset, os.path.join(args.telemetry_dir, f"{name}.jsonl"),
+                output_dir=os.path.join(args.telemetry_dir, "checkpoints"), max_steps=args.steps,
+                per_device_train_batch_size=batch_size, gradient_accumulation_steps=accumulation,
+                save_strategy="no", logging_steps=1,
+            )
+            results.append({"run": name, **summary})
+        del model
+
+    columns = ["run", "mean_step_seconds", "tokens_per_second", "data_wait_share", "padding_ratio",
+               "peak_rss_mb", "accelerator_peak_mb", "final_loss"]
+    print("\n" + tabulate([[r.get(c) for c in columns] for r in results], headers=columns))
+    with open(os.path.join(args.telemetry_dir, "benchmark.json"), "w") as f:
+        json.dump(results, f, indent=2)
 
 # ========== 7. MAIN ==========
 def main():
-    print("Loading documents...")
-    documents = load_documents_from_folder(DOCUMENTS_DIR)
-    
+    parser = argparse.ArgumentParser(description="LoRA fine-tuning on the documents folder.")
+    parser.add_argument("--benchmark", action="store_true", help="Compare configurations over a few steps instead of training.")
+    parser.add_argument("--model", default=MODEL_NAME, help=f"Defaults to $peft_model, or {TINY_MODEL} for --benchmark.")
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--batch-sizes", type=lambda v: [int(x) for x in v.split(",")], default=[1, 2, 4])
+    parser.add_argument("--grad-accum", type=lambda v: [int(x) for x in v.split(",")], default=[1, 4])
+    parser.add_argument("--precisions", default="full,8bit", help="8bit only takes effect on a CUDA GPU.")
+    parser.add_argument("--ranks", type=lambda v: [int(x) for x in v.split(",")], default=[8, 16])
+    parser.add_argument("--targets", type=lambda v: v.split(";"), default=["q_proj,v_proj"],
+                        help="Semicolon-separated sets, e.g. 'q_proj,v_proj;q_proj,k_proj,v_proj,o_proj'.")
+    parser.add_argument("--telemetry-dir", default="./training_benchmark/")
+    parser.add_argument("--task", choices=["match", "summarize"], default="match",
+                        help="match: resume/job scoring for the local matcher (see match_dataset.py); "
+                             "summarize: the original document summaries.")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(args)
+        return
+
     print("Preparing dataset...")
-    prepare_training_data(documents)
+    if args.task == "match":
+        from match_dataset import build_match_dataset, MATCH_DATASET_PATH
+
+        # Keep a set built with cached matcher scores (match_dataset.py --scores); otherwise build from the samples
+        if not os.path.exists(MATCH_DATASET_PATH):
+            build_match_dataset(MATCH_DATASET_PATH)
+        data_path, max_length = MATCH_DATASET_PATH, MATCH_MAX_LENGTH
+    else:
+        prepare_training_data(load_documents_from_folder(DOCUMENTS_DIR))
+        data_path, max_length = DATASET_JSON_PATH, MAX_SEQ_LENGTH
 
-    print("Loading training dataset...")
-    dataset = load_training_dataset()
-    
     print("Loading model with LoRA...")
-    model, tokenizer = load_model_with_lora()
+    model, tokenizer = load_model_with_lora(args.model)
+
+    print("Loading training dataset...")
+    dataset = load_training_dataset(tokenizer, data_path, max_length)
     
     print("Training model...")
     train_model(model, tokenizer, dataset)
@@ -0,0 +1,232 @@
+# Hybrid BM25 + FAISS retrieval with cached question answering for the RAG store
+
+import heapq
+import math
+import os
+import re
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+import numpy as np
+
+RETRIEVAL_K = int(os.getenv("RAG_RETRIEVAL_K", "4"))
+# Candidates taken from each of BM25 and FAISS before fusing them
+RETRIEVAL_CANDIDATES = int(os.getenv("RAG_RETRIEVAL_CANDIDATES", "20"))
+QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_CACHE_SIZE", "1024"))
+ANSWER_CACHE_SIZE = int(os.getenv("RAG_ANSWER_CACHE_SIZE", "256"))
+# A new question with the same terms as a cached one and at least this similar (cosine) reuses its answer
+NEAR_DUPLICATE_SIMILARITY = float(os.getenv("RAG_NEAR_DUPLICATE_SIMILARITY", "0.95"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60  # reciprocal rank fusion constant; damps the weight of the very top ranks
+
+# Keeps skill spellings like c++, c#, node.js and .net in one token
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*|\.[a-z]+")
+
+QA_PROMPT = """Use the following pieces of context to answer the question at the end. If you don't know the answer, just say that you don't know, don't try to make up an answer.
+
+{context}
+
+Question: {question}
+Helpful Answer:"""
+
+
+def tokenize(text):
+    return [token.rstrip(".") for token in TOKEN_PATTERN.findall(text.lower()) if token.rstrip(".")]
+
+
+def normalize_query(query):
+    """Case, punctuation and spacing do not change the answer, so they do not change the cache key."""
+    return " ".join(tokenize(query))
+
+
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def values(self):
+        return list(self.entries.values())
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index, so a query only scores chunks sharing one of its terms."""
+
+    def __init__(self, texts_by_id):
+        start = time.perf_counter()
+        self.ids = list(texts_by_id)
+        self.postings = defaultdict(list)  # term -> [(doc position, term frequency)]
+        self.lengths = np.zeros(len(self.ids), dtype="float32")
+        for position, doc_id in enumerate(self.ids):
+            counts = Counter(tokenize(texts_by_id[doc_id]))
+            self.lengths[position] = sum(counts.values())
+            for term, tf in counts.items():
+                self.postings[term].append((position, tf))
+        self.average_length = float(self.lengths.mean()) if len(self.ids) else 0.0
+        self.build_seconds = time.perf_counter() - start
+
+    def idf(self, term):
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.ids) - df + 0.5) / (df + 0.5))
+
+    def search(self, query, k):
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf(term)
+            for position, tf in self.postings.get(term, ()):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[position] / self.average_length)
+                scores[position] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.ids[position], score) for position, score in best]
+
+
+class HybridRetriever:
+    """
+    Fuses BM25 (exact terms such as "PeopleSoft" or "React") with FAISS
+    (meaning) by reciprocal rank. Query embeddings are kept in an LRU cache.
+    """
+
+    def __init__(self, vector_store, k=RETRIEVAL_K, candidates=RETRIEVAL_CANDIDATES, cache_size=QUERY_CACHE_SIZE):
+        self.vector_store = vector_store
+        self.k = k
+        self.candidates = candidates
+        self.query_vectors = LRUCache(cache_size)
+        docstore = vector_store.docstore
+        self.bm25 = BM25Index({
+            doc_id: docstore.search(doc_id).page_content for doc_id in vector_store.index_to_docstore_id.values()
+        })
+
+    def embed(self, query):
+        """Query vector, from the cache when the normalized query was seen before."""
+        key = normalize_query(query)
+        vector = self.query_vectors.get(key)
+        if vector is None:
+            embeddings = self.vector_store.embedding_function
+            raw = embeddings.embed_query(query) if hasattr(embeddings, "embed_query") else embeddings(query)
+            vector = np.asarray(raw, dtype="float32")
+            self.query_vectors.put(key, vector)
+        return vector
+
+    def retrieve(self, query, vector=None, timings=None):
+        """Top-k documents for the query; per-stage milliseconds are added to ``timings``."""
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+        if vector is None:
+            vector = self.embed(query)
+            timings["embed_ms"] = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+
+        keyword_hits = self.bm25.search(query, self.candidates)
+        timings["bm25_ms"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        _, positions = self.vector_store.index.search(vector[None, :], self.candidates)
+        id_map = self.vector_store.index_to_docstore_id
+        vector_hits = [id_map[p] for p in positions[0] if p >= 0 and p in id_map]
+        timings["faiss_ms"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        fused = defaultdict(float)
+        for rank, (doc_id, _) in enumerate(keyword_hits):
+            fused[doc_id] += 1 / (RRF_K + rank + 1)
+        for rank, doc_id in enumerate(vector_hits):
+            fused[doc_id] += 1 / (RRF_K + rank + 1)
+        best = heapq.nlargest(self.k, fused.items(), key=lambda item: item[1])
+        documents = [self.vector_store.docstore.search(doc_id) for doc_id, _ in best]
+        timings["fuse_ms"] = (time.perf_counter() - start) * 1000
+        return documents
+
+
+class CachedQA:
+    """
+    Question answering over a ``HybridRetriever``. Answers are kept in an LRU
+    cache keyed by the normalized question; a miss with the same set of terms
+    as a cached question (reordered or repeated words) and a close enough
+    embedding is served as a near-duplicate. Embeddings alone would treat
+    "React experience?" and "Angular experience?" as the same question.
+    """
+
+    def __init__(self, retriever, llm, cache_size=ANSWER_CACHE_SIZE, similarity=NEAR_DUPLICATE_SIMILARITY):
+        self.retriever = retriever
+        self.llm = llm
+        self.answers = LRUCache(cache_size)
+        self.similarity = similarity
+        self.near_duplicate_hits = 0
+
+    def _near_duplicate(self, direction, terms):
+        cached = [entry for entry in self.answers.values() if entry["terms"] == terms]
+        if not cached:
+            return None
+        scores = np.stack([entry["direction"] for entry in cached]) @ direction
+        best = int(np.argmax(scores))
+        return cached[best] if scores[best] >= self.similarity else None
+
+    def ask(self, query):
+        """
+        Returns ``{"result", "source_documents", "cache", "timings"}`` where
+        ``cache`` is "exact", "near-duplicate" or None and ``timings`` holds
+        per-stage milliseconds.
+        """
+        total_start = time.perf_counter()
+        timings = {}
+        key = normalize_query(query)
+        entry = self.answers.get(key)
+        cache = "exact" if entry else None
+
+        if entry is None:
+            start = time.perf_counter()
+            vector = self.retriever.embed(query)
+            direction = vector / max(float(np.linalg.norm(vector)), 1e-12)
+            timings["embed_ms"] = (time.perf_counter() - start) * 1000
+            terms = frozenset(key.split())
+            entry = self._near_duplicate(direction, terms)
+            if entry is not None:
+                cache = "near-duplicate"
+                self.near_duplicate_hits += 1
+                self.answers.put(key, {**entry, "direction": direction})
+
+        if entry is None:
+            documents = self.retriever.retrieve(query, vector, timings)
+            start = time.perf_counter()
+            context = "\n\n".join(doc.page_content for doc in documents)
+            result = self.llm.invoke(QA_PROMPT.format(context=context, question=query))
+            timings["generate_ms"] = (time.perf_counter() - start) * 1000
+            entry = {"result": result, "source_documents": documents, "direction": direction, "terms": terms}
+            self.answers.put(key, entry)
+
+        timings["total_ms"] = (time.perf_counter() - total_start) * 1000
+        return {
+            "result": entry["result"],
+            "source_documents": entry["source_documents"],
+            "cache": cache,
+            "timings": {stage: round(ms, 2) for stage, ms in timings.items()},
+        }
+
+    def stats(self):
+        return {
+            "bm25_terms": len(self.retriever.bm25.postings),
+            "bm25_build_seconds": round(self.retriever.bm25.build_seconds, 2),
+            "query_cache": {"size": len(self.retriever.query_vectors), "hits": self.retriever.query_vectors.hits},
+            "answer_cache": {"size": len(self.answers), "hits": self.answers.hits,
+                             "near_duplicate_hits": self.near_duplicate_hits},
+        }
@@ -0,0 +1,200 @@
+# Tokenized, packed and cached training data for PEFT fine-tuning
+
+import hashlib
+import json
+import os
+import random
+import time
+
+from document_loader import file_hash
+
+MAX_SEQ_LENGTH = int(os.getenv("PEFT_MAX_LENGTH", "512"))
+# Room kept for the answer when a long prompt has to be truncated
+MAX_OUTPUT_TOKENS = int(os.getenv("PEFT_MAX_OUTPUT_TOKENS", "128"))
+# Batches are grouped by length by default. PEFT_PACKING=1 packs several examples into each
+# sequence instead, which needs flash-attention to keep the examples apart (see pack_batch).
+PACKING = os.getenv("PEFT_PACKING", "0") == "1"
+TOKENIZE_PROCS = int(os.getenv("PEFT_TOKENIZE_PROCS", str(min(4, os.cpu_count() or 1))))
+TOKENIZED_CACHE_DIR = os.getenv(
+    "PEFT_TOKENIZED_CACHE", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tokenized_cache")
+)
+# Bump when tokenization or packing changes, so old cached datasets are not reused
+PIPELINE_VERSION = 2
+IGNORE_INDEX = -100  # label value the loss skips
+
+
+def format_prompt(example):
+    """Instruction and input, each followed by a newline; examples without input end after the instruction."""
+    return "".join(f"{part}\n" for part in (example["instruction"], example["input"]) if part)
+
+
+def tokenize_batch(batch, tokenizer, max_length=MAX_SEQ_LENGTH):
+    """
+    Prompt and answer tokenized as one causal-LM sequence. Labels line up
+    with input_ids (the model shifts them itself) and are IGNORE_INDEX over
+    the prompt, so only the answer is learned. Long prompts are truncated,
+    never the answer's end-of-sequence token.
+    """
+    prompts = tokenizer([format_prompt(ex) for ex in _rows(batch)], add_special_tokens=True)["input_ids"]
+    answers = tokenizer(batch["output"], add_special_tokens=False)["input_ids"]
+    input_ids, labels = [], []
+    for prompt, answer in zip(prompts, answers):
+        answer = answer[:MAX_OUTPUT_TOKENS - 1] + [tokenizer.eos_token_id]
+        prompt = prompt[:max(0, max_length - len(answer))]
+        input_ids.append(prompt + answer)
+        labels.append([IGNORE_INDEX] * len(prompt) + answer)
+    return {"input_ids": input_ids, "labels": labels, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+
+def _rows(batch):
+    return [dict(zip(batch, values)) for values in zip(*batch.values())]
+
+
+def pack_batch(batch, max_length=MAX_SEQ_LENGTH):
+    """
+    Greedily fill sequences of up to ``max_length`` tokens with whole
+    examples, so little of each batch is padding. Examples are never split,
+    and each prompt's labels stay IGNORE_INDEX, so no answer is trained to
+    predict the next example.
+
+    ``position_ids`` restart at 0 for every example and there is no
+    attention mask: flash-attention reads the example boundaries from the
+    position resets and attends within each example only. With any other
+    attention implementation the examples would see each other, so the model
+    must be loaded with ``attn_implementation="flash_attention_2"``.
+    """
+    packed = {"input_ids": [], "labels": [], "position_ids": []}
+    current_ids, current_labels, current_positions = [], [], []
+    for ids, labels in zip(batch["input_ids"], batch["labels"]):
+        if current_ids and len(current_ids) + len(ids) > max_length:
+            packed["input_ids"].append(current_ids)
+            packed["labels"].append(current_labels)
+            packed["position_ids"].append(current_positions)
+            current_ids, current_labels, current_positions = [], [], []
+        current_ids = current_ids + ids
+        current_labels = current_labels + labels
+        current_positions = current_positions + list(range(len(ids)))
+    if current_ids:
+        packed["input_ids"].append(current_ids)
+        packed["labels"].append(current_labels)
+        packed["position_ids"].append(current_positions)
+    return packed
+
+
+def tokenizer_fingerprint(tokenizer):
+    """Changes whenever the tokenizer would produce different ids."""
+    digest = hashlib.sha256(f"{type(tokenizer).__name__}|{tokenizer.name_or_path}|{len(tokenizer)}".encode())
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        digest.update(backend.to_str().encode())
+    else:
+        digest.update(json.dumps(tokenizer.get_vocab(), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def cache_key(tokenizer, data_path, max_length, packing):
+    parts = [PIPELINE_VERSION, tokenizer_fingerprint(tokenizer), file_hash(data_path), max_length,
+             MAX_OUTPUT_TOKENS, packing]
+    return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:24]
+
+
+def padding_waste(lengths, batch_size, group_by_length=False, seed=0):
+    """
+    Share of the token slots in padded batches that are padding, for batches
+    drawn in random order or, like Trainer's group_by_length, sorted by
+    length within mega-batches of 50 batches.
+    """
+    order = list(range(len(lengths)))
+    random.Random(seed).shuffle(order)
+    if group_by_length:
+        mega = batch_size * 50
+        order = [i for start in range(0, len(order), mega)
+                 for i in sorted(order[start:start + mega], key=lambda i: -lengths[i])]
+    slots = real = 0
+    for start in range(0, len(order), batch_size):
+        batch = [lengths[i] for i in order[start:start + batch_size]]
+        slots += max(batch) * len(batch)
+        real += sum(batch)
+    return round(1 - real / slots, 4) if slots else 0.0
+
+
+def build_training_dataset(tokenizer, data_path, max_length=MAX_SEQ_LENGTH, packing=PACKING,
+                           num_proc=TOKENIZE_PROCS, cache_dir=TOKENIZED_CACHE_DIR, batch_size=2):
+    """
+    Tokenized (and packed) Arrow dataset for the instruction JSONL at
+    ``data_path``. Saved under ``cache_dir`` keyed by tokenizer and data
+    hash, so an unchanged dataset loads memory-mapped instead of being
+    tokenized again. Returns ``(dataset, stats)``; ``stats["padding_waste"]``
+    is estimated for batches of ``batch_size``.
+    """
+    from datasets import load_dataset, load_from_disk
+
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")  # the worker processes parallelize instead
+
+    path = os.path.join(cache_dir, cache_key(tokenizer, data_path, max_length, packing)) if cache_dir else None
+    start = time.perf_counter()
+    if path and os.path.exists(path):
+        dataset = load_from_disk(path)
+        cached = True
+    else:
+        raw = load_dataset("json", data_files=data_path, split="train")
+        num_proc = max(1, min(num_proc, len(raw)))
+        dataset = raw.map(tokenize_batch, batched=True, num_proc=num_proc, remove_columns=raw.column_names,
+                          fn_kwargs={"tokenizer": tokenizer, "max_length": max_length}, desc="Tokenizing")
+        if packing:
+            dataset = dataset.map(pack_batch, batched=True, batch_size=1000, num_proc=num_proc,
+                                  remove_columns=["attention_mask"], fn_kwargs={"max_length": max_length},
+                                  desc="Packing")
+        if path:
+            dataset.save_to_disk(path)
+            dataset = load_from_disk(path)
+        cached = False
+    seconds = time.perf_counter() - start
+
+    lengths = [len(ids) for ids in dataset["input_ids"]]
+    tokens = sum(lengths)
+    stats = {
+        "sequences": len(dataset),
+        "tokens": tokens,
+        "packing": packing,
+        "cached": cached,
+        "seconds": round(seconds, 2),
+        "tokens_per_second": round(tokens / max(seconds, 1e-9)),
+        "padding_waste": padding_waste(lengths, batch_size, group_by_length=not packing),
+    }
+    return dataset, stats
+
+
+def data_collator(tokenizer, packing=False):
+    """Pads each batch only to its own longest sequence (to a multiple of 8 for tensor cores)."""
+    if packing:
+        return PackedCollator(tokenizer.pad_token_id)
+    from transformers import DataCollatorForSeq2Seq
+
+    return DataCollatorForSeq2Seq(tokenizer, padding=True, pad_to_multiple_of=8, label_pad_token_id=IGNORE_INDEX)
+
+
+class PackedCollator:
+    """
+    Pads packed sequences (``pack_batch``) without adding an attention mask,
+    which would make flash-attention ignore the per-example position_ids.
+    Padding gets position 0, so each pad token is a one-token sequence of
+    its own, and IGNORE_INDEX labels.
+    """
+
+    def __init__(self, pad_token_id, pad_to_multiple_of=8):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features):
+        import torch
+
+        length = max(len(f["input_ids"]) for f in features)
+        length = -(-length // self.pad_to_multiple_of) * self.pad_to_multiple_of
+        columns = {"input_ids": self.pad_token_id, "labels": IGNORE_INDEX, "position_ids": 0}
+        return {
+            name: torch.tensor([list(f[name]) + [pad] * (length - len(f[name])) for f in features])
+            for name, pad in columns.items()
+        }
@@ -0,0 +1,205 @@
+# Per-step throughput and memory telemetry for the LoRA trainer
+
+import json
+import os
+import resource
+import statistics
+import threading
+import time
+
+from transformers import TrainerCallback
+
+try:
+    import psutil
+except ImportError:  # current RSS comes from /proc, or the process peak where there is no /proc
+    psutil = None
+
+# Steps excluded from the summary: the first ones include lazy init and allocator warm-up
+WARMUP_STEPS = 2
+# How often RSS is sampled during training, so peaks inside a step are seen
+RSS_SAMPLE_SECONDS = 0.05
+
+
+def rss_mb():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        return process_peak_rss_mb()
+
+
+def process_peak_rss_mb():
+    """High-water mark of the whole process lifetime; not comparable between runs in one process."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RssSampler:
+    """Largest RSS sampled on a background thread since ``start``, i.e. the peak of one training run."""
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = 0.0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def sample(self):
+        self.peak = max(self.peak, rss_mb())
+        return self.peak
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.peak = 0.0
+        self.sample()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        return self.sample()
+
+
+def accelerator_peak_mb(reset=True):
+    """Peak memory allocated on the GPU since the last reset, or None on CPU."""
+    import torch
+
+    if torch.cuda.is_available():
+        peak = torch.cuda.max_memory_allocated() / (1024 * 1024)
+        if reset:
+            torch.cuda.reset_peak_memory_stats()
+        return peak
+    if getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+        return torch.mps.current_allocated_memory() / (1024 * 1024)
+    return None
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class CountingCollator:
+    """
+    Wraps a data collator to count the real (unpadded) and padded tokens of
+    every batch and the time spent collating. Counts are only seen by the
+    trainer's process, so keep ``dataloader_num_workers=0`` (the default).
+    """
+
+    def __init__(self, collator):
+        self.collator = collator
+        self.tokens = 0
+        self.slots = 0
+        self.seconds = 0.0
+
+    def __call__(self, features):
+        start = time.perf_counter()
+        batch = self.collator(features)
+        self.seconds += time.perf_counter() - start
+        # Packed batches have no attention mask, so count from the features
+        self.tokens += sum(len(f["input_ids"]) for f in features)
+        self.slots += int(batch["input_ids"].numel())
+        return batch
+
+    def take(self):
+        counts = self.tokens, self.slots, self.seconds
+        self.tokens = self.slots = 0
+        self.seconds = 0.0
+        return counts
+
+
+class TelemetryCallback(TrainerCallback):
+    """
+    Appends one JSON line per optimizer step to ``path``: wall time, time
+    waiting for the data loader before the step, tokens and tokens/sec,
+    padding share, RSS and peak RSS since training began (sampled, so
+    several runs in one process are comparable), accelerator peak memory,
+    and the last logged loss. A ``{"summary": ...}`` line is written when
+    training ends.
+    """
+
+    def __init__(self, path, collator=None):
+        self.path = path
+        self.collator = collator
+        self.steps = []
+        self.loss = None
+        self.last_step_end = None
+        self.step_begin = None
+        self.file = None
+        self.rss = RssSampler()
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.last_step_end = time.perf_counter()
+        self.rss.start()
+        if self.collator is not None:
+            self.collator.take()  # drop anything collated before training started
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        self.step_begin = time.perf_counter()
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        if logs and "loss" in logs:
+            self.loss = logs["loss"]
+
+    def on_step_end(self, args, state, control, **kwargs):
+        now = time.perf_counter()
+        step_seconds = now - self.last_step_end
+        record = {
+            "step": state.global_step,
+            "epoch": round(state.epoch or 0, 4),
+            "step_seconds": round(step_seconds, 4),
+            # Fetching the step's first batch happens between the previous step and this one
+            "data_wait_seconds": round(self.step_begin - self.last_step_end, 4) if self.step_begin else None,
+            "rss_mb": round(rss_mb(), 1),
+            "peak_rss_mb": round(self.rss.sample(), 1),
+            "accelerator_peak_mb": accelerator_peak_mb(),
+            "loss": self.loss,
+        }
+        if self.collator is not None:
+            tokens, slots, collate_seconds = self.collator.take()
+            record.update({
+                "tokens": tokens,
+                "tokens_per_second": round(tokens / max(step_seconds, 1e-9), 1),
+                "padding_ratio": round(1 - tokens / slots, 4) if slots else 0.0,
+                "collate_seconds": round(collate_seconds, 4),
+            })
+        self.steps.append(record)
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        self.last_step_end = time.perf_counter()
+
+    def on_train_end(self, args, state, control, **kwargs):
+        self.rss.stop()
+        if self.file is not None:
+            self.file.write(json.dumps({"summary": self.summary()}) + "\n")
+            self.file.close()
+            self.file = None
+
+    def summary(self):
+        steps = self.steps[WARMUP_STEPS:] or self.steps
+        if not steps:
+            return {}
+        total = sum(s["step_seconds"] for s in steps)
+        waits = [s["data_wait_seconds"] for s in steps if s["data_wait_seconds"] is not None]
+        summary = {
+            "steps": len(self.steps),
+            "mean_step_seconds": round(total / len(steps), 4),
+            "p95_step_seconds": percentile([s["step_seconds"] for s in steps], 95),
+            "data_wait_share": round(sum(waits) / total, 4) if total else 0.0,
+            "peak_rss_mb": round(self.rss.peak, 1),
+            "accelerator_peak_mb": max((s["accelerator_peak_mb"] or 0) for s in self.steps) or None,
+            "final_loss": self.loss,
+        }
+        if "tokens" in steps[0]:
+            summary["tokens_per_second"] = round(sum(s["tokens"] for s in steps) / total, 1) if total else 0.0
+            summary["padding_ratio"] = round(statistics.mean(s["padding_ratio"] for s in steps), 4)
+        return summary
@@ -0,0 +1,171 @@
+# FAISS index construction and loading for the RAG store
+
+import math
+import os
+import pickle
+import random
+
+# flat (exact), hnsw, ivf_flat or ivf_pq
+INDEX_TYPE = os.getenv("RAG_INDEX_TYPE", "flat")
+# How a flat index stores vectors: float32 (exact), float16 or int8 (scalar
+# quantized). int8 assumes unit-length vectors (the sentence-transformers backend).
+INDEX_PRECISION = os.getenv("RAG_INDEX_PRECISION", "float32")
+# Read the inverted lists of saved IVF indexes memory-mapped, when nothing needs updating.
+# FAISS only maps IVF lists: flat, scalar-quantized and HNSW indexes are always read into RAM.
+INDEX_MMAP = os.getenv("RAG_INDEX_MMAP", "1") != "0"
+# Leading fourcc of IVF indexes in FAISS files ("IwFl", "IwPQ", "IwSQ", ...; "Iv" in old files)
+IVF_FOURCC_PREFIXES = (b"Iw", b"Iv")
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))
+IVF_NLIST = int(os.getenv("RAG_IVF_NLIST", "0"))  # 0 = derived from the corpus size
+IVF_NPROBE = int(os.getenv("RAG_IVF_NPROBE", "8"))
+PQ_BITS = 8
+# FAISS wants at least this many training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+TRAIN_SAMPLE_SIZE = 50000
+
+
+def ivf_nlist(n_vectors):
+    if IVF_NLIST:
+        return IVF_NLIST
+    return max(1, min(4 * int(math.sqrt(n_vectors)), n_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def pq_subquantizers(dimension):
+    """Number of PQ sub-vectors: the largest candidate dividing the dimension into pieces of 4+ values."""
+    for m in (64, 48, 32, 24, 16, 12, 8, 4, 2, 1):
+        if dimension % m == 0 and dimension // m >= 4:
+            return m
+    return 1
+
+
+def effective_index_type(index_type, n_vectors):
+    """Partitioned indexes need enough vectors to train on; small corpora stay exact."""
+    if index_type == "ivf_pq" and n_vectors < (2 ** PQ_BITS) * MIN_POINTS_PER_CENTROID:
+        index_type = "ivf_flat"
+    if index_type == "ivf_flat" and n_vectors < 2 * MIN_POINTS_PER_CENTROID:
+        index_type = "flat"
+    return index_type
+
+
+def build_index(dimension, precision=INDEX_PRECISION, index_type="flat", n_vectors=0):
+    import faiss
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        return index
+    if index_type == "ivf_flat":
+        return faiss.IndexIVFFlat(faiss.IndexFlatL2(dimension), dimension, ivf_nlist(n_vectors))
+    if index_type == "ivf_pq":
+        return faiss.IndexIVFPQ(faiss.IndexFlatL2(dimension), dimension, ivf_nlist(n_vectors),
+                                pq_subquantizers(dimension), PQ_BITS)
+    if index_type != "flat":
+        raise ValueError(f"Unknown index type: {index_type}")
+
+    if precision == "float32":
+        return faiss.IndexFlatL2(dimension)
+    if precision == "float16":
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+    if precision == "int8":
+        import numpy as np
+
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit_uniform, faiss.METRIC_L2)
+        # Unit-length embeddings lie in [-1, 1] on every axis; train the quantizer on exactly that range.
+        index.train(np.array([[-1.0] * dimension, [1.0] * dimension], dtype="float32"))
+        return index
+    raise ValueError(f"Unknown index precision: {precision}")
+
+
+def tune_index(index, nprobe=IVF_NPROBE, ef_search=HNSW_EF_SEARCH):
+    """Search-time knobs, which FAISS does not save with the index."""
+    import faiss
+
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+    else:
+        try:
+            faiss.extract_index_ivf(index).nprobe = nprobe
+        except RuntimeError:
+            pass  # not an IVF index
+    return index
+
+
+def supports_removal(index):
+    """HNSW graphs cannot drop vectors; such indexes are rebuilt instead."""
+    import faiss
+
+    return not isinstance(index, faiss.IndexHNSW)
+
+
+def empty_store(embeddings, precision=INDEX_PRECISION):
+    """An empty LangChain FAISS store with a flat index of the requested precision."""
+    from langchain.docstore.in_memory import InMemoryDocstore
+    from langchain.vectorstores import FAISS
+
+    dimension = len(embeddings.embed_query("dimension probe"))
+    return FAISS(embeddings, build_index(dimension, precision), InMemoryDocstore(), {})
+
+
+def new_store(embeddings, texts, index_type=INDEX_TYPE, precision=INDEX_PRECISION):
+    """
+    An empty store sized for ``texts`` (the chunks about to be added). IVF
+    indexes are trained on a sample of them; with cached embeddings the
+    sample is not embedded twice.
+    """
+    import numpy as np
+    from langchain.docstore.in_memory import InMemoryDocstore
+    from langchain.vectorstores import FAISS
+
+    index_type = effective_index_type(index_type, len(texts))
+    if index_type == "flat":
+        return empty_store(embeddings, precision)
+
+    sample = texts if len(texts) <= TRAIN_SAMPLE_SIZE else random.Random(0).sample(texts, TRAIN_SAMPLE_SIZE)
+    vectors = np.array(embeddings.embed_documents(sample), dtype="float32")
+    index = build_index(vectors.shape[1], precision, index_type, len(texts))
+    if not index.is_trained:
+        index.train(vectors)
+    return FAISS(embeddings, tune_index(index), InMemoryDocstore(), {})
+
+
+def is_mappable(path):
+    """Whether FAISS can memory-map a saved index: only the inverted lists of IVF indexes are mapped."""
+    with open(path, "rb") as f:
+        return f.read(4).startswith(IVF_FOURCC_PREFIXES)
+
+
+def read_index(path, mmap=INDEX_MMAP):
+    """Read an index, with its IVF lists memory-mapped (read-only) when asked and the type allows it."""
+    import faiss
+
+    if mmap and is_mappable(path):
+        try:
+            return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            pass  # e.g. an IVF variant without mmap support
+    return faiss.read_index(path)
+
+
+def load_store(folder, embeddings, mmap=INDEX_MMAP):
+    """
+    Same files as ``FAISS.save_local`` writes. For IVF indexes the inverted
+    lists (the vectors, nearly all of the index) can be mapped from disk
+    instead of read into RAM; the coarse quantizer, other index types and
+    the docstore pickle are always loaded whole. A mapped index is
+    read-only; load with ``mmap=False`` to add or delete vectors.
+    """
+    from langchain.vectorstores import FAISS
+
+    index = tune_index(read_index(os.path.join(folder, "index.faiss"), mmap))
+    with open(os.path.join(folder, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def index_size_bytes(vector_store):
+    import faiss
+
+    return int(faiss.serialize_index(vector_store.index).nbytes)
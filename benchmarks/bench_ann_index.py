@@ -0,0 +1,175 @@
+"""
+Recall@k versus latency versus memory of the RAG index types.
+
+Builds every index type over the same vectors, sweeps its search knob
+(nprobe for IVF, efSearch for HNSW) and reports recall@k against the exact
+flat index, single-query latency, size on disk, and load time plus
+resident memory (after the load and peak) when a fresh process reads the
+saved index normally and through ``vector_index.read_index`` with mmap,
+which only maps the inverted lists of IVF indexes.
+
+    python benchmarks/bench_ann_index.py --synthetic 200000
+    python benchmarks/bench_ann_index.py --documents Fine_tuning/documents/dataset_training1.csv --limit 40000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fine_tuning", "code"))
+
+from vector_index import build_index, effective_index_type, tune_index
+
+SWEEPS = {
+    "flat": [None],
+    "hnsw": [16, 32, 64, 128],
+    "ivf_flat": [1, 4, 8, 16, 32],
+    "ivf_pq": [1, 4, 8, 16, 32],
+}
+
+LOAD_SNIPPET = """
+import json, os, resource, sys, time
+sys.path.insert(0, sys.argv[3])
+import faiss
+from vector_index import read_index, is_mappable
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+base, base_peak = rss_mb(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+index = read_index(sys.argv[1], mmap=sys.argv[2] == "1")
+load_ms = (time.perf_counter() - start) * 1000
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"load_ms": load_ms, "rss_mb": rss_mb() - base, "peak_rss_mb": (peak - base_peak) / 1024,
+                  "mapped": sys.argv[2] == "1" and is_mappable(sys.argv[1])}))
+"""
+CODE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fine_tuning", "code")
+
+
+def synthetic_vectors(n, dimension, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, dimension)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def embedded_vectors(path, limit, n_queries):
+    from embeddings import get_embeddings
+    from fine_tuning import load_file, split_documents
+
+    files = [path] if os.path.isfile(path) else [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    texts = []
+    for file_path in files:
+        texts.extend(chunk.page_content for chunk in split_documents(load_file(file_path)))
+        if len(texts) >= limit:
+            break
+    texts = texts[:limit]
+    embeddings = get_embeddings()  # cached, so reruns skip the embedding cost
+    vectors = np.array(embeddings.embed_documents(texts), dtype="float32")
+    step = max(1, len(texts) // n_queries)
+    queries = np.array([embeddings.embed_query(t[:200]) for t in texts[::step][:n_queries]], dtype="float32")
+    return vectors, queries
+
+
+def load_in_subprocess(path, mmap):
+    output = subprocess.run([sys.executable, "-c", LOAD_SNIPPET, path, "1" if mmap else "0", CODE_DIR],
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output)
+    return {"load_ms": round(result["load_ms"], 1), "rss_after_load_mb": round(result["rss_mb"], 1),
+            "peak_rss_mb": round(result["peak_rss_mb"], 1), "mapped": result["mapped"]}
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def bench_type(index_type, vectors, queries, truth, k, tmp_dir):
+    import faiss
+
+    actual_type = effective_index_type(index_type, len(vectors))
+    start = time.perf_counter()
+    index = build_index(vectors.shape[1], "float32", actual_type, len(vectors))
+    if not index.is_trained:
+        sample = vectors[np.random.default_rng(0).choice(len(vectors), min(len(vectors), 50000), replace=False)]
+        index.train(sample)
+    index.add(vectors)
+    build_s = time.perf_counter() - start
+
+    path = os.path.join(tmp_dir, f"{actual_type}.faiss")
+    faiss.write_index(index, path)
+    normal_load = load_in_subprocess(path, mmap=False)
+    mmap_load = load_in_subprocess(path, mmap=True)
+
+    report = {
+        "index_type": actual_type,
+        "build_seconds": round(build_s, 2),
+        "disk_mb": round(os.path.getsize(path) / 1e6, 2),
+        "load": normal_load,
+        # "mapped": false means the type cannot be mapped and was read into RAM as above
+        "mmap_load": mmap_load,
+        "sweep": [],
+    }
+    for knob in SWEEPS[actual_type]:
+        if actual_type == "hnsw":
+            tune_index(index, ef_search=knob)
+        elif knob is not None:
+            tune_index(index, nprobe=knob)
+        latencies, found = [], []
+        for query in queries:
+            start = time.perf_counter()
+            _, ids = index.search(query[None, :], k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(ids[0])
+        recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+        report["sweep"].append({
+            "knob": knob,
+            f"recall@{k}": round(float(recall), 4),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ANN index types against the flat baseline.")
+    parser.add_argument("--synthetic", type=int, help="Use this many random unit vectors instead of documents.")
+    parser.add_argument("--dimension", type=int, default=384, help="Dimension of synthetic vectors.")
+    parser.add_argument("--documents", default=os.path.join("Fine_tuning", "documents"))
+    parser.add_argument("--limit", type=int, default=20000, help="Chunks to embed from --documents.")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", default="flat,hnsw,ivf_flat,ivf_pq")
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    args = parser.parse_args()
+
+    import faiss
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, args.dimension)
+        noise = synthetic_vectors(args.queries, args.dimension, seed=1) * 0.3
+        queries = vectors[:args.queries] + noise
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    else:
+        vectors, queries = embedded_vectors(args.documents, args.limit, args.queries)
+    print(f"📐 {len(vectors)} vectors of dimension {vectors.shape[1]}, {len(queries)} queries")
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, args.k)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        reports = [bench_type(t, vectors, queries, truth, args.k, tmp_dir) for t in args.types.split(",")]
+    print(json.dumps(reports, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
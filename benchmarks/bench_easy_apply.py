@@ -0,0 +1,75 @@
+"""
+Easy Apply executor against the locally served form fixture.
+
+Runs ``easy_apply.run_executor`` with a pool of headless browsers over
+synthetic postings served by the replay server, and reports outcomes,
+per-application time and applications per hour at the given rate limit.
+
+    python benchmarks/bench_easy_apply.py --postings 20 --workers 3 --per-hour 3600
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "linkedin_auto_apply"))
+
+import browser_session
+import easy_apply
+import scraper_replay
+
+PROFILE = {
+    "linkedin": {"email": "bench@example.com", "password": "unused"},
+    "job_preferences": {"years_of_experience": 4},
+    "languages": {"English": "Fluent"},
+    "notice_period": "1 month",
+    "salary_range_inr": "8-12 LPA",
+    "additional_info": {"legal_authorization": "Yes", "requires_sponsorship": "No"},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Easy Apply executor offline.")
+    parser.add_argument("--postings", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--per-hour", type=float, default=3600)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        postings = scraper_replay.synthesize_fixtures(os.path.join(tmp, "fixtures"), args.postings)
+        server, base_url = scraper_replay.serve_fixtures(os.path.join(tmp, "fixtures"))
+        browser_session.LINKEDIN_URL = base_url
+
+        def make_browser(worker_id):
+            return browser_session.create_browser(profile_dir=os.path.join(tmp, f"profile{worker_id}"), attach=False)
+
+        start = time.perf_counter()
+        try:
+            records = easy_apply.run_executor(
+                PROFILE, postings, workers=args.workers, rate_per_hour=args.per_hour,
+                dry_run=args.dry_run, log_path=os.path.join(tmp, "applications.jsonl"),
+                make_browser=make_browser,
+            )
+        finally:
+            server.shutdown()
+        elapsed = time.perf_counter() - start
+
+    report = {
+        **easy_apply.summarize(records),
+        "workers": args.workers,
+        "rate_limit_per_hour": args.per_hour,
+        "elapsed_s": round(elapsed, 2),
+        "applications_per_hour": round(len(records) / elapsed * 3600, 1) if elapsed else None,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
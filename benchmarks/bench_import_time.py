@@ -0,0 +1,126 @@
+"""
+Startup-time budget for the Streamlit apps.
+
+For each app script this measures, in a fresh interpreter:
+  * cold start: its top-level imports under ``python -X importtime``
+  * rerun: the second ``AppTest.run()`` of the script, i.e. what every
+    widget interaction costs once modules are loaded
+
+and fails (exit code 1) when any number exceeds its budget.
+
+    python benchmarks/bench_import_time.py --output bench_import_time.json
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Milliseconds; cold = top-level imports only, rerun = one Streamlit rerun.
+BUDGETS = {
+    "main.py": {"cold_ms": 1500, "rerun_ms": 150},
+    "linkedin_auto_apply/job_match.py": {"cold_ms": 2500, "rerun_ms": 500},
+    "resume_maker/resume_maker_input.py": {"cold_ms": 1500, "rerun_ms": 300},
+}
+
+RERUN_SNIPPET = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+start = time.perf_counter(); at.run(); first = time.perf_counter() - start
+start = time.perf_counter(); at.run(); second = time.perf_counter() - start
+print(json.dumps({"first_run_ms": first * 1000, "rerun_ms": second * 1000}))
+"""
+
+
+def top_level_imports(script_path):
+    """Source of every module-level import statement of a script."""
+    with open(script_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.unparse(node))
+    return "\n".join(lines)
+
+
+def environment(script_path):
+    env = dict(os.environ)
+    paths = [os.path.dirname(script_path), os.path.join(ROOT, "resume_maker"), os.path.join(ROOT, "linkedin_auto_apply")]
+    env["PYTHONPATH"] = os.pathsep.join(paths + [env.get("PYTHONPATH", "")])
+    return env
+
+
+def cold_import(script_path):
+    """Total and per-package import time (ms) of the script's top-level imports."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", top_level_imports(script_path)],
+        cwd=os.path.dirname(script_path), env=environment(script_path),
+        capture_output=True, text=True,
+    )
+    total_us = 0
+    packages = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:  <self us> | <cumulative us> | <indent><module>"
+        self_us, cumulative_us, raw_name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        # Top-level imports are printed with a single leading space, nested ones are indented.
+        if len(raw_name) - len(raw_name.lstrip()) == 1:
+            packages[raw_name.strip()] = int(cumulative_us) / 1000
+    top = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:8]
+    return {
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+        "cold_ms": round(total_us / 1000, 1),
+        "heaviest_imports_ms": {name: round(ms, 1) for name, ms in top},
+    }
+
+
+def rerun_latency(script_path):
+    proc = subprocess.run(
+        [sys.executable, "-c", RERUN_SNIPPET, script_path],
+        cwd=os.path.dirname(script_path), env=environment(script_path),
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        return {"rerun_error": (proc.stderr.strip().splitlines() or ["unknown error"])[-1]}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {key: round(value, 1) for key, value in result.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check app cold-start and rerun latency against a budget.")
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    parser.add_argument("--no-rerun", action="store_true", help="Only measure import time.")
+    args = parser.parse_args()
+
+    report = []
+    over_budget = False
+    for script, budget in BUDGETS.items():
+        path = os.path.join(ROOT, script)
+        row = {"script": script, "budget": budget, **cold_import(path)}
+        if not args.no_rerun:
+            row.update(rerun_latency(path))
+        row["over_budget"] = [
+            key for key, limit in budget.items()
+            if isinstance(row.get(key), (int, float)) and row[key] > limit
+        ]
+        if not row["ok"]:
+            row["over_budget"].append("import_failed")
+        over_budget = over_budget or bool(row["over_budget"])
+        report.append(row)
+        print(json.dumps(row, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
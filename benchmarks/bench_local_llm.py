@@ -0,0 +1,69 @@
+"""
+Resident local model: load time, time to first token, tokens/sec for one
+streamed request and for a batch of concurrent requests, and memory.
+
+    RESUME_LOCAL_MODEL=models/qwen2.5-0.5b-instruct-q4_k_m.gguf python benchmarks/bench_local_llm.py
+    RESUME_LOCAL_MODEL=Qwen/Qwen2.5-0.5B-Instruct python benchmarks/bench_local_llm.py --concurrent 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resume_maker"))
+
+from local_llm import get_local_model
+
+PROMPT = ("Write a three-line professional summary for a backend engineer with five years of "
+          "Python, PostgreSQL and Kubernetes experience applying for a platform team role.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resident local resume model.")
+    parser.add_argument("--max-new-tokens", type=int, default=128)
+    parser.add_argument("--concurrent", type=int, default=4, help="Requests sent at once for the batch run.")
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = get_local_model()
+    report = {"load_seconds": round(time.perf_counter() - start, 2)}
+
+    start = time.perf_counter()
+    first_token_s = None
+    for _ in model.stream(PROMPT, max_new_tokens=args.max_new_tokens):
+        if first_token_s is None:
+            first_token_s = time.perf_counter() - start
+    single = model.stats()
+    report["single"] = {
+        "first_token_seconds": round(first_token_s, 2) if first_token_s is not None else None,
+        "seconds": round(time.perf_counter() - start, 2),
+        "tokens_per_second": single["tokens_per_second"],
+    }
+
+    tokens_before = single["tokens"]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrent) as pool:
+        list(pool.map(lambda _: model.generate(PROMPT, max_new_tokens=args.max_new_tokens), range(args.concurrent)))
+    wall = time.perf_counter() - start
+    stats = model.stats()
+    report["batch"] = {
+        "requests": args.concurrent,
+        "seconds": round(wall, 2),
+        "tokens_per_second": round((stats["tokens"] - tokens_before) / wall, 1),
+        "mean_batch_size": stats["mean_batch_size"],
+    }
+    report["model_memory_mb"] = stats["model_memory_mb"]
+    report["process_memory_mb"] = stats["process_memory_mb"]
+    report["model"] = stats["model"]
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
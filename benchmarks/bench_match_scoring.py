@@ -0,0 +1,323 @@
+"""
+End-to-end match scoring against the sample documents.
+
+Every resume in ``Fine_tuning/documents`` is scored against every
+``job_desc_*.pdf`` through ``job_scoring.score_match`` directly, through
+``match.score_jobs`` and through ``job_pipeline.score``, at each
+concurrency level. Ollama and Hugging Face are served by ``llm_stub.py``
+with the given latency, replaying recorded replies when ``--replay`` is
+set; ``--invalid-json-rate`` and ``--error-rate`` exercise the parsing and
+fallback paths. The JSON report has throughput, p50/p95/p99 latency, the
+backend that answered, fallback and JSON-parse failure rates per run, and
+the scores per (resume, job) pair so two reports show how results moved.
+
+    python benchmarks/bench_match_scoring.py --concurrency 1,2,4,8 --latency 0.2 --output bench_match.json
+    python benchmarks/bench_match_scoring.py --baseline bench_match.json   # exit 1 on a regression
+    # Record replies from a real Ollama once, then replay them offline
+    OLLAMA_HOST=http://localhost:11434 python benchmarks/bench_match_scoring.py --record match_replies.jsonl
+    python benchmarks/bench_match_scoring.py --replay match_replies.jsonl --replay-latency
+
+Set ``MATCH_LOCAL_MODEL`` to include the exported local matcher (it is tried
+before Ollama, so stub replies then only count as fallbacks).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "linkedin_auto_apply"))
+sys.path.insert(0, os.path.join(ROOT, "Fine_tuning", "code"))
+
+import llm_gateway
+import llm_stub
+import job_scoring
+import match
+from document_loader import iter_documents, document_text
+from job_scoring import build_match_prompt, MATCH_LOCAL_MODEL, OLLAMA_MODEL
+
+try:
+    import job_pipeline
+except ImportError as e:  # the pipeline pulls in the Selenium scraper
+    job_pipeline = None
+    PIPELINE_IMPORT_ERROR = str(e)
+
+DOCUMENTS_DIR = os.path.join(ROOT, "Fine_tuning", "documents")
+JOB_PREFIX = "job_desc_"
+
+# job_scoring log messages about the local matcher, whose failures are not visible in score_match's source
+MARKERS = {
+    "Local matcher reply was not valid JSON": "parse_failure",
+    "Local matcher failed": "local_error",
+}
+# A regression is a p95 or throughput more than this much worse than the baseline
+DEFAULT_TOLERANCE = 0.2
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+# --- Workload ---
+def load_workload(documents_dir):
+    """``(resumes, postings)``: ``{name: text}`` and one posting dict per job description."""
+    resumes, postings = {}, []
+    for name, _, records in iter_documents(documents_dir):
+        if name.lower().endswith(".csv"):
+            continue
+        text = document_text(records).strip()
+        if not text:
+            continue
+        if name.startswith(JOB_PREFIX):
+            role = os.path.splitext(name)[0][len(JOB_PREFIX):].replace("_", " ").title()
+            postings.append({"Job ID": name, "Job Title": role, "Company and Location": "Sample", "About": text})
+        else:
+            resumes[name] = text
+    postings.sort(key=lambda p: p["Job ID"])
+    return dict(sorted(resumes.items())), postings
+
+
+# --- Instrumentation ---
+class CallEvents(logging.Handler):
+    """Collects the job_scoring markers logged by each thread during its current call."""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.events = {}
+
+    def emit(self, record):
+        message = record.getMessage()
+        for marker, event in MARKERS.items():
+            if marker in message:
+                self.events.setdefault(record.thread, set()).add(event)
+
+    def start(self):
+        self.events.pop(threading.get_ident(), None)
+
+    def take(self):
+        return self.events.pop(threading.get_ident(), set())
+
+
+class Recorder:
+    """Wraps ``score_match`` to time every call and record which backend answered."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, job_description, resume_text):
+        self.handler.start()
+        start = time.perf_counter()
+        score, reason, source = job_scoring.score_match(job_description, resume_text)
+        seconds = time.perf_counter() - start
+        events = self.handler.take()
+        with self.lock:
+            # "ollama-raw" was answered by Ollama, but not with JSON
+            self.calls.append({"seconds": seconds, "backend": source.split("-")[0],
+                               "parse_failure": source.endswith("-raw") or "parse_failure" in events,
+                               "score": score})
+        return score, reason, source
+
+
+def summarize(calls, elapsed):
+    latencies = [c["seconds"] * 1000 for c in calls]
+    backends = {}
+    for call in calls:
+        backends[call["backend"]] = backends.get(call["backend"], 0) + 1
+    primary = "local" if MATCH_LOCAL_MODEL else "ollama"
+    count = len(calls)
+    return {
+        "calls": count,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(count / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50), 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 1) if latencies else None,
+        "backends": backends,
+        "fallback_rate": round(1 - backends.get(primary, 0) / count, 4) if count else None,
+        "parse_failure_rate": round(sum(c["parse_failure"] for c in calls) / count, 4) if count else None,
+    }
+
+
+# --- Scoring paths ---
+# Each gets the job list once per repeat, so a batch (one resume) can keep every worker busy
+def run_direct(resumes, postings, concurrency, score):
+    pairs = [(resume, posting) for resume in resumes.values() for posting in postings]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda pair: score(match.build_job_description(pair[1]), pair[0]), pairs))
+
+
+def run_score_jobs(resumes, postings, concurrency, score):
+    match.score_match = score
+    for resume_text in resumes.values():
+        list(match.score_jobs(iter(postings), resume_text, workers=concurrency))
+
+
+def run_pipeline(resumes, postings, concurrency, score):
+    job_pipeline.score_match = score
+    for resume_text in resumes.values():
+        list(job_pipeline.score(iter(postings), resume_text, workers=concurrency))
+
+
+PATHS = {"score_match": run_direct, "match.score_jobs": run_score_jobs, "job_pipeline.score": run_pipeline}
+
+
+def pair_scores(resumes, postings, handler):
+    """Score of every (resume, job) pair, one call at a time, keyed ``resume|job``."""
+    recorder = Recorder(handler)
+    return {f"{name}|{posting['Job ID']}": recorder(match.build_job_description(posting), text)[0]
+            for name, text in resumes.items() for posting in postings}
+
+
+# --- Recording ---
+def record_replies(resumes, postings, path):
+    """Send every prompt to the configured Ollama and save the replies for ``--replay``."""
+    gateway = llm_gateway.get_gateway()
+    with open(path, "w", encoding="utf-8") as f:
+        for name, text in resumes.items():
+            for posting in postings:
+                prompt = build_match_prompt(match.build_job_description(posting), text)
+                start = time.perf_counter()
+                reply = gateway.ollama_chat(OLLAMA_MODEL, prompt, timeout=300)
+                seconds = round(time.perf_counter() - start, 3)
+                f.write(json.dumps({"prompt_sha1": llm_stub.prompt_digest(prompt), "model": OLLAMA_MODEL,
+                                    "resume": name, "job": posting["Job ID"], "reply": reply,
+                                    "seconds": seconds}, ensure_ascii=False) + "\n")
+                print(f"{seconds:>7.2f}s  {name} × {posting['Job ID']}")
+    print(f"✅ Recorded {len(resumes) * len(postings)} replies from {llm_gateway.OLLAMA_HOST} → {path}")
+
+
+# --- Baseline comparison ---
+def regressions(report, baseline, tolerance):
+    found = []
+    old_runs = {(r["path"], r["concurrency"]): r for r in baseline.get("runs", [])}
+    for run in report["runs"]:
+        old = old_runs.get((run["path"], run["concurrency"]))
+        if not old or not old.get("p95_ms") or not old.get("throughput_per_s"):
+            continue
+        if run["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            found.append(f"{run['path']} x{run['concurrency']}: p95 {old['p95_ms']} → {run['p95_ms']} ms")
+        if run["throughput_per_s"] < old["throughput_per_s"] * (1 - tolerance):
+            found.append(f"{run['path']} x{run['concurrency']}: "
+                         f"throughput {old['throughput_per_s']} → {run['throughput_per_s']}/s")
+    return found
+
+
+def score_drift(scores, baseline_scores):
+    shared = [key for key in scores if key in baseline_scores]
+    diffs = []
+    for key in shared:
+        try:
+            diffs.append(abs(float(scores[key]) - float(baseline_scores[key])))
+        except (TypeError, ValueError):
+            continue
+    return {
+        "pairs": len(shared),
+        "mean_abs_diff": round(sum(diffs) / len(diffs), 2) if diffs else None,
+        "changed": sum(d > 0 for d in diffs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark match scoring end to end against a local LLM stand-in.")
+    parser.add_argument("--documents", default=DOCUMENTS_DIR)
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated worker counts.")
+    parser.add_argument("--paths", default=",".join(PATHS), help="Comma-separated scoring paths to run.")
+    parser.add_argument("--repeat", type=int, default=4,
+                        help="Times each resume is scored against every job per run (batch size = jobs × repeat).")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub seconds per reply.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many seconds added to --latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests failing with a 500.")
+    parser.add_argument("--invalid-json-rate", type=float, default=0.0, help="Fraction of malformed match replies.")
+    parser.add_argument("--replay", help="Recorded replies (JSONL from --record) for the stub to serve.")
+    parser.add_argument("--replay-latency", action="store_true", help="Wait the recorded time for replayed replies.")
+    parser.add_argument("--ollama-concurrency", type=int,
+                        help="Gateway cap on concurrent Ollama requests (default OLLAMA_CONCURRENCY).")
+    parser.add_argument("--record", metavar="PATH", help="Record replies from the real Ollama instead of benchmarking.")
+    parser.add_argument("--baseline", help="Earlier report; exit 1 when p95 or throughput regressed.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    args = parser.parse_args()
+
+    resumes, postings = load_workload(args.documents)
+    if not resumes or not postings:
+        sys.exit(f"Need resumes and {JOB_PREFIX}*.pdf files in {args.documents}")
+    if args.record:
+        record_replies(resumes, postings, args.record)
+        return
+
+    server, url = llm_stub.serve_stub(
+        latency_s=args.latency, latency_jitter_s=args.jitter, error_rate=args.error_rate,
+        invalid_json_rate=args.invalid_json_rate, replay_latency=args.replay_latency,
+        replies=llm_stub.load_replies(args.replay) if args.replay else None,
+    )
+    # The gateway reads these when it is first created
+    llm_gateway.OLLAMA_HOST = url
+    llm_gateway.HF_API_URL = f"{url}/models"
+    if args.ollama_concurrency:
+        rate, burst, _, timeout = llm_gateway.PROVIDER_LIMITS["ollama"]
+        llm_gateway.PROVIDER_LIMITS["ollama"] = (rate, burst, args.ollama_concurrency, timeout)
+    ollama_concurrency = llm_gateway.PROVIDER_LIMITS["ollama"][2]
+    gateway = llm_gateway.get_gateway()
+
+    handler = CallEvents()
+    logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+    report = {
+        "resumes": len(resumes),
+        "jobs": len(postings),
+        "repeat": args.repeat,
+        "local_matcher": MATCH_LOCAL_MODEL or None,
+        "stub": {"latency_s": args.latency, "jitter_s": args.jitter, "error_rate": args.error_rate,
+                 "invalid_json_rate": args.invalid_json_rate, "replay": args.replay},
+        "ollama_concurrency": ollama_concurrency,
+        "runs": [],
+    }
+    try:
+        report["scores"] = pair_scores(resumes, postings, handler)  # also warms up connections and models
+        for path in args.paths.split(","):
+            if path == "job_pipeline.score" and job_pipeline is None:
+                report.setdefault("skipped", {})[path] = PIPELINE_IMPORT_ERROR
+                continue
+            for concurrency in [int(c) for c in args.concurrency.split(",")]:
+                recorder = Recorder(handler)
+                start = time.perf_counter()
+                PATHS[path](resumes, postings * args.repeat, concurrency, recorder)
+                run = {"path": path, "concurrency": concurrency,
+                       **summarize(recorder.calls, time.perf_counter() - start)}
+                report["runs"].append(run)
+                print(f"{path:<22} x{concurrency:<3} {run['throughput_per_s']:>7}/s  p50 {run['p50_ms']} ms  "
+                      f"p95 {run['p95_ms']} ms  fallback {run['fallback_rate']:.1%}  "
+                      f"parse failures {run['parse_failure_rate']:.1%}", file=sys.stderr)
+    finally:
+        server.shutdown()
+    report["gateway"] = gateway.stats()
+    report["stub_requests"] = dict(server.state)
+
+    failed = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        failed = regressions(report, baseline, args.tolerance)
+        report["baseline"] = {"path": args.baseline, "tolerance": args.tolerance, "regressions": failed,
+                              "score_drift": score_drift(report["scores"], baseline.get("scores", {}))}
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if failed:
+        print("❌ Regressions against the baseline:\n  " + "\n  ".join(failed), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Embedding backends and index precisions for the RAG store.
+
+For each backend this embeds the same sample of chunks cold (no cache) and
+again through the on-disk cache, then builds an index per precision and
+reports indexing throughput, index size, query latency and how many of
+the float32 top-k results each quantized index returns.
+
+    python benchmarks/bench_rag_embeddings.py --documents Fine_tuning/documents/dataset_training1.csv --limit 5000
+    python benchmarks/bench_rag_embeddings.py --backends sentence-transformers,ollama --precisions float32,int8
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fine_tuning", "code"))
+
+from embeddings import get_embeddings, embedding_signature
+from fine_tuning import load_file, split_documents
+from vector_index import empty_store, index_size_bytes
+
+K = 4
+
+
+def load_chunks(path, limit):
+    files = [path] if os.path.isfile(path) else [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    chunks = []
+    for file_path in files:
+        chunks.extend(split_documents(load_file(file_path)))
+        if len(chunks) >= limit:
+            break
+    return chunks[:limit]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def bench_backend(backend, chunks, queries, precisions):
+    texts = [chunk.page_content for chunk in chunks]
+    metadatas = [chunk.metadata for chunk in chunks]
+    report = {"backend": embedding_signature(backend)}
+
+    embeddings = get_embeddings(backend, cache_dir=None)
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(texts)
+    seconds = time.perf_counter() - start
+    report["dimension"] = len(vectors[0])
+    report["cold_chunks_per_second"] = round(len(texts) / seconds, 1)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cached = get_embeddings(backend, cache_dir=cache_dir)
+        cached.embed_documents(texts)  # fills the cache
+        start = time.perf_counter()
+        cached.embed_documents(texts)
+        report["cached_chunks_per_second"] = round(len(texts) / (time.perf_counter() - start), 1)
+
+    query_vectors = [embeddings.embed_query(query) for query in queries]
+    baseline = None
+    report["indexes"] = []
+    for precision in precisions:
+        store = empty_store(embeddings, precision)
+        start = time.perf_counter()
+        store.add_embeddings(list(zip(texts, vectors)), metadatas)
+        add_seconds = time.perf_counter() - start
+
+        latencies, results = [], []
+        for query in queries:
+            start = time.perf_counter()
+            store.similarity_search(query, k=K)
+            latencies.append((time.perf_counter() - start) * 1000)
+        for vector in query_vectors:
+            results.append([doc.page_content for doc in store.similarity_search_by_vector(vector, k=K)])
+        if baseline is None:
+            baseline = results
+        overlap = statistics.mean(len(set(a) & set(b)) / K for a, b in zip(results, baseline))
+
+        report["indexes"].append({
+            "precision": precision,
+            "add_seconds": round(add_seconds, 3),
+            "index_mb": round(index_size_bytes(store) / 1e6, 2),
+            "query_p50_ms": round(percentile(latencies, 50), 2),
+            "query_p95_ms": round(percentile(latencies, 95), 2),
+            f"top{K}_overlap_vs_{precisions[0]}": round(overlap, 3),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RAG embedding backends and index precisions.")
+    parser.add_argument("--documents", default=os.path.join("Fine_tuning", "documents"))
+    parser.add_argument("--limit", type=int, default=2000, help="Chunks to embed.")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--backends", default="sentence-transformers")
+    parser.add_argument("--precisions", default="float32,float16,int8", help="The first one is the recall baseline.")
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.documents, args.limit)
+    step = max(1, len(chunks) // args.queries)
+    queries = [chunk.page_content[:200] for chunk in chunks[::step][:args.queries]]
+    print(f"📚 {len(chunks)} chunks, {len(queries)} queries")
+
+    reports = [
+        bench_backend(backend, chunks, queries, args.precisions.split(","))
+        for backend in args.backends.split(",")
+    ]
+    print(json.dumps(reports, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
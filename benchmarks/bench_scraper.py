@@ -0,0 +1,86 @@
+"""
+Offline scraper benchmark.
+
+Serves recorded (or synthetic) LinkedIn fixtures from a local replay server,
+points the scraper at it and measures extraction time, WebDriver round-trips
+and postings per minute. No LinkedIn login is needed.
+
+    python benchmarks/bench_scraper.py --pages 2 --output bench_scraper.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "linkedin_auto_apply"))
+
+import browser_session
+import scraper_replay
+from job_scrap_extracted import open_job_list, iter_postings
+
+
+def run(fixture_dir, pages, lean):
+    if not os.path.exists(os.path.join(fixture_dir, scraper_replay.POSTINGS_FILE)):
+        scraper_replay.synthesize_fixtures(fixture_dir)
+
+    server, base_url = scraper_replay.serve_fixtures(fixture_dir)
+    browser_session.LINKEDIN_URL = base_url
+
+    with tempfile.TemporaryDirectory() as profile_dir:
+        start = time.perf_counter()
+        browser = browser_session.create_browser(profile_dir=profile_dir, attach=False, lean=lean)
+        startup_s = time.perf_counter() - start
+        counter = scraper_replay.count_round_trips(browser)
+        try:
+            start = time.perf_counter()
+            open_job_list(browser)
+            list_s = time.perf_counter() - start
+            list_commands = counter["commands"]
+
+            start = time.perf_counter()
+            postings = list(iter_postings(browser, max_pages=pages))
+            extract_s = time.perf_counter() - start
+            memory_mb = browser_session.browser_memory_mb(browser)
+        finally:
+            browser.quit()
+            server.shutdown()
+
+    extracted = sum(1 for p in postings if p["About"] != "N/A")
+    return {
+        "profile": "lean" if lean else "full",
+        "pages": pages,
+        "postings": len(postings),
+        "postings_extracted": extracted,
+        "startup_s": round(startup_s, 2),
+        "open_job_list_s": round(list_s, 2),
+        "extraction_s": round(extract_s, 2),
+        "per_posting_s": round(extract_s / max(len(postings), 1), 3),
+        "postings_per_minute": round(60 * len(postings) / extract_s, 1) if extract_s else None,
+        "webdriver_round_trips": counter["commands"],
+        "round_trips_open_job_list": list_commands,
+        "round_trips_per_posting": round((counter["commands"] - list_commands) / max(len(postings), 1), 1),
+        "browser_memory_mb": round(memory_mb, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LinkedIn scraper against replayed fixtures.")
+    parser.add_argument("--fixtures", default=scraper_replay.FIXTURE_DIR)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--full-profile", action="store_true", help="Also run the non-lean browser profile.")
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    args = parser.parse_args()
+
+    profiles = [True, False] if args.full_profile else [True]
+    report = [run(args.fixtures, args.pages, lean) for lean in profiles]
+    for row in report:
+        print(json.dumps(row, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
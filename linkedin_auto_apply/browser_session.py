@@ -0,0 +1,265 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from dotenv import load_dotenv
+
+try:
+    import psutil
+except ImportError:  # memory reporting is optional
+    psutil = None
+
+load_dotenv()
+
+# Resolved chromedriver binary, so later runs skip ChromeDriverManager's network check
+DRIVER_CACHE_FILE = os.getenv("CHROMEDRIVER_CACHE", ".chromedriver_path")
+# Persistent Chrome profile; keeps LinkedIn's session cookies between runs
+PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", ".chrome_profile")
+# Exported cookies, used to restore a session into a fresh profile
+COOKIES_FILE = os.getenv("LINKEDIN_COOKIES", "linkedin_cookies.json")
+# Port of a long-lived browser started with `python browser_session.py --daemon`
+DAEMON_PORT = int(os.getenv("BROWSER_DAEMON_PORT", "9222"))
+# Headless, no images/media/fonts/trackers; set SCRAPER_LEAN_PROFILE=0 for a normal visible browser
+LEAN_PROFILE = os.getenv("SCRAPER_LEAN_PROFILE", "1") != "0"
+WINDOW_SIZE = os.getenv("SCRAPER_WINDOW_SIZE", "1280,900")
+
+# URL patterns dropped through Network.setBlockedURLs in the lean profile
+BLOCKED_URL_PATTERNS = [
+    # images, media and fonts
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*media.licdn.com*",
+    # third-party and tracking hosts
+    "*doubleclick.net*", "*google-analytics.com*", "*googletagmanager.com*",
+    "*googlesyndication.com*", "*facebook.net*", "*bing.com*", "*ads-twitter.com*",
+    "*px.ads.linkedin.com*", "*snap.licdn.com*", "*li.protechts.net*",
+]
+
+# Overridable so the scraper can be pointed at the offline replay server (scraper_replay.py)
+LINKEDIN_URL = os.getenv("LINKEDIN_BASE_URL", "https://www.linkedin.com").rstrip("/")
+SESSION_COOKIE = "li_at"
+
+
+# --- Driver binary cache ---
+def get_driver_path():
+    """
+    Return a chromedriver path, resolving it through ChromeDriverManager only
+    when no cached binary exists. ``CHROMEDRIVER_PATH`` overrides both.
+    """
+    override = os.getenv("CHROMEDRIVER_PATH")
+    if override:
+        return override
+
+    if os.path.exists(DRIVER_CACHE_FILE):
+        with open(DRIVER_CACHE_FILE, "r") as f:
+            cached = f.read().strip()
+        if cached and os.path.exists(cached):
+            return cached
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    path = ChromeDriverManager().install()
+    with open(DRIVER_CACHE_FILE, "w") as f:
+        f.write(path)
+    logging.info(f"💾 Cached chromedriver path: {path}")
+    return path
+
+
+def daemon_running(port=DAEMON_PORT):
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+# --- Browser startup ---
+def build_options(profile_dir=PROFILE_DIR, debugging_port=None, lean=LEAN_PROFILE):
+    options = Options()
+    options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+    if debugging_port:
+        options.add_argument(f"--remote-debugging-port={debugging_port}")
+    if lean:
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument(f"--window-size={WINDOW_SIZE}")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+        })
+    return options
+
+
+def block_resources(browser, patterns=BLOCKED_URL_PATTERNS):
+    """Drop images, media, fonts and third-party hosts at the network layer."""
+    browser.execute_cdp_cmd("Network.enable", {})
+    browser.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+def create_browser(profile_dir=PROFILE_DIR, attach=True, lean=LEAN_PROFILE):
+    """
+    Start Chrome on the persistent profile, or attach to a running browser
+    daemon when one is listening on ``BROWSER_DAEMON_PORT``.
+    """
+    start = time.perf_counter()
+    service = Service(get_driver_path())
+
+    if attach and daemon_running():
+        options = Options()
+        options.add_experimental_option("debuggerAddress", f"127.0.0.1:{DAEMON_PORT}")
+        browser = webdriver.Chrome(service=service, options=options)
+        browser.attached_to_daemon = True
+        logging.info(f"🔌 Attached to browser daemon in {time.perf_counter() - start:.2f}s")
+    else:
+        browser = webdriver.Chrome(service=service, options=build_options(profile_dir, lean=lean))
+        browser.attached_to_daemon = False
+        logging.info(f"🚀 Started Chrome in {time.perf_counter() - start:.2f}s")
+
+    if lean:
+        block_resources(browser)
+    return browser
+
+
+def close_browser(browser):
+    """Quit an owned browser; only detach the driver from a shared daemon."""
+    if getattr(browser, "attached_to_daemon", False):
+        browser.service.stop()
+    else:
+        browser.quit()
+
+
+# --- Pool sizing metrics ---
+def browser_memory_mb(browser):
+    """
+    Resident memory of every Chrome process started for this driver, in MB.
+    Needs psutil; falls back to the page's JS heap for attached daemons.
+    """
+    process = getattr(browser.service, "process", None)
+    if psutil is not None and process is not None and not getattr(browser, "attached_to_daemon", False):
+        try:
+            driver = psutil.Process(process.pid)
+            rss = sum(p.memory_info().rss for p in driver.children(recursive=True))
+            return rss / (1024 * 1024)
+        except psutil.Error:
+            pass
+    metrics = browser.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics", [])
+    heap = next((m["value"] for m in metrics if m["name"] == "JSHeapTotalSize"), 0)
+    return heap / (1024 * 1024)
+
+
+def page_load_ms(browser):
+    """Load time of the current document from the Navigation Timing API."""
+    return browser.execute_script(
+        "const n = performance.getEntriesByType('navigation')[0];"
+        "return n ? n.loadEventEnd - n.startTime : null;"
+    )
+
+
+def log_browser_metrics(browser, label):
+    memory = browser_memory_mb(browser)
+    load_ms = page_load_ms(browser)
+    load_text = f"{load_ms:.0f} ms" if load_ms else "n/a"
+    logging.info(f"📊 {label}: memory {memory:.0f} MB, page load {load_text}")
+    return {"label": label, "memory_mb": round(memory, 1), "page_load_ms": load_ms}
+
+
+def measure_profiles(url):
+    """Load ``url`` in a lean and a full browser and print memory / load time of each."""
+    rows = []
+    for lean in (True, False):
+        browser = create_browser(profile_dir=f"{PROFILE_DIR}_measure", attach=False, lean=lean)
+        try:
+            browser.get(url)
+            time.sleep(2)
+            rows.append(log_browser_metrics(browser, "lean" if lean else "full"))
+        finally:
+            browser.quit()
+    for row in rows:
+        print(f"{row['label']:>5}: {row['memory_mb']:>7.1f} MB  page load {row['page_load_ms']} ms")
+    return rows
+
+
+# --- Session reuse ---
+def save_cookies(browser, path=COOKIES_FILE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(browser.get_cookies(), f)
+
+
+def load_cookies(browser, path=COOKIES_FILE):
+    """Restore exported cookies. The browser must already be on linkedin.com."""
+    if not os.path.exists(path):
+        return False
+    with open(path, "r", encoding="utf-8") as f:
+        cookies = json.load(f)
+    for cookie in cookies:
+        cookie.pop("sameSite", None)
+        try:
+            browser.add_cookie(cookie)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not restore cookie {cookie.get('name')}: {e}")
+    return True
+
+
+def has_valid_session(browser):
+    """True when the browser can reach the feed without being sent to a login wall."""
+    if not browser.get_cookie(SESSION_COOKIE):
+        return False
+    browser.get(f"{LINKEDIN_URL}/feed/")
+    url = browser.current_url
+    return not any(marker in url for marker in ("login", "authwall", "checkpoint", "signup"))
+
+
+def restore_session(browser, cookies_path=COOKIES_FILE):
+    """Try the profile's own session first, then the exported cookie jar."""
+    browser.get(LINKEDIN_URL)
+    if has_valid_session(browser):
+        return True
+    if load_cookies(browser, cookies_path):
+        browser.get(LINKEDIN_URL)
+        return has_valid_session(browser)
+    return False
+
+
+# --- Long-lived browser daemon ---
+def run_daemon(profile_dir=PROFILE_DIR, port=DAEMON_PORT):
+    """Keep a warm Chrome open so scraper runs can attach instead of starting one."""
+    browser = webdriver.Chrome(
+        service=Service(get_driver_path()),
+        options=build_options(profile_dir, debugging_port=port),
+    )
+    if LEAN_PROFILE:
+        block_resources(browser)
+    print(f"🟢 Browser daemon listening on 127.0.0.1:{port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        browser.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Browser session helpers for the LinkedIn scraper.")
+    parser.add_argument("--daemon", action="store_true", help="Start a long-lived browser for scraper runs to attach to.")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    parser.add_argument("--profile", default=PROFILE_DIR)
+    parser.add_argument("--measure", metavar="URL", help="Compare memory and page-load time of the lean and full profiles.")
+    args = parser.parse_args()
+
+    if args.daemon:
+        run_daemon(args.profile, args.port)
+    elif args.measure:
+        measure_profiles(args.measure)
+    else:
+        parser.print_help()
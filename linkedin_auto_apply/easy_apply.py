@@ -0,0 +1,418 @@
+import argparse
+import json
+import logging
+import queue
+import os
+import random
+import re
+import shutil
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support import expected_conditions as EC
+
+import browser_session
+import user_store
+from job_scrap_extracted import session_paths, login
+from job_store import JobStore
+
+# LinkedIn starts throttling well before this; tune per account.
+APPLICATIONS_PER_HOUR = 25
+BURST = 3
+MAX_FORM_STEPS = 10
+
+NEXT_BUTTON_LABELS = ("Continue to next step", "Review your application")
+SUBMIT_BUTTON_LABEL = "Submit application"
+
+
+# --- Rate limiting ---
+class TokenBucket:
+    """
+    Thread-safe token bucket: ``rate_per_hour`` tokens refill continuously up
+    to ``capacity``; ``acquire`` blocks until a token is available. A little
+    jitter keeps a pool of workers from firing in lock-step.
+    """
+
+    def __init__(self, rate_per_hour=APPLICATIONS_PER_HOUR, capacity=BURST, jitter_s=2.0):
+        self.rate = rate_per_hour / 3600.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.jitter_s = jitter_s
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    wait_s = 0
+                else:
+                    wait_s = (1 - self.tokens) / self.rate
+            if wait_s == 0:
+                if self.jitter_s:
+                    time.sleep(random.uniform(0, self.jitter_s))
+                return True
+            if stop is not None and stop.wait(min(wait_s, 5)):
+                return False
+            if stop is None:
+                time.sleep(min(wait_s, 5))
+
+
+# --- Answers from the user's profile ---
+def answer_for(label, config):
+    """Answer to a form question from the config.yaml profile, or None when unknown."""
+    text = label.lower()
+    prefs = config.get("job_preferences", {})
+    info = config.get("additional_info", {})
+
+    for language, proficiency in (config.get("languages") or {}).items():
+        if language.lower() in text:
+            return proficiency
+    if "notice" in text:
+        return config.get("notice_period")
+    if any(word in text for word in ("salary", "ctc", "compensation", "pay expectation")):
+        return config.get("salary_range_inr")
+    if "sponsor" in text:
+        return info.get("requires_sponsorship")
+    if any(word in text for word in ("authoriz", "legally", "work permit")):
+        return info.get("legal_authorization")
+    if "experience" in text or "years" in text:
+        return str(prefs.get("years_of_experience", ""))
+    if "email" in text:
+        return config.get("linkedin", {}).get("email")
+    if "gender" in text:
+        return info.get("gender")
+    if "ethnic" in text or "race" in text:
+        return info.get("ethnicity")
+    if "disab" in text:
+        return info.get("disability")
+    return None
+
+
+# Proficiency words users type in the profile → words LinkedIn uses in its options
+PROFICIENCY_SYNONYMS = {
+    "fluent": ("native", "bilingual", "professional", "fluent"),
+    "native": ("native", "bilingual"),
+    "advanced": ("professional", "advanced", "fluent"),
+    "intermediate": ("conversational", "intermediate", "limited working"),
+    "basic": ("elementary", "basic", "conversational"),
+    "beginner": ("elementary", "basic"),
+}
+
+YES_ANSWERS = ("yes", "y", "true")
+NO_ANSWERS = ("no", "n", "false", "none", "not")
+# Options for declining a voluntary self-identification question
+DECLINE_PHRASES = ("prefer not", "decline", "don't wish", "do not wish", "not to answer", "not to say")
+VOLUNTARY_QUESTIONS = ("disab", "gender", "ethnic", "race", "veteran")
+
+
+def _yes_no(answer):
+    """"yes" or "no" when a stored answer clearly starts with one, otherwise None (e.g. "4")."""
+    words = re.findall(r"[a-z]+", answer)
+    if not words:
+        return None
+    if words[0] in YES_ANSWERS:
+        return "yes"
+    if words[0] in NO_ANSWERS:
+        return "no"
+    return None
+
+
+def _is_decline(text):
+    text = text.lower().replace("\u2019", "'")
+    return any(phrase in text for phrase in DECLINE_PHRASES)
+
+
+def _decline(options, question):
+    """The "prefer not to answer" option of a voluntary question, or None."""
+    if not any(word in question.lower() for word in VOLUNTARY_QUESTIONS):
+        return None
+    return next((option for option in options if _is_decline(option)), None)
+
+
+def _choose(options, answer):
+    """
+    Pick the option text best matching a free-text answer (exact, synonym,
+    contains, then yes/no). Returns None when the answer does not clearly
+    fit any option, so the question is left for the user.
+    """
+    answer = str(answer).strip().lower()
+    lowered = [o.strip().lower() for o in options]
+    for i, option in enumerate(lowered):
+        if option == answer:
+            return options[i]
+    for word in PROFICIENCY_SYNONYMS.get(answer, ()):
+        for i, option in enumerate(lowered):
+            if word in option:
+                return options[i]
+    for i, option in enumerate(lowered):
+        # Short options such as Yes/No are only matched by the rule below.
+        if len(option) > 3 and (option in answer or answer in option):
+            return options[i]
+    if _is_decline(answer):
+        return next((option for option in options if _is_decline(option)), None)
+    reading = _yes_no(answer)
+    for i, option in enumerate(lowered):
+        if option == reading:
+            return options[i]
+    return None
+
+
+def _label(dialog, field):
+    field_id = field.get_attribute("id")
+    if field_id:
+        labels = dialog.find_elements(By.CSS_SELECTOR, f"label[for='{field_id}']")
+        if labels and labels[0].text.strip():
+            return labels[0].text.strip()
+    return field.get_attribute("aria-label") or field.get_attribute("name") or ""
+
+
+def fill_step(dialog, config):
+    """Fill every visible, empty field of the current step; returns the questions left unanswered."""
+    unanswered = []
+
+    for field in dialog.find_elements(By.CSS_SELECTOR, "input[type='text'], input[type='number'], input[type='tel'], textarea"):
+        if not field.is_displayed() or field.get_attribute("value"):
+            continue
+        label = _label(dialog, field)
+        answer = answer_for(label, config)
+        if answer:
+            field.send_keys(str(answer))
+        elif field.get_attribute("required") or field.get_attribute("aria-required") == "true":
+            unanswered.append(label)
+
+    for element in dialog.find_elements(By.TAG_NAME, "select"):
+        if not element.is_displayed():
+            continue
+        select = Select(element)
+        options = [o.text for o in select.options][1:]  # first entry is the "Select an option" placeholder
+        if select.first_selected_option.text in options:
+            continue
+        label = _label(dialog, element)
+        answer = answer_for(label, config)
+        choice = _choose(options, answer) if answer else _decline(options, label)
+        if choice:
+            select.select_by_visible_text(choice)
+        else:
+            unanswered.append(label)
+
+    for fieldset in dialog.find_elements(By.TAG_NAME, "fieldset"):
+        radios = fieldset.find_elements(By.CSS_SELECTOR, "input[type='radio']")
+        if not radios or not fieldset.is_displayed() or any(r.is_selected() for r in radios):
+            continue
+        legend = fieldset.find_elements(By.TAG_NAME, "legend")
+        question = legend[0].text.strip() if legend else ""
+        answer = answer_for(question, config)
+        labels = {_label(fieldset, r): r for r in radios}
+        choice = _choose(list(labels), answer) if answer else _decline(list(labels), question)
+        if choice:
+            radio = labels[choice]
+            fieldset.find_element(By.CSS_SELECTOR, f"label[for='{radio.get_attribute('id')}']").click()
+        else:
+            unanswered.append(question)
+
+    return unanswered
+
+
+def _button(dialog, label):
+    buttons = dialog.find_elements(By.CSS_SELECTOR, f"button[aria-label='{label}']")
+    return buttons[0] if buttons and buttons[0].is_displayed() else None
+
+
+# --- One application ---
+def apply_to_job(browser, posting, config, dry_run=False):
+    """Open a posting, walk its Easy Apply form and return an outcome record."""
+    start = time.perf_counter()
+    record = {"Job ID": posting["Job ID"], "Job Title": posting.get("Job Title"), "steps": 0}
+    try:
+        browser.get(f"{browser_session.LINKEDIN_URL}/jobs/view/{posting['Job ID']}/")
+        button = WebDriverWait(browser, 10).until(
+            EC.element_to_be_clickable((By.CLASS_NAME, "jobs-apply-button"))
+        )
+        if "easy apply" not in button.text.lower():
+            record["outcome"] = "external"
+            return record
+        button.click()
+        dialog = WebDriverWait(browser, 10).until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, "div[role='dialog']"))
+        )
+
+        for _ in range(MAX_FORM_STEPS):
+            record["steps"] += 1
+            unanswered = fill_step(dialog, config)
+            if unanswered:
+                record["outcome"] = "needs_input"
+                record["unanswered"] = unanswered
+                return record
+
+            submit = _button(dialog, SUBMIT_BUTTON_LABEL)
+            if submit:
+                if dry_run:
+                    record["outcome"] = "dry_run"
+                    return record
+                submit.click()
+                WebDriverWait(browser, 10).until(
+                    EC.text_to_be_present_in_element((By.TAG_NAME, "body"), "application was sent")
+                )
+                record["outcome"] = "applied"
+                return record
+
+            next_button = next((b for b in (_button(dialog, l) for l in NEXT_BUTTON_LABELS) if b), None)
+            if next_button is None:
+                record["outcome"] = "stuck"
+                return record
+            next_button.click()
+            time.sleep(0.5)
+
+        record["outcome"] = "too_many_steps"
+        return record
+    except Exception as e:
+        record["outcome"] = "error"
+        record["error"] = str(e).splitlines()[0] if str(e) else type(e).__name__
+        return record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 2)
+
+
+# --- Worker pool ---
+# Chrome's per-process locks and caches are not worth copying into a worker profile
+PROFILE_COPY_IGNORE = shutil.ignore_patterns("Singleton*", "*.lock", "lockfile", "Cache", "Code Cache", "GPUCache")
+
+
+def _worker_browser(email, password, worker_id):
+    """
+    A browser on its own copy of the user's profile (Chrome locks a profile
+    per process), made on first use; the session is restored from the
+    user's cookies, logging in again only when they have expired.
+    """
+    profile_dir, cookies_path = session_paths(email)
+    worker_dir = f"{profile_dir}_worker{worker_id}"
+    if not os.path.exists(worker_dir) and os.path.isdir(profile_dir):
+        shutil.copytree(profile_dir, worker_dir, ignore=PROFILE_COPY_IGNORE)
+    browser = browser_session.create_browser(profile_dir=worker_dir, attach=False)
+    if not browser_session.restore_session(browser, cookies_path):
+        login(browser, email, password)
+        WebDriverWait(browser, 30).until(lambda b: b.get_cookie(browser_session.SESSION_COOKIE))
+    return browser
+
+
+def run_executor(config, postings, workers=2, rate_per_hour=APPLICATIONS_PER_HOUR,
+                 dry_run=False, store=None, log_path=None, make_browser=None):
+    """
+    Apply to ``postings`` with ``workers`` browsers sharing one token bucket.
+    Every attempt is appended to ``log_path`` (JSONL) with timing and
+    outcome; successful ones are marked ``Applied`` in the job store. A
+    worker whose browser cannot start leaves its share to the others; when
+    none could start, every posting is recorded as ``failed`` with the error
+    (they stay ``Approved`` in the store for the next run).
+    """
+    email = config["linkedin"]["email"]
+    user = user_store.normalize_email(email)  # job store key
+    make_browser = make_browser or (lambda worker_id: _worker_browser(email, config["linkedin"]["password"], worker_id))
+    log_path = log_path or str(user_store.user_dir(email) / "applications.jsonl")
+    bucket = TokenBucket(rate_per_hour)
+    pending = queue.Queue()
+    for posting in postings:
+        pending.put(posting)
+    log_lock = threading.Lock()
+    stop = threading.Event()
+    records = []
+    started = {"pending": workers, "running": 0}
+    started_lock = threading.Lock()
+
+    def log_record(record):
+        with log_lock:
+            records.append(record)
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def work(worker_id):
+        try:
+            browser = make_browser(worker_id)
+        except Exception as e:
+            error = str(e).splitlines()[0] if str(e) else type(e).__name__
+            logging.error(f"❌ Worker {worker_id} could not start a browser: {error}")
+            with started_lock:
+                started["pending"] -= 1
+                last = started["pending"] == 0 and started["running"] == 0
+            if last:
+                # Nobody is left to take the queue
+                while True:
+                    try:
+                        posting = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    log_record({"Job ID": posting["Job ID"], "Job Title": posting.get("Job Title"), "steps": 0,
+                                "outcome": "failed", "error": f"browser start failed: {error}", "seconds": 0.0,
+                                "worker": worker_id, "finished_at": time.time()})
+            return
+        with started_lock:
+            started["pending"] -= 1
+            started["running"] += 1
+        try:
+            while not stop.is_set():
+                try:
+                    posting = pending.get_nowait()
+                except queue.Empty:
+                    return
+                if not bucket.acquire(stop):
+                    return
+                record = apply_to_job(browser, posting, config, dry_run=dry_run)
+                record["worker"] = worker_id
+                record["finished_at"] = time.time()
+                logging.info(f"📨 {record['outcome']}: {posting.get('Job Title')} ({record['seconds']}s)")
+                log_record(record)
+                if store is not None and record["outcome"] == "applied":
+                    store.set_status(user, posting["Job ID"], "Applied")
+        finally:
+            browser_session.close_browser(browser)
+
+    threads = [threading.Thread(target=work, args=(i,), daemon=True) for i in range(workers)]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        stop.set()
+    return records
+
+
+def summarize(records):
+    outcomes = {}
+    for record in records:
+        outcomes[record["outcome"]] = outcomes.get(record["outcome"], 0) + 1
+    seconds = sorted(r["seconds"] for r in records)
+    return {
+        "attempts": len(records),
+        "outcomes": outcomes,
+        "median_seconds": seconds[len(seconds) // 2] if seconds else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Easy Apply to approved postings from the job store.")
+    parser.add_argument("--user", required=True, help="Email of a user configured in the app.")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--per-hour", type=float, default=APPLICATIONS_PER_HOUR)
+    parser.add_argument("--limit", type=int, help="Apply to at most this many postings.")
+    parser.add_argument("--dry-run", action="store_true", help="Fill forms but do not submit.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    config = user_store.load_config(args.user)
+    store = JobStore()
+    postings = store.postings_with_status(user_store.normalize_email(args.user), "Approved")[:args.limit]
+    print(f"🚀 Applying to {len(postings)} approved postings with {args.workers} workers at {args.per_hour}/hour")
+    records = run_executor(config, postings, args.workers, args.per_hour, args.dry_run, store)
+    print(json.dumps(summarize(records), indent=2))
+
+
+if __name__ == "__main__":
+    main()
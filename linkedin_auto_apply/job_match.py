@@ -1,18 +1,11 @@
 import streamlit as st
 import pandas as pd
 import yaml 
-import threading
-import requests
 import logging
-from docx import Document
-import os
-import json
-import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from langchain_community.chat_models import ChatOllama
-from langchain.schema import HumanMessage
 import os
+from job_scoring import load_resume_text, build_job_description, score_match, MODEL_SOURCES
+from job_store import JobStore
+import user_store
 
 # -----------------------------------
 # Logging setup
@@ -25,9 +18,41 @@ logging.basicConfig(
 # -----------------------------------
 st.set_page_config("Job Match Assistant", layout="wide")
 
+# Streamlit re-executes this script on every click; keep the resume text and the
+# scores for unchanged (job, resume) pairs across reruns and sessions.
+# (HTTP connections to Ollama and HuggingFace are pooled process-wide by llm_gateway.)
+load_resume_text = st.cache_data(show_spinner=False)(load_resume_text)
+
+class UncachedScore(Exception):
+    """Carries a fallback score out of the cached function; st.cache_data does not store raised results."""
+
+@st.cache_data(show_spinner=False)
+def cached_model_score(job_desc, resume_text):
+    match_pct, reason, source = score_match(job_desc, resume_text)
+    if source not in MODEL_SOURCES:
+        raise UncachedScore(match_pct, reason)
+    return match_pct, reason
+
+def get_match_percentage(job_desc, resume_text):
+    """Only model replies are cached, so a TF-IDF or failed score during an outage is retried on the next run."""
+    try:
+        return cached_model_score(job_desc, resume_text)
+    except UncachedScore as e:
+        return e.args
+
+@st.cache_resource
+def get_job_store():
+    return JobStore()
+
+# --- Current user (set by the configuration page), else the legacy single-user files ---
+user_email = st.session_state.get("user_email")
+CONFIG_PATH = user_store.config_path(user_email) if user_email else "config.yaml"
+JOBS_CSV = user_store.jobs_csv(user_email) if user_email else "linkedin_scraped_jobs.csv"
+UPDATED_CSV = user_store.user_dir(user_email) / "linkedin_scrapejobs_updated.csv" if user_email else "linkedin_scrapejobs_updated.csv"
+
 # --- Load config and resume ---
 def load_config_and_resume():
-    with open("config.yaml", "r") as f:
+    with open(CONFIG_PATH, "r") as f:
         config = yaml.safe_load(f)
     resume_path = config["resume_filename"].replace("\\", "/")
 
@@ -36,8 +61,7 @@ def load_config_and_resume():
         st.error(f"❌ Resume file not found: {resume_path}")
         st.stop()
 
-    doc = Document(resume_path)
-    resume_text = "\n".join([p.text for p in doc.paragraphs if p.text.strip()])
+    resume_text = load_resume_text(resume_path)
     logging.info("Loaded config and resume successfully.")
     return config, resume_text
 
@@ -45,10 +69,11 @@ config, resume_text = load_config_and_resume()
 
 # --- Load job data ---
 @st.cache_data
-def load_jobs():
+def load_jobs(jobs_csv):
     try:
-        df = pd.read_csv("linkedin_scraped_jobs.csv")
-        logging.info("✅ Job data loaded from 'linkedin_scrapejobs.csv'.")
+        # Job IDs are LinkedIn's numeric ids or "N/A"; read as text so they never become floats
+        df = pd.read_csv(jobs_csv, dtype={"Job ID": str})
+        logging.info(f"✅ Job data loaded from '{jobs_csv}'.")
     except Exception as e:
         logging.error(f"❌ Failed to load job CSV: {e}")
         st.error(f"❌ Failed to load job CSV: {e}")
@@ -58,110 +83,7 @@ def load_jobs():
         df['Status'] = 'Not Selected'
     return df
 
-df = load_jobs()
-
-# --- Build job description for AI ---
-def build_job_description(row):
-    return row.get("About", "").strip()
-
-# --- LangChain + Ollama match scoring ---
-def get_match_percentage(job_description, resume_text):
-    prompt = f"""
-You are an AI assistant that evaluates how well a resume matches a job description.
-Only compare the job description and resume.
-
-Give a match percentage (0-100), explain reasoning, list strengths and weaknesses.
-
-Job Description:
-{job_description}
-
-Resume:
-{resume_text}
-
-Respond in JSON format like:
-{{ "match_percentage": 80 (give match percentage here), "reason": "Your resume matches well because... (donot include match percentage give reasons for why the resume is match for the job )" }}
-"""
-    result = {}
-    logging.info("🔍 Calling LangChain + Ollama for match scoring...")
-
-    def call_ollama():
-        try:
-            chat = ChatOllama(model="mistral") 
-            messages = [HumanMessage(content=prompt)]
-            response = chat(messages)
-            result["response"] = response
-            logging.info("✅ Ollama response received.")
-        except Exception as e:
-            result["error"] = str(e)
-            logging.error(f"❌ Ollama failed: {e}")
-
-    thread = threading.Thread(target=call_ollama)
-    thread.start()
-    thread.join(timeout=300)  
-
-    if not thread.is_alive() and "response" in result:
-        try:
-            reply_content = result["response"].content.strip()
-            parsed = json.loads(reply_content)
-            return parsed.get("match_percentage", 0), parsed.get("reason", reply_content)
-        except Exception as e:
-            logging.warning(f"⚠️ Ollama response parsing failed: {e}")
-            return 0, result["response"].content.strip()
-
-    logging.warning("⚠️ Ollama timeout/failure. Falling back to HuggingFace.")
-
-    
-    headers = {
-    "Authorization": f"Bearer {os.getenv('Token')}"
-}
-    api_url = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.1"
-
-    try:
-        response = requests.post(api_url, headers=headers, json={"inputs": prompt}, timeout=60)
-        response.raise_for_status()
-        json_response = response.json()
-
-        if isinstance(json_response, list) and "generated_text" in json_response[0]:
-            generated = json_response[0]["generated_text"]
-        else:
-            generated = str(json_response)
-
-        match_percentage = 0
-        reason = generated.strip()
-
-        if generated.strip().startswith("{"):
-            try:
-                parsed = json.loads(generated)
-                match_percentage = parsed.get("match_percentage", 0)
-                reason = parsed.get("reason", generated)
-            except:
-                pass
-        if match_percentage == 0:
-            match = re.search(r'match_percentage[":\s]*([0-9]+)', generated)
-            if match:
-                match_percentage = int(match.group(1))
-
-        return match_percentage, reason
-
-    except Exception as e:
-        logging.error(f"❌ HuggingFace fallback failed: {e}")
-        logging.info("🔁 Falling back to basic text similarity model.")
-
-        # --- Basic fallback using cosine similarity ---
-        try:
-            vectorizer = TfidfVectorizer(stop_words='english')
-            tfidf_matrix = vectorizer.fit_transform([resume_text, job_description])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            match_score = int(similarity * 100)
-
-            reason = (
-                "⚠️ Both LangChain + Ollama and HuggingFace failed. "
-                f"Used fallback TF-IDF cosine similarity which gave a match score of {match_score}%."
-            )
-            return match_score, reason
-        except Exception as e:
-            logging.error(f"❌ TF-IDF fallback also failed: {e}")
-            return 0, "⚠️ All methods failed (LangChain + Ollama, HuggingFace, and text similarity)."
+df = load_jobs(str(JOBS_CSV))
 
 # --- Streamlit UI ---
 st.title("🧠 Smart LLM-Powered Job Matcher")
@@ -170,8 +92,12 @@ applied_indices = []
 
 for idx, row in df.iterrows():
     with st.expander(f"📄 {row['Job Title']} at {row['Company and Location']}"):
-        job_desc = build_job_description(row)
-        match_pct, reason = get_match_percentage(job_desc, resume_text)
+        if pd.notna(row.get("Match Score")):
+            # Already scored by the streaming pipeline in linkedin_user_input.py
+            match_pct, reason = int(row["Match Score"]), row.get("Reason", "")
+        else:
+            job_desc = build_job_description(row)
+            match_pct, reason = get_match_percentage(job_desc, resume_text)
 
         st.markdown(f"**🔢 Match Score:** {match_pct}%")
         st.markdown(f"**📝 Reason:** _{reason}_")
@@ -181,8 +107,18 @@ for idx, row in df.iterrows():
             if st.button(f"✅ Apply Now", key=f"apply_{idx}"):
                 df.at[idx, "Status"] = "Applied"
                 applied_indices.append(idx)
-                logging.info(f"📌 Marked as Applied: {row['Job Title']} at {row['Company and Location']}")
-                st.success("✅ Marked as Applied")
+                queued = False
+                if user_email and pd.notna(row.get("Job ID")):
+                    # Queued for easy_apply.py, which submits approved postings
+                    queued = get_job_store().set_status(user_store.normalize_email(user_email), str(row["Job ID"]), "Approved") > 0
+                logging.info(f"📌 Marked as Applied: {row['Job Title']} at {row['Company and Location']}"
+                             f"{' (queued for Easy Apply)' if queued else ''}")
+                if queued:
+                    st.success("✅ Queued for Easy Apply")
+                else:
+                    st.success("✅ Marked as Applied")
+                    if user_email:
+                        st.warning("⚠️ This posting is not in the job store, so it was not queued for Easy Apply.")
         else:
             df.at[idx, "Status"] = "Rejected"
             logging.info(f"🚫 Rejected job due to low score: {row['Job Title']} at {row['Company and Location']}")
@@ -190,6 +126,6 @@ for idx, row in df.iterrows():
 
 # --- Save Updates ---
 if applied_indices:
-    df.to_csv("linkedin_scrapejobs_updated.csv", index=False)
-    st.success("📁 Job statuses saved to 'linkedin_scrapejobs_updated.csv'")
+    df.to_csv(UPDATED_CSV, index=False)
+    st.success(f"📁 Job statuses saved to '{UPDATED_CSV}'")
     logging.info("📁 Job statuses updated and saved to CSV.")
\ No newline at end of file
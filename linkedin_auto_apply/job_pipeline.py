@@ -0,0 +1,345 @@
+import argparse
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import yaml
+
+from job_scrap_extracted import scrape_jobs
+from job_scoring import load_resume_text, build_job_description, score_match, MODEL_SOURCES
+from job_store import JobStore, text_hash
+import user_store
+
+CONFIG_YAML = "config.yaml"
+MATCH_THRESHOLD = 40
+
+# Sentinel pushed through the queues when a producer is finished.
+_DONE = object()
+
+
+# --- Stage timing ---
+class StageTimer:
+    """
+    Busy time, wall time and item count per pipeline stage. Busy time sums
+    the work of every worker in a stage, wall time runs from its first to
+    its last item, so overlapping stages show up as wall < sum of busy.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def track(self, stage, items=1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                stat = self.stats.setdefault(stage, {"items": 0, "busy_s": 0.0, "first": start, "last": end})
+                stat["items"] += items
+                stat["busy_s"] += end - start
+                stat["first"] = min(stat["first"], start)
+                stat["last"] = max(stat["last"], end)
+
+    def timed(self, stage, iterable):
+        """Yield from ``iterable``, charging the time spent producing each item to ``stage``."""
+        iterator = iter(iterable)
+        while True:
+            with self.track(stage, items=0):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            with self.lock:
+                self.stats[stage]["items"] += 1
+            yield item
+
+    def report(self):
+        rows = []
+        for stage, stat in self.stats.items():
+            rows.append({
+                "stage": stage,
+                "items": stat["items"],
+                "busy_s": round(stat["busy_s"], 3),
+                "wall_s": round(stat["last"] - stat["first"], 3),
+                "avg_s": round(stat["busy_s"] / stat["items"], 3) if stat["items"] else None,
+            })
+        return rows
+
+    def format_report(self):
+        lines = [f"{'stage':<10}{'items':>7}{'busy s':>10}{'wall s':>10}{'avg s':>9}"]
+        for row in self.report():
+            avg = f"{row['avg_s']:.3f}" if row["avg_s"] is not None else "-"
+            lines.append(f"{row['stage']:<10}{row['items']:>7}{row['busy_s']:>10.2f}{row['wall_s']:>10.2f}{avg:>9}")
+        return "\n".join(lines)
+
+
+# --- Concurrency between stages ---
+def threaded(iterable, maxsize=8, stop=None):
+    """
+    Run ``iterable`` in a background thread and yield its items through a
+    bounded queue, so the upstream stage keeps producing while downstream
+    stages work. Exceptions are re-raised in the consumer.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = stop or threading.Event()
+
+    def put(item):
+        # Block on a full queue, but give up once the consumer has gone away.
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as e:
+            logging.error(f"❌ Pipeline stage failed: {e}")
+            put(e)
+        finally:
+            put(_DONE)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+# --- Stages ---
+def configure(config_path=CONFIG_YAML, user=None):
+    """Load a user's saved configuration (or a config file) and the text of its resume."""
+    if user:
+        config = user_store.load_config(user)
+    else:
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f)
+    resume_path = config["resume_filename"].replace("\\", "/")
+    if not os.path.exists(resume_path):
+        raise FileNotFoundError(f"Resume file not found: {resume_path}")
+    config["resume_text"] = load_resume_text(resume_path)
+    return config
+
+
+def scrape(config, browser=None, checkpoint=None, max_pages=1, store=None):
+    """Yield postings straight from the browser as they are extracted."""
+    linkedin = config.get("linkedin", {})
+    return scrape_jobs(linkedin.get("email"), linkedin.get("password"),
+                       browser=browser, checkpoint=checkpoint, max_pages=max_pages, store=store)
+
+
+def dedupe(postings, seen=None, timer=None):
+    """Drop postings whose job id (or title/company when there is none) was already passed on."""
+    seen = set() if seen is None else seen
+    timer = timer or StageTimer()
+    for posting in postings:
+        with timer.track("dedupe"):
+            key = posting.get("Job ID")
+            if not key or key == "N/A":
+                key = (posting.get("Job Title"), posting.get("Company and Location"))
+            duplicate = key in seen
+            seen.add(key)
+        if duplicate:
+            logging.info(f"♻️ Skipping duplicate posting: {posting.get('Job Title')}")
+            continue
+        yield posting
+
+
+def score(postings, resume_text, workers=2, timer=None, user=None, store=None):
+    """
+    Score postings on ``workers`` threads, yielding each one as soon as it is
+    scored (completion order) with ``Match Score`` and ``Reason`` filled in.
+
+    With a shared ``JobStore`` the LLM is only called for (user, job, resume)
+    combinations not scored before, and a ``Semantic Score`` from the cached
+    job embedding is added when sentence-transformers is available.
+    """
+    timer = timer or StageTimer()
+    resume_hash = text_hash(resume_text)
+    pending = queue.Queue(maxsize=workers * 2)
+    results = queue.Queue()
+    stop = threading.Event()
+
+    def feed():
+        try:
+            for posting in postings:
+                while not stop.is_set():
+                    try:
+                        pending.put(posting, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except Exception as e:
+            results.put(e)
+        finally:
+            for _ in range(workers):
+                # Once stopped nobody drains the queue; the consumer's cleanup unblocks the workers instead.
+                while not stop.is_set():
+                    try:
+                        pending.put(_DONE, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+
+    def work():
+        try:
+            while not stop.is_set():
+                posting = pending.get()
+                if posting is _DONE:
+                    break
+                try:
+                    with timer.track("score"):
+                        scored = {**posting, **score_one(posting, resume_text, resume_hash, user, store)}
+                except Exception as e:
+                    # Surfaced to the consumer like a feed error instead of silently ending this worker.
+                    results.put(e)
+                    break
+                results.put(scored)
+        finally:
+            results.put(_DONE)
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    threads += [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+
+    finished = 0
+    try:
+        while finished < workers:
+            item = results.get()
+            if item is _DONE:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        # Unblock workers still waiting on the feed.
+        for _ in range(workers):
+            try:
+                pending.put_nowait(_DONE)
+            except queue.Full:
+                break
+
+
+def score_one(posting, resume_text, resume_hash, user=None, store=None):
+    if store is None:
+        match_pct, reason, source = score_match(build_job_description(posting), resume_text)
+        return {"Match Score": match_pct, "Reason": reason, "Score Source": source}
+
+    try:
+        result = {"Semantic Score": store.semantic_score(posting, resume_text)}
+    except Exception as e:
+        logging.warning(f"⚠️ Job embedding failed: {e}")
+        result = {"Semantic Score": None}
+    cached = store.get_score(user, posting["Job ID"], resume_hash, MODEL_SOURCES)
+    if cached:
+        result["Match Score"], result["Reason"] = cached
+        return result
+    match_pct, reason, source = score_match(build_job_description(posting), resume_text)
+    # Fallback scores are not kept: apply() would otherwise reject the posting for good
+    if source in MODEL_SOURCES:
+        store.save_score(user, posting["Job ID"], resume_hash, match_pct, reason, source)
+    result["Match Score"], result["Reason"], result["Score Source"] = match_pct, reason, source
+    return result
+
+
+def apply(scored, threshold=MATCH_THRESHOLD, timer=None, user=None, store=None):
+    """Mark each scored posting as approved or rejected against the match threshold."""
+    timer = timer or StageTimer()
+    for posting in scored:
+        with timer.track("apply"):
+            posting["Status"] = "Approved" if posting["Match Score"] >= threshold else "Rejected"
+            if store is not None:
+                store.set_status(user, posting["Job ID"], posting["Status"])
+        yield posting
+
+
+# --- Orchestration ---
+def run_pipeline(config, browser=None, checkpoint=None, max_pages=1, workers=2,
+                 threshold=MATCH_THRESHOLD, timer=None, store=None):
+    """
+    Chain scrape → dedupe → score → apply in this process. Scraping runs in
+    its own thread behind a bounded queue and scoring on ``workers`` threads,
+    so all stages overlap; postings are handed between stages in memory.
+    """
+    timer = timer or StageTimer()
+    user = user_store.normalize_email(config["linkedin"]["email"]) if store is not None else None
+    postings = threaded(timer.timed("scrape", scrape(config, browser, checkpoint, max_pages, store)))
+    unique = dedupe(postings, timer=timer)
+    scored = score(unique, config["resume_text"], workers=workers, timer=timer, user=user, store=store)
+    yield from apply(scored, threshold, timer=timer, user=user, store=store)
+
+
+def stream_scored_postings(resume_text, email, password, max_queue=8, score_workers=2, browser=None, store=None):
+    """
+    Scrape postings and score them concurrently, yielding
+    ``(posting, match_pct, reason)`` as each one is scored.
+    """
+    config = {"linkedin": {"email": email, "password": password}}
+    postings = threaded(scrape(config, browser, store=store), maxsize=max_queue)
+    user = user_store.normalize_email(email) if store is not None else None
+    for posting in score(dedupe(postings), resume_text, workers=score_workers, user=user, store=store):
+        yield posting, posting["Match Score"], posting["Reason"]
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Run the scrape → dedupe → score → apply pipeline in one process.")
+    parser.add_argument("--config", default=CONFIG_YAML)
+    parser.add_argument("--user", help="Email of a user configured in the app; overrides --config.")
+    parser.add_argument("--no-store", action="store_true", help="Do not use the shared job store.")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threshold", type=int, default=MATCH_THRESHOLD)
+    parser.add_argument("--output", help="CSV of scored postings (default: the user's run directory).")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    timer = StageTimer()
+    with timer.track("configure"):
+        config = configure(args.config, args.user)
+    store = None if args.no_store else JobStore()
+    if args.output:
+        output = args.output
+    elif args.user:
+        output = str(user_store.new_run_dir(args.user) / "linkedin_scraped_jobs.csv")
+    else:
+        output = "linkedin_scraped_jobs.csv"
+
+    results = []
+    try:
+        for posting in run_pipeline(config, max_pages=args.pages, workers=args.workers,
+                                    threshold=args.threshold, timer=timer, store=store):
+            print(f"{posting['Match Score']:>4}%  {posting['Status']:<9} {posting['Job Title']} at {posting['Company and Location']}")
+            results.append(posting)
+    finally:
+        if results:
+            pd.DataFrame(results).to_csv(output, index=False)
+            print(f"✅ Saved {len(results)} postings to '{output}'")
+        print(timer.format_report())
+
+
+if __name__ == "__main__":
+    main()
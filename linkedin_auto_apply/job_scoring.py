@@ -0,0 +1,145 @@
+import logging
+import os
+import sys
+import json
+import re
+
+# llm_gateway.py sits at the repository root, shared with resume_maker.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_gateway import get_gateway
+from local_matcher import get_local_matcher, LocalMatcherError, MATCH_LOCAL_MODEL
+
+# Heavy stacks (sklearn, python-docx) are imported inside the code paths that
+# use them, so importing this module stays cheap.
+
+OLLAMA_MODEL = os.getenv("MATCH_OLLAMA_MODEL", "mistral")
+HF_MATCH_MODEL = os.getenv("MATCH_HF_MODEL", "mistralai/Mistral-7B-Instruct-v0.1")
+# score_match sources: a JSON reply parsed from a model, as opposed to scraped text or a fallback
+MODEL_SOURCES = ("local", "ollama", "hf")
+# The fine-tuned local matcher was trained on prompts cut to these lengths
+LOCAL_MAX_JOB_CHARS = 1200
+LOCAL_MAX_RESUME_CHARS = 2000
+
+MATCH_PROMPT = """
+You are an AI assistant that evaluates how well a resume matches a job description.
+Only compare the job description and resume.
+
+Give a match percentage (0-100), explain reasoning, list strengths and weaknesses.
+
+Job Description:
+{job_description}
+
+Resume:
+{resume_text}
+
+Respond in JSON format like:
+{{ "match_percentage": 80 (give match percentage here), "reason": "Your resume matches well because... (donot include match percentage give reasons for why the resume is match for the job )" }}
+"""
+
+
+# --- Load resume ---
+def load_resume_text(resume_path):
+    from docx import Document
+
+    doc = Document(resume_path)
+    return "\n".join([p.text for p in doc.paragraphs if p.text.strip()])
+
+# --- Build job description for AI ---
+def build_job_description(row):
+    return row.get("About", "").strip()
+
+def build_match_prompt(job_description, resume_text, max_job_chars=None, max_resume_chars=None):
+    return MATCH_PROMPT.format(
+        job_description=job_description[:max_job_chars].strip(), resume_text=resume_text[:max_resume_chars].strip()
+    )
+
+def parse_match_reply(reply):
+    """``(match_percentage, reason)`` from a JSON reply, or None when it is not valid JSON."""
+    try:
+        parsed = json.loads(reply)
+        return parsed.get("match_percentage", 0), parsed.get("reason", reply)
+    except (ValueError, AttributeError):
+        return None
+
+# --- Local matcher → Ollama → HuggingFace → TF-IDF match scoring ---
+def get_match_percentage(job_description, resume_text):
+    match_percentage, reason, _ = score_match(job_description, resume_text)
+    return match_percentage, reason
+
+def score_match(job_description, resume_text):
+    """
+    ``(match_percentage, reason, source)``. ``source`` names what produced the
+    score: one of ``MODEL_SOURCES`` for a parsed JSON reply, ``"ollama-raw"``
+    or ``"hf-raw"`` when the reply was not JSON, ``"tfidf"`` or ``"failed"``.
+    """
+    if MATCH_LOCAL_MODEL:
+        try:
+            local_prompt = build_match_prompt(job_description, resume_text, LOCAL_MAX_JOB_CHARS, LOCAL_MAX_RESUME_CHARS)
+            parsed = parse_match_reply(get_local_matcher().generate(local_prompt).strip())
+            if parsed is not None:
+                return (*parsed, "local")
+            logging.warning("⚠️ Local matcher reply was not valid JSON. Falling back to Ollama.")
+        except LocalMatcherError as e:
+            logging.error(f"❌ Local matcher failed: {e}")
+
+    prompt = build_match_prompt(job_description, resume_text)
+    gateway = get_gateway()
+    logging.info("🔍 Calling Ollama for match scoring...")
+    try:
+        # A local server that is down will not come back within a retry; fall through quickly.
+        reply_content = gateway.ollama_chat(OLLAMA_MODEL, prompt, timeout=300, retries=1).strip()
+        logging.info("✅ Ollama response received.")
+        parsed = parse_match_reply(reply_content)
+        if parsed is None:
+            logging.warning("⚠️ Ollama response parsing failed: not valid JSON")
+            return 0, reply_content, "ollama-raw"
+        return (*parsed, "ollama")
+    except Exception as e:
+        logging.error(f"❌ Ollama failed: {e}")
+
+    logging.warning("⚠️ Ollama timeout/failure. Falling back to HuggingFace.")
+
+    try:
+        generated = gateway.hf_generate(HF_MATCH_MODEL, prompt, max_new_tokens=250, timeout=60)
+
+        match_percentage = 0
+        reason = generated.strip()
+        source = "hf-raw"
+
+        if generated.strip().startswith("{"):
+            try:
+                parsed = json.loads(generated)
+                match_percentage = parsed.get("match_percentage", 0)
+                reason = parsed.get("reason", generated)
+                source = "hf"
+            except:
+                pass
+        if match_percentage == 0:
+            match = re.search(r'match_percentage[":\s]*([0-9]+)', generated)
+            if match:
+                match_percentage = int(match.group(1))
+
+        return match_percentage, reason, source
+
+    except Exception as e:
+        logging.error(f"❌ HuggingFace fallback failed: {e}")
+        logging.info("🔁 Falling back to basic text similarity model.")
+
+        # --- Basic fallback using cosine similarity ---
+        try:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.metrics.pairwise import cosine_similarity
+
+            vectorizer = TfidfVectorizer(stop_words='english')
+            tfidf_matrix = vectorizer.fit_transform([resume_text, job_description])
+            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+            match_score = int(similarity * 100)
+
+            reason = (
+                "⚠️ Both LangChain + Ollama and HuggingFace failed. "
+                f"Used fallback TF-IDF cosine similarity which gave a match score of {match_score}%."
+            )
+            return match_score, reason, "tfidf"
+        except Exception as e:
+            logging.error(f"❌ TF-IDF fallback also failed: {e}")
+            return 0, "⚠️ All methods failed (LangChain + Ollama, HuggingFace, and text similarity).", "failed"
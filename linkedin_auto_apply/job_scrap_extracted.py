@@ -1,16 +1,20 @@
 import pandas as pd
 import re
 import time
-from selenium import webdriver
+import argparse
+import hashlib
+from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+import logging
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from tabulate import tabulate
 import os
 from dotenv import load_dotenv
+from scrape_checkpoint import ScrapeCheckpoint
+import browser_session
+import user_store
 
 # Load environment variables from .env file
 load_dotenv()
@@ -18,136 +22,275 @@ load_dotenv()
 EMAIL = os.getenv("LINKEDIN_EMAIL")
 PASSWORD = os.getenv("LINKEDIN_PASSWORD")
 
-service = Service(ChromeDriverManager().install())
-browser = webdriver.Chrome(service=service)
+OUTPUT_CSV = "linkedin_scraped_jobs.csv"
+JOBS_PER_PAGE = 25
 
-browser.get("https://www.linkedin.com")
 
-# Sign in
-signinwithemail = browser.find_element(By.CSS_SELECTOR, "a[data-test-id='home-hero-sign-in-cta']")
-signinwithemail.click()
+# --- Browser setup ---
+def session_paths(email=EMAIL):
+    """Chrome profile and cookie jar for an account; users never share a LinkedIn session."""
+    if not email or email == EMAIL:
+        return browser_session.PROFILE_DIR, browser_session.COOKIES_FILE
+    base = user_store.user_dir(email)
+    return str(base / "chrome_profile"), str(base / "linkedin_cookies.json")
 
-wait = WebDriverWait(browser, 10)
-username = wait.until(EC.presence_of_element_located((By.ID, "username")))
-username.send_keys(EMAIL)
 
-password = wait.until(EC.presence_of_element_located((By.ID, "password")))
-password.send_keys(PASSWORD)
+def create_browser(email=EMAIL):
+    # Cached driver binary + persistent profile; only the default account may attach to the browser daemon
+    profile_dir, _ = session_paths(email)
+    return browser_session.create_browser(profile_dir=profile_dir, attach=profile_dir == browser_session.PROFILE_DIR)
 
-login_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']")))
-login_button.click()
 
-browser.get("https://www.linkedin.com/jobs/")
+# --- Sign in ---
+def login(browser, email=EMAIL, password=PASSWORD):
+    browser.get(browser_session.LINKEDIN_URL)
 
-# Scroll and expand job list
-browser.execute_script("window.scrollTo(0, document.body.scrollHeight / 2);")
-time.sleep(2)
+    signinwithemail = browser.find_element(By.CSS_SELECTOR, "a[data-test-id='home-hero-sign-in-cta']")
+    signinwithemail.click()
+
+    wait = WebDriverWait(browser, 10)
+    username = wait.until(EC.presence_of_element_located((By.ID, "username")))
+    username.send_keys(email)
+
+    password_field = wait.until(EC.presence_of_element_located((By.ID, "password")))
+    password_field.send_keys(password)
+
+    login_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']")))
+    login_button.click()
+
+
+def ensure_logged_in(browser, email=EMAIL, password=PASSWORD):
+    """Reuse a still-valid session and only fall back to the login form when it has expired."""
+    start = time.perf_counter()
+    _, cookies_path = session_paths(email)
+    if browser_session.restore_session(browser, cookies_path):
+        logging.info(f"🔑 Reused LinkedIn session in {time.perf_counter() - start:.2f}s")
+        return
+    login(browser, email, password)
+    WebDriverWait(browser, 30).until(lambda b: b.get_cookie(browser_session.SESSION_COOKIE))
+    browser_session.save_cookies(browser, cookies_path)
+    logging.info(f"🔑 Logged in through the form in {time.perf_counter() - start:.2f}s")
+
+
+# --- Scroll and expand job list ---
+def open_job_list(browser):
+    browser.get(f"{browser_session.LINKEDIN_URL}/jobs/")
+
+    browser.execute_script("window.scrollTo(0, document.body.scrollHeight / 2);")
+    time.sleep(2)
 
-clicked = False
-try:
-    show_all_link = WebDriverWait(browser, 10).until(
-        EC.element_to_be_clickable((By.XPATH, "//a[.//span[text()='Show all']]"))
-    )
-    browser.execute_script("arguments[0].scrollIntoView(true);", show_all_link)
-    time.sleep(1)
-    show_all_link.click()
-    clicked = True
-except:
     try:
-        show_all_button = WebDriverWait(browser, 5).until(
-            EC.element_to_be_clickable((By.XPATH, "//button[.//span[text()='Show all']]"))
+        show_all_link = WebDriverWait(browser, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//a[.//span[text()='Show all']]"))
         )
-        browser.execute_script("arguments[0].scrollIntoView(true);", show_all_button)
+        browser.execute_script("arguments[0].scrollIntoView(true);", show_all_link)
         time.sleep(1)
-        show_all_button.click()
-        clicked = True
+        show_all_link.click()
     except:
-        pass
-
-# Scroll to load job cards
-try:
-    first_card = WebDriverWait(browser, 10).until(
-        EC.presence_of_element_located((By.CLASS_NAME, "job-card-container"))
-    )
-    first_card.click()
-except:
-    print("Could not click first job.")
-
-for _ in range(15):
-    browser.execute_script("window.scrollBy(0, 600);")
-    time.sleep(1)
-
-# Extract job titles
-job_elements = WebDriverWait(browser, 10).until(
-    EC.presence_of_all_elements_located((By.CLASS_NAME, "flex-grow-1"))
-)
-job_data_blocks = [el.text.strip() for el in job_elements if el.text.strip()]
-job_titles = [block.split("\\n")[0] for block in job_data_blocks]
-
-# Extract company names and locations
-company_elements = browser.find_elements(By.CLASS_NAME, "artdeco-entity-lockup__subtitle")
-comp_name = [el.text.strip() for el in company_elements if el.text.strip()]
-
-# Loop to extract about and apply links
-about_details = []
-apply_links = []
-job_cards = browser.find_elements(By.CLASS_NAME, "job-card-container")
-
-for index in range(len(job_cards)):
+        try:
+            show_all_button = WebDriverWait(browser, 5).until(
+                EC.element_to_be_clickable((By.XPATH, "//button[.//span[text()='Show all']]"))
+            )
+            browser.execute_script("arguments[0].scrollIntoView(true);", show_all_button)
+            time.sleep(1)
+            show_all_button.click()
+        except:
+            pass
+
+    load_job_cards(browser)
+
+
+# --- Scroll to load job cards ---
+def load_job_cards(browser):
     try:
-        job_cards = browser.find_elements(By.CLASS_NAME, "job-card-container")
-        browser.execute_script("arguments[0].scrollIntoView();", job_cards[index])
-        time.sleep(0.5)
-        job_cards[index].click()
+        first_card = WebDriverWait(browser, 10).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "job-card-container"))
+        )
+        first_card.click()
+    except:
+        print("Could not click first job.")
+
+    for _ in range(15):
+        browser.execute_script("window.scrollBy(0, 600);")
+        time.sleep(1)
+
 
-        about_element = WebDriverWait(browser, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "jobs-description__content"))
+def goto_page(browser, list_url, page):
+    """Open ``page`` (0-based) of the job list through its ``start`` parameter."""
+    parts = urlparse(list_url)
+    query = parse_qs(parts.query)
+    query["start"] = [str(page * JOBS_PER_PAGE)]
+    browser.get(urlunparse(parts._replace(query=urlencode(query, doseq=True))))
+    load_job_cards(browser)
+
+
+def _first_text(card, class_name):
+    """Return the first non-empty text of a child element of a job card."""
+    for el in card.find_elements(By.CLASS_NAME, class_name):
+        text = el.text.strip()
+        if text:
+            return text
+    return "N/A"
+
+
+def extract_apply_link(browser):
+    """Click the apply button of the open posting and return where it leads."""
+    try:
+        apply_button = WebDriverWait(browser, 5).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "jobs-apply-button"))
         )
-        about_text = about_element.text.strip().replace("\\n", " ")
-        about_details.append(about_text)
+        original_tab = browser.current_window_handle
+        apply_button.click()
+        time.sleep(2)
 
-        try:
-            apply_button = WebDriverWait(browser, 5).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "jobs-apply-button"))
-            )
-            original_tab = browser.current_window_handle
-            apply_button.click()
-            time.sleep(2)
-
-            all_tabs = browser.window_handles
-            if len(all_tabs) > 1:
-                browser.switch_to.window(all_tabs[1])
-                apply_url = browser.current_url
-                browser.close()
-                browser.switch_to.window(original_tab)
-            else:
-                apply_url = browser.current_url
-                try:
-                    close_button = WebDriverWait(browser, 5).until(
-                        EC.element_to_be_clickable((By.CLASS_NAME, "artdeco-modal__dismiss"))
-                    )
-                    close_button.click()
-                except:
-                    pass
-            apply_links.append(apply_url)
-        except:
-            apply_links.append("Not found")
+        all_tabs = browser.window_handles
+        if len(all_tabs) > 1:
+            browser.switch_to.window(all_tabs[1])
+            apply_url = browser.current_url
+            browser.close()
+            browser.switch_to.window(original_tab)
+        else:
+            apply_url = browser.current_url
+            try:
+                close_button = WebDriverWait(browser, 5).until(
+                    EC.element_to_be_clickable((By.CLASS_NAME, "artdeco-modal__dismiss"))
+                )
+                close_button.click()
+            except:
+                pass
+        return apply_url
     except:
-        about_details.append("N/A")
-        apply_links.append("N/A")
+        return "Not found"
+
+
+def _job_id(card, posting):
+    """LinkedIn's own job id when the card exposes it, else a stable hash of the card text."""
+    job_id = card.get_attribute("data-job-id")
+    if job_id:
+        return job_id
+    key = f"{posting['Job Title']}|{posting['Company and Location']}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+# --- Extract postings one card at a time ---
+def iter_postings(browser, checkpoint=None, max_pages=1, store=None):
+    """
+    Yield one posting dict per job card as soon as it has been extracted,
+    so consumers can start working before the whole list is scraped.
+
+    With a ``ScrapeCheckpoint`` every posting is written to disk before it is
+    yielded, scanning resumes at the saved page/offset and job ids captured
+    by an earlier run are skipped without being opened.
+
+    With a shared ``JobStore`` a posting another user already scraped is
+    served from the store instead of being opened again, and every newly
+    extracted posting is added to it.
+    """
+    list_url = browser.current_url
+    start_page = checkpoint.page if checkpoint else 0
+    browser_session.log_browser_metrics(browser, "job list")
+
+    for page in range(start_page, max_pages):
+        if page > 0:
+            goto_page(browser, list_url, page)
+            browser_session.log_browser_metrics(browser, f"job list page {page}")
+
+        job_cards = browser.find_elements(By.CLASS_NAME, "job-card-container")
+        if not job_cards:
+            break
+
+        start_offset = checkpoint.offset if checkpoint and page == start_page else 0
+        first_failed = None
 
-# Ensure lengths match
-min_len = min(len(job_titles), len(comp_name), len(about_details), len(apply_links))
+        for index in range(start_offset, len(job_cards)):
+            posting = {
+                "Job ID": "N/A",
+                "Job Title": "N/A",
+                "Company and Location": "N/A",
+                "About": "N/A",
+                "Apply Link": "N/A",
+            }
+            try:
+                job_cards = browser.find_elements(By.CLASS_NAME, "job-card-container")
+                card = job_cards[index]
+                browser.execute_script("arguments[0].scrollIntoView();", card)
+                time.sleep(0.5)
 
-df = pd.DataFrame({
-    "Job Title": job_titles[:min_len],
-    "Company and Location": comp_name[:min_len],
-    "About": about_details[:min_len],
-    "Apply Link": apply_links[:min_len]
-})
+                posting["Job Title"] = _first_text(card, "flex-grow-1").split("\n")[0]
+                posting["Company and Location"] = _first_text(card, "artdeco-entity-lockup__subtitle")
+                posting["Job ID"] = _job_id(card, posting)
+                if checkpoint and checkpoint.is_seen(posting["Job ID"]):
+                    continue
+                stored = store.get_posting(posting["Job ID"]) if store else None
+                if stored:
+                    # Already scraped for another user; no need to open the card.
+                    posting = stored
+                else:
+                    card.click()
 
-print(tabulate(df, headers='keys', tablefmt='fancy_grid', showindex=True))
-df.to_csv("linkedin_scraped_jobs.csv", index=False)
-print("✅ Saved to 'linkedin_scraped_jobs.csv'")
+                    about_element = WebDriverWait(browser, 10).until(
+                        EC.presence_of_element_located((By.CLASS_NAME, "jobs-description__content"))
+                    )
+                    posting["About"] = about_element.text.strip().replace("\n", " ")
+                    posting["Apply Link"] = extract_apply_link(browser)
+                    if store:
+                        store.save_posting(posting)
+            except Exception as e:
+                # Not recorded, so a restarted run retries this card; not yielded either, since an
+                # "N/A" posting would be scored on empty text and share one job id with every other failure.
+                logging.warning(f"⚠️ Skipping job card {index} on page {page}: {type(e).__name__}: {e}")
+                if first_failed is None:
+                    first_failed = index
+                continue
+
+            if checkpoint:
+                offset = first_failed if first_failed is not None else index + 1
+                checkpoint.record(posting["Job ID"], posting, page, offset)
+            yield posting
+
+        if checkpoint and first_failed is None:
+            checkpoint.advance(page + 1, 0)
+
+    if checkpoint:
+        checkpoint.finish()
+
+
+def scrape_jobs(email=EMAIL, password=PASSWORD, browser=None, checkpoint=None, max_pages=1, store=None):
+    """Log in, open the job list and yield postings as they are extracted."""
+    own_browser = browser is None
+    if own_browser:
+        browser = create_browser(email)
+    try:
+        ensure_logged_in(browser, email, password)
+        open_job_list(browser)
+        yield from iter_postings(browser, checkpoint=checkpoint, max_pages=max_pages, store=store)
+    finally:
+        if own_browser:
+            browser_session.close_browser(browser)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape LinkedIn job postings.")
+    parser.add_argument("--pages", type=int, default=1, help="Number of job list pages to scan.")
+    parser.add_argument("--fresh", action="store_true", help="Discard the checkpoint and start over.")
+    args = parser.parse_args()
+
+    checkpoint = ScrapeCheckpoint()
+    if args.fresh:
+        checkpoint.reset()
+    elif checkpoint.seen:
+        print(f"🔁 Resuming from page {checkpoint.page}, offset {checkpoint.offset} ({len(checkpoint.seen)} jobs already captured).")
+
+    try:
+        for posting in scrape_jobs(checkpoint=checkpoint, max_pages=args.pages):
+            print(f"📥 {posting['Job Title']} at {posting['Company and Location']}")
+    finally:
+        # Everything captured so far, including earlier interrupted runs.
+        df = pd.DataFrame(checkpoint.load_records())
+        print(tabulate(df, headers='keys', tablefmt='fancy_grid', showindex=True))
+        df.to_csv(OUTPUT_CSV, index=False)
+        print(f"✅ Saved {len(df)} postings to '{OUTPUT_CSV}'")
 
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+# Shared by every user: a posting is scraped and embedded once, only scores are per user.
+JOB_STORE_DB = os.getenv("JOB_STORE_DB", "job_store.sqlite")
+EMBEDDING_MODEL = os.getenv("JOB_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    job_id TEXT PRIMARY KEY,
+    title TEXT,
+    company TEXT,
+    about TEXT,
+    apply_link TEXT,
+    scraped_at REAL
+);
+CREATE TABLE IF NOT EXISTS job_embeddings (
+    job_id TEXT,
+    model TEXT,
+    vector BLOB,
+    PRIMARY KEY (job_id, model)
+);
+CREATE TABLE IF NOT EXISTS scores (
+    user TEXT,
+    job_id TEXT,
+    resume_hash TEXT,
+    match_score INTEGER,
+    reason TEXT,
+    status TEXT,
+    scored_at REAL,
+    source TEXT,
+    PRIMARY KEY (user, job_id, resume_hash)
+);
+"""
+# Columns added after the first release, created on stores that predate them
+MIGRATIONS = {"scores": {"source": "TEXT"}}
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_embedder(model_name=EMBEDDING_MODEL):
+    """Sentence-transformers model, loaded once per process; None when it is not installed."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logging.warning("⚠️ sentence-transformers not installed; job embeddings disabled.")
+        return None
+    return SentenceTransformer(model_name)
+
+
+@lru_cache(maxsize=64)
+def _resume_vector(resume_text, model_name):
+    return get_embedder(model_name).encode(resume_text, normalize_embeddings=True)
+
+
+class JobStore:
+    """
+    SQLite store shared across users for scraped postings, their embeddings
+    and per-user scores. One connection per thread; WAL mode lets scrapers
+    and scorers of different users write at the same time.
+    """
+
+    def __init__(self, path=JOB_STORE_DB, model_name=EMBEDDING_MODEL):
+        self.path = path
+        self.model_name = model_name
+        self.local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        for table, columns in MIGRATIONS.items():
+            existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in columns.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        # Users are keyed by user_store.normalize_email; older stores used the email as typed
+        with conn:
+            conn.execute("UPDATE OR IGNORE scores SET user = lower(trim(user)) WHERE user != lower(trim(user))")
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self.local.conn = conn
+        return conn
+
+    # --- Postings ---
+    def get_posting(self, job_id):
+        row = self._conn().execute("SELECT * FROM postings WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "Job ID": row["job_id"],
+            "Job Title": row["title"],
+            "Company and Location": row["company"],
+            "About": row["about"],
+            "Apply Link": row["apply_link"],
+        }
+
+    def save_posting(self, posting):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO postings VALUES (?, ?, ?, ?, ?, ?)",
+                (posting["Job ID"], posting["Job Title"], posting["Company and Location"],
+                 posting["About"], posting["Apply Link"], time.time()),
+            )
+
+    # --- Embeddings ---
+    def job_vector(self, posting):
+        """Embedding of a posting's description, computed once and shared by all users."""
+        import numpy as np
+
+        embedder = get_embedder(self.model_name)
+        if embedder is None:
+            return None
+        row = self._conn().execute(
+            "SELECT vector FROM job_embeddings WHERE job_id = ? AND model = ?",
+            (posting["Job ID"], self.model_name),
+        ).fetchone()
+        if row is not None:
+            return np.frombuffer(row["vector"], dtype=np.float32)
+
+        vector = embedder.encode(posting["About"], normalize_embeddings=True).astype(np.float32)
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_embeddings VALUES (?, ?, ?)",
+                (posting["Job ID"], self.model_name, vector.tobytes()),
+            )
+        return vector
+
+    def semantic_score(self, posting, resume_text):
+        """Cosine similarity (0-100) of the cached job embedding and the resume, or None."""
+        job_vector = self.job_vector(posting)
+        if job_vector is None:
+            return None
+        similarity = float(job_vector @ _resume_vector(resume_text, self.model_name))
+        return max(0, round(similarity * 100))
+
+    # --- Per-user scores ---
+    def get_score(self, user, job_id, resume_hash, sources):
+        """
+        Cached ``(match_score, reason)``, or None. Scores whose source is not in
+        ``sources`` (fallbacks and unparsed replies, see
+        ``job_scoring.MODEL_SOURCES``) are ignored, so the posting is scored
+        again once the model is back.
+        """
+        row = self._conn().execute(
+            "SELECT match_score, reason, source FROM scores WHERE user = ? AND job_id = ? AND resume_hash = ?",
+            (user, job_id, resume_hash),
+        ).fetchone()
+        if row is None or row["source"] not in sources:
+            return None
+        return row["match_score"], row["reason"]
+
+    def save_score(self, user, job_id, resume_hash, match_score, reason, source=None):
+        """``source`` is what produced the score (``job_scoring.score_match``), kept for training data."""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scores (user, job_id, resume_hash, match_score, reason, scored_at, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user, job_id, resume_hash, match_score, reason, time.time(), source),
+            )
+
+    def set_status(self, user, job_id, status):
+        """Returns the number of scores updated, 0 when the user has no score for that job."""
+        with self._conn() as conn:
+            cursor = conn.execute("UPDATE scores SET status = ? WHERE user = ? AND job_id = ?", (status, user, job_id))
+            return cursor.rowcount
+
+    def postings_with_status(self, user, status):
+        rows = self._conn().execute(
+            "SELECT p.*, s.match_score, s.reason FROM scores s JOIN postings p ON p.job_id = s.job_id "
+            "WHERE s.user = ? AND s.status = ? ORDER BY s.match_score DESC",
+            (user, status),
+        ).fetchall()
+        return [
+            {
+                "Job ID": row["job_id"],
+                "Job Title": row["title"],
+                "Company and Location": row["company"],
+                "About": row["about"],
+                "Apply Link": row["apply_link"],
+                "Match Score": row["match_score"],
+                "Reason": row["reason"],
+            }
+            for row in rows
+        ]
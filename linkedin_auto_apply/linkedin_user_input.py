@@ -1,20 +1,20 @@
 import streamlit as st
-import yaml
 from datetime import datetime
-from pathlib import Path
 import logging
-import subprocess
-import os 
+import pandas as pd
+from job_scoring import load_resume_text
+from job_pipeline import stream_scored_postings
+from job_store import JobStore
+import user_store
 
 # Setup logging
 logging.basicConfig(filename="linkedin_input.log", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# Directory to store resumes
-RESUME_DIR = Path("resumes")
-RESUME_DIR.mkdir(exist_ok=True)
-
-# YAML output path
-CONFIG_YAML = "config.yaml"
+# Config, resumes and scrape runs live under users/<email>/ (see user_store.py);
+# scraped postings and job embeddings are shared by all users through the job store.
+@st.cache_resource
+def get_job_store():
+    return JobStore()
 
 # Streamlit UI
 st.title("🔗 LinkedIn Auto Apply - User Configuration")
@@ -25,6 +25,12 @@ logging.info("User started configuration form.")
 st.header("1. LinkedIn Credentials")
 email = st.text_input("Email")
 password = st.text_input("Password", type="password")
+if email.strip():
+    try:
+        user_store.normalize_email(email)
+    except user_store.InvalidUserError as e:
+        st.error(f"❌ {e}")
+        st.stop()
 
 # 2. Job Preferences
 st.header("2. Job Preferences")
@@ -55,7 +61,9 @@ st.header("8. Additional Info")
 gender = st.selectbox("Gender", ["Prefer not to say", "Male", "Female", "Other"])
 disability = st.text_input("Disability (if any)")
 ethnicity = st.text_input("Ethnicity")
-authorization = st.text_input("Legal Authorization Info")
+# Easy Apply only answers Yes/No questions from an explicit Yes or No; blank leaves them to you.
+authorization = st.selectbox("Legally authorized to work where you apply?", ["", "Yes", "No"])
+sponsorship = st.selectbox("Will you require visa sponsorship?", ["", "Yes", "No"])
 
 # 9. Resume Upload
 st.header("📄 Upload Your Resume")
@@ -64,9 +72,8 @@ resume_filename = None
 
 if resume_file is not None and email:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_email = email.replace("@", "_at_").replace(".", "_dot_")
-    resume_filename = f"{safe_email}_{timestamp}.docx"
-    resume_path = RESUME_DIR / resume_filename
+    resume_filename = f"{user_store.user_slug(email)}_{timestamp}.docx"
+    resume_path = user_store.resume_dir(email) / resume_filename
 
     with open(resume_path, "wb") as f:
         f.write(resume_file.read())
@@ -105,32 +112,45 @@ if st.button("Save Configuration"):
                 "gender": gender,
                 "disability": disability.strip(),
                 "ethnicity": ethnicity.strip(),
-                "legal_authorization": authorization.strip()
+                "legal_authorization": authorization,
+                "requires_sponsorship": sponsorship
             },
-            "resume_filename": str(RESUME_DIR / resume_filename) if resume_filename else ""
+            "resume_filename": str(resume_path) if resume_filename else ""
         }
 
-        with open(CONFIG_YAML, "w") as file:
-            yaml.dump(user_data, file, sort_keys=False)
+        config_path = user_store.save_config(email, user_data)
+        st.session_state["user_email"] = email.strip()
 
-        logging.info("Configuration saved to config.yaml")
-        st.success("✅ Configuration saved to config.yaml")
+        logging.info(f"Configuration saved to {config_path}")
+        st.success(f"✅ Configuration saved to {config_path}")
         
-        venv_python = os.getenv("venv_python")
-        scraper_path = os.getenv("job_scrap_extracted")
+        if not resume_filename:
+            st.warning("Upload a resume to score scraped jobs.")
+            st.stop()
+
+        # Scrape and score concurrently; results are shown as soon as each posting is scored.
+        st.header("🧠 Matched Jobs")
+        status = st.empty()
+        scored = []
         try:
-            logging.info("Running job_scrap_extracted.py...")
-            subprocess.run([venv_python, scraper_path], check=True)
-            logging.info("Running job_match.py...")
-            matcher_path = os.getenv("job_match")
-            subprocess.run(["streamlit","run", matcher_path])
-            
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Command failed: {e.cmd}")
-            logging.error(f"Exit code: {e.returncode}")
-            logging.error(f"Stdout: {e.stdout}")
-            logging.error(f"Stderr: {e.stderr}")
-            st.error(f"Script failed: {e}")
-
-        
-        
\ No newline at end of file
+            logging.info("Starting streaming scrape-to-score pipeline...")
+            resume_text = load_resume_text(resume_path)
+            status.info("🔍 Scraping LinkedIn and scoring postings as they arrive...")
+            for posting, match_pct, reason in stream_scored_postings(resume_text, email.strip(), password.strip(),
+                                                                     store=get_job_store()):
+                scored.append({**posting, "Match Score": match_pct, "Reason": reason})
+                with st.expander(f"📄 {posting['Job Title']} at {posting['Company and Location']} — {match_pct}%"):
+                    st.markdown(f"**🔢 Match Score:** {match_pct}%")
+                    st.markdown(f"**📝 Reason:** _{reason}_")
+                    st.markdown(f"**🔗 Job Link:** [Open Posting]({posting['Apply Link']})")
+                status.info(f"🔍 Scored {len(scored)} postings so far...")
+            status.success(f"✅ Finished: {len(scored)} postings scored.")
+        except Exception as e:
+            logging.error(f"Pipeline failed: {e}")
+            st.error(f"Pipeline failed: {e}")
+        finally:
+            if scored:
+                run_csv = user_store.new_run_dir(email) / "linkedin_scraped_jobs.csv"
+                pd.DataFrame(scored).to_csv(run_csv, index=False)
+                pd.DataFrame(scored).to_csv(user_store.jobs_csv(email), index=False)
+                logging.info(f"Saved {len(scored)} scored postings to {run_csv}")
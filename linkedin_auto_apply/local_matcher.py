@@ -0,0 +1,92 @@
+"""
+Fine-tuned match scorer served on CPU.
+
+Loads the directory written by ``Fine_tuning/code/export_matcher.py`` (set
+``MATCH_LOCAL_MODEL`` to it): a quantized GGUF through llama-cpp-python when
+the export produced one, otherwise the merged Hugging Face model with int8
+dynamic quantization applied at load time. The model stays resident, so
+scoring does not leave the machine.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+MATCH_LOCAL_MODEL = os.getenv("MATCH_LOCAL_MODEL", "")
+MATCH_LOCAL_THREADS = int(os.getenv("MATCH_LOCAL_THREADS", str(os.cpu_count() or 4)))
+MANIFEST_FILE = "matcher.json"
+# A score and a few sentences of reason
+MAX_NEW_TOKENS = 160
+CONTEXT_TOKENS = 2048
+
+
+class LocalMatcherError(Exception):
+    """The exported matcher could not be loaded or failed while scoring."""
+
+
+class LocalMatcher:
+    def __init__(self, export_dir=MATCH_LOCAL_MODEL):
+        start = time.perf_counter()
+        with open(os.path.join(export_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        path = os.path.join(export_dir, self.manifest["model"])
+        # Training saw each prompt followed by this separator (training_data.format_prompt)
+        self.prompt_suffix = self.manifest.get("prompt_suffix", "\n")
+        if self.manifest["format"] == "gguf":
+            from llama_cpp import Llama
+
+            self.llm = Llama(model_path=path, n_ctx=CONTEXT_TOKENS, n_threads=MATCH_LOCAL_THREADS, verbose=False)
+            self._generate = self._generate_gguf
+        else:
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+
+            torch.set_num_threads(MATCH_LOCAL_THREADS)
+            self.torch = torch
+            self.tokenizer = AutoTokenizer.from_pretrained(path)
+            model = AutoModelForCausalLM.from_pretrained(path, torch_dtype=torch.float32)
+            self.model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8).eval()
+            self._generate = self._generate_transformers
+        # Neither backend is safe to call from several scoring threads at once
+        self.lock = threading.Lock()
+        self.load_seconds = round(time.perf_counter() - start, 2)
+        logging.info(f"🧠 Loaded local matcher {path} ({self.manifest['format']}) in {self.load_seconds}s")
+
+    def _generate_gguf(self, text):
+        output = self.llm(text, max_tokens=MAX_NEW_TOKENS, temperature=0.0)
+        return output["choices"][0]["text"]
+
+    def _generate_transformers(self, text):
+        inputs = self.tokenizer(text, return_tensors="pt")
+        with self.torch.inference_mode():
+            output = self.model.generate(**inputs, max_new_tokens=MAX_NEW_TOKENS, do_sample=False,
+                                         pad_token_id=self.tokenizer.pad_token_id or self.tokenizer.eos_token_id)
+        return self.tokenizer.decode(output[0, inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+
+    def generate(self, prompt):
+        """Greedy completion of a match prompt; the reply should be the JSON object."""
+        try:
+            with self.lock:
+                return self._generate(prompt + self.prompt_suffix)
+        except Exception as e:
+            raise LocalMatcherError(str(e)) from e
+
+
+_matcher = None
+_load_error = None
+_matcher_lock = threading.Lock()
+
+
+def get_local_matcher():
+    """The process-wide matcher, loaded once; a failed load is not retried on every posting."""
+    global _matcher, _load_error
+    with _matcher_lock:
+        if _matcher is None and _load_error is None:
+            try:
+                _matcher = LocalMatcher()
+            except Exception as e:
+                _load_error = LocalMatcherError(f"could not load {MATCH_LOCAL_MODEL}: {e}")
+        if _load_error is not None:
+            raise _load_error
+        return _matcher
@@ -0,0 +1,196 @@
+"""
+Headless batch scoring of job postings against a resume.
+
+    python -m linkedin_auto_apply.match --jobs linkedin_scraped_jobs.csv \
+        --resume resumes/me.docx --workers 8 --output scores.jsonl
+
+Postings are streamed from CSV or JSONL, scored with ``score_match``
+on a thread or process pool and written out as each one finishes, so the
+command can run from cron over large job dumps without a browser session.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait, as_completed
+
+# Allow `python -m linkedin_auto_apply.match` as well as running the file directly.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from job_scoring import load_resume_text, build_job_description, score_match
+
+
+# --- Input ---
+def iter_jobs(path, chunksize=500):
+    """Yield posting dicts from a CSV (read in chunks) or JSONL file."""
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    import pandas as pd
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.to_dict(orient="records")
+
+
+def read_resume(path):
+    if path.endswith(".docx"):
+        return load_resume_text(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def job_key(posting):
+    job_id = posting.get("Job ID")
+    if job_id and job_id != "N/A":
+        return str(job_id)
+    return f"{posting.get('Job Title')}|{posting.get('Company and Location')}"
+
+
+# --- Output ---
+class JsonlWriter:
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    Buffers records and writes them as row groups, so output grows while
+    scoring runs. Every column is a string column, fixed by the first batch;
+    a key that first shows up in a later batch is dropped with a warning.
+    """
+
+    def __init__(self, path, batch_size=100):
+        import pyarrow  # noqa: F401  (fail early when pyarrow is missing)
+
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = []
+        self.writer = None
+        self.schema = None
+
+    def write(self, record):
+        self.buffer.append({key: None if value is None else str(value) for key, value in record.items()})
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.schema is None:
+            # Explicit string types: an all-None column would otherwise be inferred as null
+            names = list(dict.fromkeys(key for record in self.buffer for key in record))
+            self.schema = pa.schema([(name, pa.string()) for name in names])
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        extra = {key for record in self.buffer for key in record} - set(self.schema.names)
+        if extra:
+            logging.warning(f"⚠️ Dropping columns not in the Parquet schema: {', '.join(sorted(extra))}")
+        # Missing keys become nulls, in the writer's column order
+        columns = {name: [record.get(name) for record in self.buffer] for name in self.schema.names}
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_writer(path):
+    return ParquetWriter(path) if path.endswith(".parquet") else JsonlWriter(path)
+
+
+def already_scored(path):
+    """Job keys present in an existing JSONL output, so reruns only score new postings."""
+    if not path.endswith(".jsonl") or not os.path.exists(path):
+        return set()
+    keys = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                keys.add(job_key(json.loads(line)))
+            except ValueError:
+                continue
+    return keys
+
+
+# --- Scoring ---
+def score_posting(posting, resume_text):
+    start = time.perf_counter()
+    match_pct, reason, source = score_match(build_job_description(posting), resume_text)
+    return {**posting, "Match Score": match_pct, "Reason": reason, "Score Source": source,
+            "Scoring Seconds": round(time.perf_counter() - start, 3)}
+
+
+def score_jobs(postings, resume_text, workers=4, use_processes=False):
+    """
+    Score postings on a pool, keeping at most ``2 * workers`` in flight so
+    memory stays flat however large the input is. Yields in completion order.
+    """
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool_cls(max_workers=workers) as pool:
+        in_flight = set()
+        for posting in postings:
+            in_flight.add(pool.submit(score_posting, posting, resume_text))
+            if len(in_flight) >= workers * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(in_flight):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score job postings against a resume without Streamlit.")
+    parser.add_argument("--jobs", required=True, help="Postings as CSV or JSONL.")
+    parser.add_argument("--resume", required=True, help="Resume as .docx or plain text.")
+    parser.add_argument("--output", default="job_scores.jsonl", help="Results as .jsonl or .parquet.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true", help="Use a process pool instead of threads.")
+    parser.add_argument("--chunksize", type=int, default=500, help="CSV rows read per chunk.")
+    parser.add_argument("--rescore", action="store_true", help="Score postings already in the JSONL output again.")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        filename="job_match_logs.log",
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    resume_text = read_resume(args.resume)
+    skip = set() if args.rescore else already_scored(args.output)
+    postings = (p for p in iter_jobs(args.jobs, args.chunksize) if job_key(p) not in skip)
+
+    writer = open_writer(args.output)
+    start = time.perf_counter()
+    count = 0
+    try:
+        for record in score_jobs(postings, resume_text, args.workers, args.processes):
+            writer.write(record)
+            count += 1
+            print(f"{record['Match Score']:>4}%  {record.get('Job Title')} at {record.get('Company and Location')}")
+    finally:
+        writer.close()
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed * 60 if elapsed else 0
+        print(f"✅ Scored {count} postings in {elapsed:.1f}s ({rate:.1f}/min), {len(skip)} already scored → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
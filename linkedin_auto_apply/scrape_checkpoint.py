@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+
+CHECKPOINT_JSON = "scrape_checkpoint.json"
+RECORDS_JSONL = "linkedin_scraped_jobs.jsonl"
+
+
+class ScrapeCheckpoint:
+    """
+    Progress of a scrape run, persisted after every posting.
+
+    Postings are appended to a JSONL file the moment they are extracted, and
+    the checkpoint keeps the page/offset reached plus every job id already
+    captured. A run that dies part-way can be restarted and will continue
+    from the saved page, skipping every job id it has already written.
+    """
+
+    def __init__(self, checkpoint_path=CHECKPOINT_JSON, records_path=RECORDS_JSONL):
+        self.checkpoint_path = checkpoint_path
+        self.records_path = records_path
+        self.page = 0
+        self.offset = 0
+        self.completed = False
+        self.seen = set()
+        self.load()
+        self._repair_records()
+
+    def load(self):
+        if not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"⚠️ Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return
+        self.page = state.get("page", 0)
+        self.offset = state.get("offset", 0)
+        self.completed = state.get("completed", False)
+        self.seen = set(state.get("seen", []))
+        # A finished run keeps its seen ids but starts the next scan from the top.
+        if self.completed:
+            self.page, self.offset = 0, 0
+        logging.info(f"🔁 Loaded checkpoint: page {self.page}, offset {self.offset}, {len(self.seen)} jobs seen.")
+
+    def _repair_records(self):
+        # Terminate a line left half-written by a crash so new records start cleanly.
+        if not os.path.exists(self.records_path) or os.path.getsize(self.records_path) == 0:
+            return
+        with open(self.records_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    def save(self):
+        state = {
+            "page": self.page,
+            "offset": self.offset,
+            "completed": self.completed,
+            "seen": sorted(self.seen),
+        }
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def is_seen(self, job_id):
+        return job_id in self.seen
+
+    def record(self, job_id, posting, page, offset):
+        """Append the posting to the JSONL file, then advance the checkpoint."""
+        with open(self.records_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"Job ID": job_id, **posting}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.seen.add(job_id)
+        self.advance(page, offset)
+
+    def advance(self, page, offset):
+        self.page, self.offset = page, offset
+        self.completed = False
+        self.save()
+
+    def finish(self):
+        self.completed = True
+        self.page, self.offset = 0, 0
+        self.save()
+
+    def reset(self):
+        for path in (self.checkpoint_path, self.records_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.page, self.offset, self.completed, self.seen = 0, 0, False, set()
+
+    def load_records(self):
+        """Return every posting captured so far, across all runs."""
+        if not os.path.exists(self.records_path):
+            return []
+        records = []
+        with open(self.records_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # The last line can be cut short if the process died mid-write.
+                    logging.warning("⚠️ Skipping truncated record in scrape log.")
+        return records
@@ -0,0 +1,268 @@
+import argparse
+import html
+import json
+import logging
+import os
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "replay")
+EASY_APPLY_FORM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "easy_apply", "form.html")
+POSTINGS_FILE = "postings.json"
+PAGES_DIR = "pages"
+JOBS_PER_PAGE = 25
+LIST_PAGE = re.compile(r"^job_list_(\d+)\.html$")
+DETAIL_PAGE = re.compile(r"^job_(.+)\.html$")
+
+
+def _detail_file(job_id):
+    return "job_" + re.sub(r"[^A-Za-z0-9_-]", "_", job_id) + ".html"
+
+
+def _list_page(url):
+    """0-based job list page of a URL, from its ``start`` parameter."""
+    return int(parse_qs(urlparse(url).query).get("start", ["0"])[0]) // JOBS_PER_PAGE
+
+
+# --- Recording from a live session ---
+def record_session(fixture_dir=FIXTURE_DIR, max_pages=1, max_cards=None):
+    """
+    Scrape a live session and save the postings, the HTML of every job list
+    page (``job_list_<page>.html``) and each posting's description element
+    (``job_<id>.html``), which the replay server serves back.
+    """
+    import browser_session
+    from selenium.webdriver.common.by import By
+    from job_scrap_extracted import ensure_logged_in, open_job_list, iter_postings
+
+    pages_dir = os.path.join(fixture_dir, PAGES_DIR)
+    os.makedirs(pages_dir, exist_ok=True)
+    browser = browser_session.create_browser(attach=False)
+    postings = []
+    try:
+        ensure_logged_in(browser)
+        open_job_list(browser)
+        for posting in iter_postings(browser, max_pages=max_pages):
+            postings.append(posting)
+            list_path = os.path.join(pages_dir, f"job_list_{_list_page(browser.current_url)}.html")
+            if not os.path.exists(list_path):
+                with open(list_path, "w", encoding="utf-8") as f:
+                    f.write(browser.page_source)
+            descriptions = browser.find_elements(By.CLASS_NAME, "jobs-description__content")
+            if descriptions:
+                with open(os.path.join(pages_dir, _detail_file(posting["Job ID"])), "w", encoding="utf-8") as f:
+                    f.write(descriptions[0].get_attribute("outerHTML"))
+            if max_cards and len(postings) >= max_cards:
+                break
+    finally:
+        browser_session.close_browser(browser)
+
+    with open(os.path.join(fixture_dir, POSTINGS_FILE), "w", encoding="utf-8") as f:
+        json.dump(postings, f, indent=2, ensure_ascii=False)
+    logging.info(f"💾 Recorded {len(postings)} postings into {fixture_dir}")
+    return postings
+
+
+def synthesize_fixtures(fixture_dir=FIXTURE_DIR, count=50):
+    """Write synthetic postings so the replay server works without any recording."""
+    os.makedirs(fixture_dir, exist_ok=True)
+    postings = []
+    for i in range(count):
+        postings.append({
+            "Job ID": str(4000000000 + i),
+            "Job Title": f"Software Engineer {i}",
+            "Company and Location": f"Company {i % 7} · Bengaluru, Karnataka, India (Hybrid)",
+            "About": " ".join(["Build and operate Python services, React front ends and data pipelines."] * 20),
+            "Apply Link": f"https://careers.example.com/jobs/{i}",
+        })
+    with open(os.path.join(fixture_dir, POSTINGS_FILE), "w", encoding="utf-8") as f:
+        json.dump(postings, f, indent=2)
+    return postings
+
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    """``(postings, pages)``; ``pages`` holds the recorded list pages and descriptions, empty for synthetic fixtures."""
+    with open(os.path.join(fixture_dir, POSTINGS_FILE), "r", encoding="utf-8") as f:
+        postings = json.load(f)
+    pages = {"lists": {}, "details": {}}
+    pages_dir = os.path.join(fixture_dir, PAGES_DIR)
+    if os.path.isdir(pages_dir):
+        for name in os.listdir(pages_dir):
+            with open(os.path.join(pages_dir, name), "r", encoding="utf-8") as f:
+                content = f.read()
+            if LIST_PAGE.match(name):
+                pages["lists"][int(LIST_PAGE.match(name).group(1))] = content
+            elif DETAIL_PAGE.match(name):
+                pages["details"][name] = content
+    return postings, pages
+
+
+# --- Replay server ---
+# Injected into recorded pages in place of LinkedIn's own scripts: clicking a card shows its recorded
+# description (synchronously, the scraper reads it right after the click) and Apply opens /apply/<id>.
+REPLAY_SCRIPT = """<script>
+const CARD_IDS = %s;
+let currentJob = null;
+function cardId(card) {
+  if (card.getAttribute("data-job-id")) return card.getAttribute("data-job-id");
+  const first = (selector) => Array.from(card.querySelectorAll(selector))
+    .map((el) => el.innerText.trim()).find((text) => text) || "N/A";
+  return CARD_IDS[first(".flex-grow-1").split("\\n")[0] + "|" + first(".artdeco-entity-lockup__subtitle")];
+}
+document.addEventListener("click", (event) => {
+  if (event.target.closest(".jobs-apply-button")) {
+    event.preventDefault();
+    if (currentJob) window.open("/apply/" + encodeURIComponent(currentJob), "_blank");
+    return;
+  }
+  const card = event.target.closest(".job-card-container");
+  if (!card) return;
+  event.preventDefault();
+  currentJob = cardId(card);
+  if (!currentJob) return;
+  const request = new XMLHttpRequest();
+  request.open("GET", "/replay/job/" + encodeURIComponent(currentJob), false);
+  request.send();
+  if (request.status !== 200) return;
+  const box = document.createElement("div");
+  box.innerHTML = request.responseText;
+  const current = document.querySelector(".jobs-description__content");
+  if (current) current.replaceWith(box.firstElementChild);
+  else document.body.appendChild(box.firstElementChild);
+}, true);
+</script>"""
+
+
+def render_recorded_page(page_html, postings):
+    """A recorded list page, kept on the replay server: scripts removed, LinkedIn links made relative."""
+    page_html = re.sub(r"<script\b.*?</script\s*>", "", page_html, flags=re.IGNORECASE | re.DOTALL)
+    page_html = re.sub(r"https?://(?:www\.)?linkedin\.com", "", page_html)
+    card_ids = {f"{p['Job Title']}|{p['Company and Location']}": p["Job ID"] for p in postings}
+    script = REPLAY_SCRIPT % json.dumps(card_ids).replace("</", "<\\/")
+    if re.search(r"</body\s*>", page_html, flags=re.IGNORECASE):
+        return re.sub(r"</body\s*>", lambda _: script + "</body>", page_html, count=1, flags=re.IGNORECASE)
+    return page_html + script
+
+
+def render_job_list(postings):
+    """A static page with the class names the scraper looks for, wired with a tiny click handler."""
+    cards = "\n".join(
+        f'<li><div class="job-card-container" data-job-id="{html.escape(p["Job ID"])}" '
+        f'onclick="openJob(\'{html.escape(p["Job ID"])}\')">'
+        f'<div class="flex-grow-1">{html.escape(p["Job Title"])}</div>'
+        f'<div class="artdeco-entity-lockup__subtitle">{html.escape(p["Company and Location"])}</div>'
+        f'</div></li>'
+        for p in postings
+    )
+    details = json.dumps({p["Job ID"]: p["About"] for p in postings}).replace("</", "<\\/")
+    return f"""<!DOCTYPE html>
+<html><body>
+<a href="/jobs/collections/recommended/"><span>Show all</span></a>
+<ul style="height: 4000px">
+{cards}
+</ul>
+<div class="jobs-details">
+  <div class="jobs-description__content" id="description"></div>
+  <button class="jobs-apply-button" id="apply">Apply</button>
+</div>
+<script>
+const DETAILS = {details};
+function openJob(id) {{
+  document.getElementById("description").textContent = DETAILS[id];
+  document.getElementById("apply").onclick = () => window.open("/apply/" + id, "_blank");
+}}
+</script>
+</body></html>"""
+
+
+def make_handler(postings, pages):
+    """Serves the recorded pages when the fixtures have them, else the synthetic job list."""
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlparse(self.path)
+            if parts.path.startswith("/replay/job/"):
+                detail = pages["details"].get(_detail_file(unquote(parts.path[len("/replay/job/"):])))
+                if detail is None:
+                    self._send(404, b"", "text/html")
+                else:
+                    self._send(200, detail.encode("utf-8"), "text/html")
+            elif parts.path.startswith("/jobs/view/"):
+                # Easy Apply form used to exercise easy_apply.py offline
+                with open(EASY_APPLY_FORM, "rb") as f:
+                    self._send(200, f.read(), "text/html")
+            elif parts.path.startswith("/jobs") and pages["lists"]:
+                # A page beyond the recording has no cards, which ends the scrape
+                recorded = pages["lists"].get(_list_page(self.path), "<html><body></body></html>")
+                self._send(200, render_recorded_page(recorded, postings).encode("utf-8"), "text/html")
+            elif parts.path.startswith("/jobs"):
+                start = int(parse_qs(parts.query).get("start", ["0"])[0])
+                page = postings[start:start + JOBS_PER_PAGE]
+                self._send(200, render_job_list(page).encode("utf-8"), "text/html")
+            elif parts.path.startswith("/apply/"):
+                self._send(200, b"<html><body>Application form</body></html>", "text/html")
+            else:
+                self._send(200, b"<html><body>LinkedIn replay</body></html>", "text/html")
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def serve_fixtures(fixture_dir=FIXTURE_DIR, port=0):
+    """Start the replay server in a background thread; returns ``(server, base_url)``."""
+    postings, pages = load_fixtures(fixture_dir)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(postings, pages))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# --- WebDriver round-trip counting ---
+def count_round_trips(browser):
+    """Wrap ``browser.execute`` so every WebDriver command is counted; returns the counter dict."""
+    counter = {"commands": 0}
+    execute = browser.execute
+
+    def counted(driver_command, params=None):
+        counter["commands"] += 1
+        return execute(driver_command, params)
+
+    browser.execute = counted
+    return counter
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record and replay LinkedIn scraper fixtures.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="Record fixtures from a live, logged-in session.")
+    rec.add_argument("--pages", type=int, default=1)
+    rec.add_argument("--max-cards", type=int)
+    syn = sub.add_parser("synthesize", help="Write synthetic fixtures.")
+    syn.add_argument("--count", type=int, default=50)
+    srv = sub.add_parser("serve", help="Serve fixtures on a local port.")
+    srv.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.command == "record":
+        record_session(args.fixtures, args.pages, args.max_cards)
+    elif args.command == "synthesize":
+        synthesize_fixtures(args.fixtures, args.count)
+    else:
+        server, url = serve_fixtures(args.fixtures, args.port)
+        print(f"🟢 Replaying {args.fixtures} at {url} (set LINKEDIN_BASE_URL={url})")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
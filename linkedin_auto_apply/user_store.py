@@ -0,0 +1,103 @@
+import hashlib
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import yaml
+
+# Every user gets users/<slug>/ with their own config, resumes and scrape runs.
+USERS_DIR = Path(os.getenv("LINKEDAGENT_USERS_DIR", "users"))
+EMAIL_PATTERN = re.compile(r"^[^@\s/\\]+@[^@\s/\\]+\.[^@\s/\\]+$")
+SLUG_PATTERN = re.compile(r"^[a-z0-9_-]+$")
+MAX_SLUG_PREFIX = 40
+
+
+class InvalidUserError(ValueError):
+    """An email that cannot name a user directory."""
+
+
+def normalize_email(email):
+    """The lower-cased email, or ``InvalidUserError`` when it does not look like one."""
+    email = (email or "").strip().lower()
+    if not EMAIL_PATTERN.match(email):
+        raise InvalidUserError(f"Not a valid email address: {email!r}")
+    return email
+
+
+def user_slug(email):
+    """
+    Directory name of a user: the email reduced to ``[a-z0-9_-]`` plus a
+    short hash of the full address, so distinct emails never share a folder
+    and no input can leave ``USERS_DIR``.
+    """
+    email = normalize_email(email)
+    readable = re.sub(r"[^a-z0-9_-]+", "_", email.replace("@", "_at_"))[:MAX_SLUG_PREFIX].strip("_-")
+    slug = f"{readable}-{hashlib.sha256(email.encode('utf-8')).hexdigest()[:10]}"
+    if not SLUG_PATTERN.match(slug):
+        raise InvalidUserError(f"Cannot build a user directory name for {email!r}")
+    return slug
+
+
+def _adopt_legacy_dir(email, path):
+    """
+    Move a folder named by the old ``_at_``/``_dot_`` scheme to ``path``, only
+    when its name is safe and its config belongs to this exact email (the old
+    scheme mapped different emails to the same folder).
+    """
+    email = normalize_email(email)
+    legacy = USERS_DIR / email.replace("@", "_at_").replace(".", "_dot_")
+    if not SLUG_PATTERN.match(legacy.name) or not (legacy / "config.yaml").is_file():
+        return
+    try:
+        with open(legacy / "config.yaml", "r") as f:
+            owner = (yaml.safe_load(f) or {}).get("linkedin", {}).get("email", "")
+    except (OSError, yaml.YAMLError, AttributeError):
+        return
+    if owner.strip().lower() == email:
+        legacy.rename(path)
+
+
+def user_dir(email):
+    path = USERS_DIR / user_slug(email)
+    if not path.exists():
+        _adopt_legacy_dir(email, path)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def config_path(email):
+    return user_dir(email) / "config.yaml"
+
+
+def resume_dir(email):
+    path = user_dir(email) / "resumes"
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def jobs_csv(email):
+    """Latest scored postings of a user, read by job_match.py."""
+    return user_dir(email) / "linkedin_scraped_jobs.csv"
+
+
+def new_run_dir(email):
+    """A fresh directory for one scrape run (checkpoint, records, outputs)."""
+    path = user_dir(email) / "runs" / datetime.now().strftime("%Y%m%d_%H%M%S")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def save_config(email, user_data):
+    """Write the user's config atomically so a concurrent reader never sees half a file."""
+    path = config_path(email)
+    tmp_path = path.with_suffix(".yaml.tmp")
+    with open(tmp_path, "w") as f:
+        yaml.dump(user_data, f, sort_keys=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_config(email):
+    with open(config_path(email), "r") as f:
+        return yaml.safe_load(f)
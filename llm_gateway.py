@@ -0,0 +1,262 @@
+"""
+One HTTP gateway for every LLM call made by the resume maker and the job
+matcher.
+
+Each provider (a local Ollama server, the Hugging Face inference API) gets
+a keep-alive connection pool, a token-bucket rate limit and a cap on
+concurrent requests. Failed calls are retried with jittered exponential
+backoff; a Hugging Face 503 "model is loading" waits for the
+``estimated_time`` it reports instead. Generations can also be streamed
+token by token (``hf_stream`` / ``ollama_stream``) and cancelled midway.
+
+    from llm_gateway import get_gateway
+    text = get_gateway().hf_generate("mistralai/Mistral-7B-Instruct-v0.1", prompt)
+
+Point ``OLLAMA_HOST`` / ``HF_API_URL`` at ``llm_stub.py`` to run offline.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
+if "://" not in OLLAMA_HOST:  # Ollama itself accepts a bare host:port here
+    OLLAMA_HOST = f"http://{OLLAMA_HOST}"
+HF_API_URL = os.getenv("HF_API_URL", "https://api-inference.huggingface.co/models").rstrip("/")
+# The single token setting for Hugging Face; TOKEN / Token are read for older .env files.
+HF_TOKEN = os.getenv("HF_TOKEN") or os.getenv("TOKEN") or os.getenv("Token")
+
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 30.0
+MAX_LOADING_WAIT_S = 120.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# name → (requests per second, burst, concurrent requests, timeout seconds)
+PROVIDER_LIMITS = {
+    "ollama": (float(os.getenv("OLLAMA_RATE", "20")), 4, int(os.getenv("OLLAMA_CONCURRENCY", "2")), 300),
+    "hf": (float(os.getenv("HF_RATE", "2")), 4, int(os.getenv("HF_CONCURRENCY", "4")), 60),
+}
+
+
+class GatewayError(Exception):
+    """An LLM call that still failed after all retries."""
+
+    def __init__(self, provider, message, status=None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status = status
+
+
+class RateLimiter:
+    """Thread-safe token bucket refilling ``rate`` tokens per second up to ``burst``."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_s = (1 - self.tokens) / self.rate
+            time.sleep(wait_s)
+
+
+class Provider:
+    """Connection pool, limiter and concurrency cap for one LLM endpoint."""
+
+    def __init__(self, name, base_url, headers=None, rate=2.0, burst=4, max_concurrency=4, timeout=60):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.name = name
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate, burst)
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json", **(headers or {})})
+        # Retries are done by the gateway, so they go through the limiter too.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "seconds": 0.0}
+        self.stats_lock = threading.Lock()
+
+    def _count(self, key, value=1):
+        with self.stats_lock:
+            self.stats[key] += value
+
+
+def _backoff(attempt):
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** attempt))
+
+
+def _loading_wait(response):
+    """Seconds to wait on a Hugging Face "model is loading" 503, or None for other responses."""
+    if response.status_code != 503:
+        return None
+    try:
+        estimated = float(response.json().get("estimated_time"))
+    except (ValueError, TypeError, AttributeError):
+        return None
+    return min(estimated, MAX_LOADING_WAIT_S) + random.uniform(0, 1)
+
+
+class LLMGateway:
+    def __init__(self, providers=None):
+        if providers is None:
+            headers = {"hf": {"Authorization": f"Bearer {HF_TOKEN}"} if HF_TOKEN else {}}
+            urls = {"ollama": OLLAMA_HOST, "hf": HF_API_URL}
+            providers = {
+                name: Provider(name, urls[name], headers.get(name), rate, burst, concurrency, timeout)
+                for name, (rate, burst, concurrency, timeout) in PROVIDER_LIMITS.items()
+            }
+        self.providers = providers
+
+    def _send(self, provider, path, payload, timeout, retries, headers, stream=False):
+        """One request with rate limiting and retries; returns the 200 response or raises GatewayError."""
+        import requests
+
+        url = f"{provider.base_url}/{path.lstrip('/')}"
+        last_error = None
+        for attempt in range(retries + 1):
+            if attempt:
+                provider._count("retries")
+            provider.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = provider.session.post(url, json=payload, headers=headers, stream=stream,
+                                                 timeout=timeout or provider.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = GatewayError(provider.name, f"{type(e).__name__}: {e}")
+                logging.warning(f"⚠️ {provider.name} request failed ({type(e).__name__}), attempt {attempt + 1}")
+                if attempt < retries:
+                    time.sleep(_backoff(attempt))
+                continue
+            finally:
+                provider._count("requests")
+                provider._count("seconds", time.perf_counter() - start)
+
+            if response.status_code == 200:
+                return response
+            last_error = GatewayError(provider.name, f"HTTP {response.status_code}: {response.text[:200]}",
+                                      response.status_code)
+            response.close()
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                break
+            wait_s = _loading_wait(response)
+            if wait_s is not None:
+                logging.info(f"⏳ {provider.name} model loading, waiting {wait_s:.0f}s")
+            else:
+                wait_s = _backoff(attempt)
+            time.sleep(wait_s)
+
+        provider._count("failures")
+        raise last_error
+
+    def post(self, provider_name, path, payload, timeout=None, retries=MAX_RETRIES, headers=None):
+        """POST ``payload`` to a provider with rate limiting and retries; returns the decoded JSON."""
+        provider = self.providers[provider_name]
+        with provider.slots:
+            return self._send(provider, path, payload, timeout, retries, headers).json()
+
+    def stream_lines(self, provider_name, path, payload, timeout=None, retries=MAX_RETRIES, headers=None,
+                     cancel=None):
+        """
+        POST ``payload`` and yield the non-empty response lines as they arrive.
+
+        Retries only happen before the first byte. ``timeout`` bounds the gap
+        between two reads, not the whole generation. Setting ``cancel`` (a
+        ``threading.Event``) or closing the generator drops the connection,
+        which also stops the generation on the server.
+        """
+        provider = self.providers[provider_name]
+        with provider.slots:
+            response = self._send(provider, path, payload, timeout, retries, headers, stream=True)
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if cancel is not None and cancel.is_set():
+                        logging.info(f"⏹ {provider_name} stream cancelled")
+                        return
+                    if line:
+                        yield line
+            finally:
+                response.close()
+
+    # --- Providers ---
+    def hf_generate(self, model, prompt, max_new_tokens=800, temperature=0.7, timeout=None,
+                    retries=MAX_RETRIES, api_key=None):
+        """
+        Text generated by a Hugging Face inference model (prompt included, as
+        the API returns it). ``api_key`` overrides ``HF_TOKEN`` for this call.
+        """
+        payload = {"inputs": prompt, "parameters": {"max_new_tokens": max_new_tokens, "temperature": temperature}}
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        result = self.post("hf", model, payload, timeout, retries, headers)
+        if isinstance(result, list) and result:
+            result = result[0]
+        if isinstance(result, dict) and "generated_text" in result:
+            return result["generated_text"]
+        logging.warning("⚠ Unexpected format from Hugging Face API.")
+        return str(result)
+
+    def ollama_chat(self, model, prompt, timeout=None, retries=MAX_RETRIES):
+        """Reply of a local Ollama model to a single user message."""
+        payload = {"model": model, "messages": [{"role": "user", "content": prompt}], "stream": False}
+        result = self.post("ollama", "/api/chat", payload, timeout, retries)
+        return result["message"]["content"]
+
+    def hf_stream(self, model, prompt, max_new_tokens=800, temperature=0.7, timeout=None,
+                  api_key=None, cancel=None):
+        """Generated text of a Hugging Face model, yielded token by token (server-sent events)."""
+        payload = {"inputs": prompt, "stream": True,
+                   "parameters": {"max_new_tokens": max_new_tokens, "temperature": temperature}}
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+        for line in self.stream_lines("hf", model, payload, timeout, headers=headers, cancel=cancel):
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[len("data:"):])
+            if "error" in event:
+                raise GatewayError("hf", event["error"])
+            token = event.get("token") or {}
+            if not token.get("special"):
+                yield token.get("text", "")
+
+    def ollama_stream(self, model, prompt, timeout=None, cancel=None):
+        """Reply of a local Ollama model, yielded chunk by chunk."""
+        payload = {"model": model, "messages": [{"role": "user", "content": prompt}], "stream": True}
+        for line in self.stream_lines("ollama", "/api/chat", payload, timeout, cancel=cancel):
+            chunk = json.loads(line)
+            if "error" in chunk:
+                raise GatewayError("ollama", chunk["error"])
+            if chunk.get("message", {}).get("content"):
+                yield chunk["message"]["content"]
+            if chunk.get("done"):
+                return
+
+    def stats(self):
+        return {name: dict(provider.stats) for name, provider in self.providers.items()}
+
+
+@lru_cache(maxsize=None)
+def get_gateway():
+    """The process-wide gateway, so every caller shares the same pools and limits."""
+    return LLMGateway()
@@ -0,0 +1,195 @@
+"""
+Local stand-in for the Ollama and Hugging Face inference APIs.
+
+Answers the same request shapes ``llm_gateway`` sends, with configurable
+latency, "model is loading" 503s and random failures, so the gateway and
+everything built on it can be exercised without a GPU or network. Replies
+can be replayed from a recorded JSONL file (``prompt_sha1`` and ``reply``
+per line, see ``benchmarks/bench_match_scoring.py --record``), and a share
+of match-score replies can be made malformed to exercise the parsing paths:
+
+    python llm_stub.py --port 8800 --latency 0.2 --loading 2
+    python llm_stub.py --replay match_replies.jsonl --invalid-json-rate 0.1
+    OLLAMA_HOST=http://127.0.0.1:8800 HF_API_URL=http://127.0.0.1:8800/models streamlit run main.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def canned_reply(prompt):
+    """A deterministic reply: a match-score JSON for scoring prompts, plain text otherwise."""
+    digest = int(prompt_digest(prompt), 16)
+    if "match_percentage" in prompt:
+        return json.dumps({
+            "match_percentage": digest % 101,
+            "reason": "Stub reply: the resume covers part of the required skills.",
+        })
+    return "Stub reply.\n\nSUMMARY\n- Experienced engineer.\n\nSKILLS\n- Python, SQL, Docker"
+
+
+def prompt_digest(prompt):
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+
+
+def malformed_reply(prompt):
+    """A match reply in one of the shapes models get wrong: fenced, with a preamble, or cut off."""
+    good = canned_reply(prompt)
+    return [
+        f"```json\n{good}\n```",
+        f"Here is my evaluation of the resume:\n{good}",
+        good[: len(good) // 2],
+    ][int(prompt_digest(prompt), 16) % 3]
+
+
+def load_replies(path):
+    """Recorded replies keyed by prompt digest: ``{sha1: (reply, seconds)}``."""
+    replies = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                replies[record["prompt_sha1"]] = (record["reply"], record.get("seconds"))
+    return replies
+
+
+def _words(text):
+    """Split a reply into word-sized tokens that join back to the same text."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def make_handler(latency_s=0.0, loading_requests=0, error_rate=0.0, estimated_time=1.0, token_latency_s=0.0,
+                 latency_jitter_s=0.0, replies=None, replay_latency=False, invalid_json_rate=0.0):
+    """
+    ``replies`` (from ``load_replies``) answers recorded prompts with their
+    recorded reply, after the recorded time when ``replay_latency`` is set;
+    other prompts get ``canned_reply``. Every delay is ``latency_s`` plus up
+    to ``latency_jitter_s``.
+    """
+    state = {"hf_requests": 0, "ollama_requests": 0, "cancelled_streams": 0, "replayed": 0, "malformed": 0}
+    lock = threading.Lock()
+
+    def reply_for(prompt):
+        """The reply to send and the seconds to wait before sending it."""
+        delay = latency_s + (random.uniform(0, latency_jitter_s) if latency_jitter_s else 0.0)
+        recorded = replies.get(prompt_digest(prompt)) if replies else None
+        if recorded is not None:
+            with lock:
+                state["replayed"] += 1
+            reply, seconds = recorded
+            return reply, seconds if replay_latency and seconds is not None else delay
+        if invalid_json_rate and "match_percentage" in prompt and random.random() < invalid_json_rate:
+            with lock:
+                state["malformed"] += 1
+            return malformed_reply(prompt), delay
+        return canned_reply(prompt), delay
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real servers
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if "messages" in body:
+                prompt = body["messages"][-1]["content"]
+            else:
+                prompt = body.get("prompt", body.get("inputs", ""))
+            reply, delay = reply_for(prompt)
+            if delay:
+                time.sleep(delay)
+            if error_rate and random.random() < error_rate:
+                return self._send(500, {"error": "stub failure"})
+
+            if self.path.startswith("/api/"):
+                with lock:
+                    state["ollama_requests"] += 1
+                if self.path == "/api/chat":
+                    if body.get("stream"):
+                        chunks = [{"message": {"role": "assistant", "content": word}, "done": False}
+                                  for word in _words(reply)]
+                        chunks.append({"message": {"role": "assistant", "content": ""}, "done": True})
+                        return self._stream(json.dumps(chunk) for chunk in chunks)
+                    return self._send(200, {"model": body.get("model"), "done": True,
+                                            "message": {"role": "assistant", "content": reply}})
+                return self._send(200, {"model": body.get("model"), "done": True, "response": reply})
+
+            with lock:
+                state["hf_requests"] += 1
+                loading = state["hf_requests"] <= loading_requests
+            if loading:
+                return self._send(503, {"error": "Model is currently loading", "estimated_time": estimated_time})
+            if body.get("stream"):
+                return self._stream(
+                    "data:" + json.dumps({"token": {"text": word, "special": False}, "generated_text": None})
+                    for word in _words(reply)
+                )
+            return self._send(200, [{"generated_text": prompt + "\n" + reply}])
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, lines):
+            """Write one line per token, pausing ``token_latency_s`` between them; stops if the client hangs up."""
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                for line in lines:
+                    if token_latency_s:
+                        time.sleep(token_latency_s)
+                    self.wfile.write(line.encode("utf-8") + b"\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                with lock:
+                    state["cancelled_streams"] += 1
+
+        def log_message(self, format, *args):
+            pass
+
+    StubHandler.state = state
+    return StubHandler
+
+
+def serve_stub(port=0, **options):
+    """Start the stub in a background thread; returns ``(server, base_url)``."""
+    handler = make_handler(**options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.state = handler.state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Ollama and Hugging Face APIs.")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--loading", type=int, default=0, help="Answer the first N HF requests with a loading 503.")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds between streamed tokens.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many seconds added to --latency.")
+    parser.add_argument("--replay", help="Answer recorded prompts from this JSONL file.")
+    parser.add_argument("--replay-latency", action="store_true", help="Wait the recorded time for replayed replies.")
+    parser.add_argument("--invalid-json-rate", type=float, default=0.0,
+                        help="Fraction of match-score replies sent malformed.")
+    args = parser.parse_args()
+
+    server, url = serve_stub(args.port, latency_s=args.latency, loading_requests=args.loading,
+                             error_rate=args.error_rate, token_latency_s=args.token_latency,
+                             latency_jitter_s=args.jitter, replies=load_replies(args.replay) if args.replay else None,
+                             replay_latency=args.replay_latency, invalid_json_rate=args.invalid_json_rate)
+    print(f"🟢 LLM stub at {url} (OLLAMA_HOST={url} HF_API_URL={url}/models)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
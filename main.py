@@ -1,28 +1,44 @@
 import streamlit as st
-import subprocess
 import os
+import sys
 
-# Set the title of the page
-st.title("Job Resume and Match AI")
-
-# Set a short description
-st.write("Welcome! Choose one of the options below:")
-
-# Create two buttons
-col1, col2 = st.columns(2)
-
-with col1:
-    if st.button("Resume Maker"):
-        # Path to the Resume Maker script
-        resume_maker_path = os.getenv("resume_maker_input")
-        
-        # Run the Resume Maker script using subprocess
-        subprocess.Popen(["streamlit", "run", resume_maker_path], shell=True)
-
-with col2:
-    if st.button("Job Matcher"):
-        # Path to the Job Matcher script
-        job_matcher_path = os.getenv("linkedin_auto_apply")
-        
-        # Run the Job Matcher script using subprocess
-        subprocess.Popen(["streamlit", "run", job_matcher_path], shell=True)
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Pages import their sibling modules by name; make both app folders importable
+# so every tool runs inside this one Streamlit process.
+for folder in ("resume_maker", "linkedin_auto_apply"):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+resume_maker_page = st.Page(os.path.join(ROOT, "resume_maker", "resume_maker_input.py"), title="Resume Maker")
+job_config_page = st.Page(os.path.join(ROOT, "linkedin_auto_apply", "linkedin_user_input.py"), title="Job Matcher Setup")
+job_matcher_page = st.Page(os.path.join(ROOT, "linkedin_auto_apply", "job_match.py"), title="Job Matcher")
+
+
+def home():
+    # Set the title of the page
+    st.title("Job Resume and Match AI")
+
+    # Set a short description
+    st.write("Welcome! Choose one of the options below:")
+
+    # Create two buttons
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if st.button("Resume Maker"):
+            st.switch_page(resume_maker_page)
+
+    with col2:
+        if st.button("Job Matcher"):
+            st.switch_page(job_config_page)
+
+
+pages = st.navigation([
+    st.Page(home, title="Home", default=True),
+    resume_maker_page,
+    job_config_page,
+    job_matcher_page,
+])
+pages.run()
@@ -0,0 +1,262 @@
+"""
+Resident CPU-only model for offline resume generation (``RESUME_BACKEND=local``).
+
+The model is loaded once per process by ``get_local_model()`` and stays in
+memory across Streamlit reruns and sessions. A single worker thread owns it
+and serves queued requests, grouping up to ``RESUME_LOCAL_MAX_BATCH``
+waiting requests into one padded ``generate`` call.
+
+``RESUME_LOCAL_MODEL`` is either a ``.gguf`` file (served with llama.cpp,
+already quantized) or a Hugging Face model id (served with transformers;
+its Linear layers are dynamically quantized to int8 unless
+``RESUME_LOCAL_INT8=0``).
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:  # memory reporting falls back to the peak RSS
+    psutil = None
+
+LOCAL_MODEL = os.getenv("RESUME_LOCAL_MODEL", "Qwen/Qwen2.5-0.5B-Instruct")
+LOCAL_THREADS = int(os.getenv("RESUME_LOCAL_THREADS", str(os.cpu_count() or 4)))
+LOCAL_CONTEXT = int(os.getenv("RESUME_LOCAL_CONTEXT", "4096"))
+LOCAL_INT8 = os.getenv("RESUME_LOCAL_INT8", "1") != "0"
+MAX_BATCH = int(os.getenv("RESUME_LOCAL_MAX_BATCH", "4"))
+# How long the worker waits for more requests to join a batch
+BATCH_WAIT_S = 0.05
+
+_END = object()
+
+
+class LocalModelError(Exception):
+    """The local model could not be loaded or failed while generating."""
+
+
+def process_memory_mb():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _Request:
+    def __init__(self, prompt, max_new_tokens, temperature, stream=False, cancel=None):
+        self.prompt = prompt
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.stream = stream
+        self.cancel = cancel or threading.Event()
+        self.chunks = queue.Queue()  # streamed text, then _END
+        self.text = ""
+        self.error = None
+        self.done = threading.Event()
+
+
+# --- Backends ---
+class LlamaCppBackend:
+    """A GGUF model through llama-cpp-python; one sequence at a time."""
+
+    batched = False
+
+    def __init__(self, model_path):
+        from llama_cpp import Llama
+
+        self.llm = Llama(model_path=model_path, n_ctx=LOCAL_CONTEXT, n_threads=LOCAL_THREADS, verbose=False)
+
+    def run(self, requests):
+        tokens = 0
+        for request in requests:
+            for chunk in self.llm(request.prompt, max_tokens=request.max_new_tokens,
+                                  temperature=request.temperature, stream=True):
+                if request.cancel.is_set():
+                    break
+                text = chunk["choices"][0]["text"]
+                tokens += 1
+                request.text += text
+                if request.stream:
+                    request.chunks.put(text)
+        return tokens
+
+
+class TransformersBackend:
+    """A Hugging Face causal LM on CPU, int8 by default, generating padded batches."""
+
+    batched = True
+
+    def __init__(self, model_id, int8=LOCAL_INT8):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        torch.set_num_threads(LOCAL_THREADS)
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+        self.tokenizer.padding_side = "left"  # new tokens line up at the end of every row
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        model = AutoModelForCausalLM.from_pretrained(model_id, torch_dtype=torch.float32)
+        if int8:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model.eval()
+
+    def _format(self, prompt):
+        if getattr(self.tokenizer, "chat_template", None):
+            return self.tokenizer.apply_chat_template(
+                [{"role": "user", "content": prompt}], tokenize=False, add_generation_prompt=True
+            )
+        return prompt
+
+    def run(self, requests):
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextStreamer
+
+        class AllCancelled(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return all(r.cancel.is_set() for r in requests)
+
+        class QueueStreamer(TextStreamer):
+            def on_finalized_text(self, text, stream_end=False):
+                if text:
+                    requests[0].chunks.put(text)
+
+        inputs = self.tokenizer([self._format(r.prompt) for r in requests], return_tensors="pt", padding=True)
+        temperature = requests[0].temperature
+        kwargs = {
+            "max_new_tokens": max(r.max_new_tokens for r in requests),
+            "do_sample": temperature > 0,
+            "pad_token_id": self.tokenizer.pad_token_id,
+            "stopping_criteria": StoppingCriteriaList([AllCancelled()]),
+        }
+        if temperature > 0:
+            kwargs["temperature"] = temperature
+        if requests[0].stream:  # streaming requests are always served alone
+            kwargs["streamer"] = QueueStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        with self.torch.inference_mode():
+            output = self.model.generate(**inputs, **kwargs)
+
+        new_tokens = output[:, inputs["input_ids"].shape[1]:]
+        for request, row in zip(requests, new_tokens):
+            request.text = self.tokenizer.decode(row, skip_special_tokens=True)
+        return int((new_tokens != self.tokenizer.pad_token_id).sum())
+
+
+# --- Resident model ---
+class LocalModel:
+    def __init__(self, model=LOCAL_MODEL, max_batch=MAX_BATCH):
+        start = time.perf_counter()
+        memory_before = process_memory_mb()
+        if model.endswith(".gguf"):
+            self.backend = LlamaCppBackend(model)
+        else:
+            self.backend = TransformersBackend(model)
+        self.model_name = model
+        self.max_batch = max_batch if self.backend.batched else 1
+        self.metrics = {
+            "load_seconds": round(time.perf_counter() - start, 2),
+            "model_memory_mb": round(process_memory_mb() - memory_before),
+            "requests": 0,
+            "batches": 0,
+            "tokens": 0,
+            "generation_seconds": 0.0,
+        }
+        logging.info(f"🧠 Loaded {model} in {self.metrics['load_seconds']}s")
+        self.pending = queue.Queue()
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _next_batch(self):
+        first = self.pending.get()
+        if first.stream or self.max_batch == 1:
+            return [first]
+        batch = [first]
+        deadline = time.monotonic() + BATCH_WAIT_S
+        while len(batch) < self.max_batch:
+            try:
+                request = self.pending.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if request.stream:
+                self.pending.put(request)  # served alone on a later turn
+                break
+            batch.append(request)
+        return batch
+
+    def _serve(self):
+        while True:
+            batch = []
+            for request in self._next_batch():
+                if request.cancel.is_set():
+                    request.chunks.put(_END)
+                    request.done.set()
+                else:
+                    batch.append(request)
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                tokens = self.backend.run(batch)
+            except Exception as e:
+                logging.error(f"❌ Local generation failed: {e}")
+                tokens = 0
+                for request in batch:
+                    request.error = LocalModelError(str(e))
+            seconds = time.perf_counter() - start
+            self.metrics["requests"] += len(batch)
+            self.metrics["batches"] += 1
+            self.metrics["tokens"] += tokens
+            self.metrics["generation_seconds"] += seconds
+            for request in batch:
+                request.chunks.put(_END)
+                request.done.set()
+
+    def generate(self, prompt, max_new_tokens=800, temperature=0.7):
+        request = _Request(prompt, max_new_tokens, temperature)
+        self.pending.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.text
+
+    def stream(self, prompt, max_new_tokens=800, temperature=0.7, cancel=None):
+        """Yields text as it is generated; closing the generator or setting ``cancel`` stops generation."""
+        request = _Request(prompt, max_new_tokens, temperature, stream=True, cancel=cancel)
+        self.pending.put(request)
+        try:
+            while True:
+                chunk = request.chunks.get()
+                if chunk is _END:
+                    break
+                yield chunk
+            if request.error is not None:
+                raise request.error
+        finally:
+            request.cancel.set()
+
+    def stats(self):
+        metrics = dict(self.metrics)
+        seconds = metrics["generation_seconds"]
+        metrics["generation_seconds"] = round(seconds, 2)
+        metrics["tokens_per_second"] = round(metrics["tokens"] / seconds, 1) if seconds else None
+        metrics["mean_batch_size"] = round(metrics["requests"] / metrics["batches"], 2) if metrics["batches"] else None
+        metrics["process_memory_mb"] = round(process_memory_mb())
+        metrics["model"] = self.model_name
+        return metrics
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_local_model():
+    """The process-wide resident model, loaded once on first use (even when several sessions ask at once)."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            try:
+                _model = LocalModel()
+            except Exception as e:
+                raise LocalModelError(f"could not load {LOCAL_MODEL}: {e}") from e
+        return _model
@@ -1,7 +1,25 @@
-import requests
+import copy
+import hashlib
+import json
 import os
+import sys
+import threading
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+
+# llm_gateway.py sits at the repository root, shared with linkedin_auto_apply.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from llm_gateway import get_gateway, GatewayError, HF_TOKEN, PROVIDER_LIMITS
+from local_llm import get_local_model, LocalModelError, LOCAL_MODEL, MAX_BATCH
+
+# "hf" (Hugging Face inference API, needs HF_TOKEN), "ollama" (local server)
+# or "local" (a model resident in this process, see local_llm.py)
+RESUME_BACKEND = os.getenv("RESUME_BACKEND", "hf")
+RESUME_OLLAMA_MODEL = os.getenv("RESUME_OLLAMA_MODEL", "mistral")
+GENERATION_CACHE_FILE = os.getenv("RESUME_CACHE_FILE", "resume_cache.jsonl")
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -10,10 +28,12 @@ class Resume:
     Class to generate ATS-friendly resume using Hugging Face model inference.
     """
 
-    def __init__(self, name, contact, education, skills, experience, projects, job, api_key=None):
+    def __init__(self, name, contact, education, skills, experience, projects, job, api_key=None,
+                 backend=RESUME_BACKEND):
         
-        self.api_key = os.getenv("TOKEN")
-        self.model = os.getenv("resume_model")
+        self.api_key = api_key or HF_TOKEN
+        self.backend = backend
+        self.model = {"hf": os.getenv("resume_model"), "ollama": RESUME_OLLAMA_MODEL}.get(backend, LOCAL_MODEL)
 
         self.name = name
         self.contact = contact
@@ -23,14 +43,23 @@ class Resume:
         self.projects = projects 
         self.job = job 
 
-        if not self.api_key:
-            raise ValueError("❌ API key is missing! Set it as an environment variable or pass it explicitly.")
+        # Filled in by stream(): seconds to the first token and to the end of the stream
+        self.first_token_s = None
+        self.total_s = None
+        self._prefix = None
 
-    def construct_prompt(self):
+        if backend == "hf" and not self.api_key:
+            raise ValueError("❌ API key is missing! Set HF_TOKEN in the environment or pass it explicitly.")
+
+    def prompt_prefix(self):
         """
-        Constructs a clean prompt for the LLM with job description and candidate details.
+        Instructions and candidate details: everything in the prompt that does
+        not depend on the job. It comes first so a batch of jobs for one
+        candidate shares a prefix the model server can reuse (Ollama's and
+        TGI's prefix/KV caches), and is only formatted once per candidate.
         """
-        return f"""
+        if self._prefix is None:
+            self._prefix = f"""
 You are an expert in writing ATS-friendly resumes.
 
 **Instructions:**
@@ -44,9 +73,6 @@ You are an expert in writing ATS-friendly resumes.
 - Keep it professional and clear.
  
 
-**Job Description:**
-{self.job}
-
 **Candidate Information:**
 - Name: {self.name}
 - Contact: {self.contact}
@@ -54,65 +80,168 @@ You are an expert in writing ATS-friendly resumes.
 - Skills: {self.skills}
 - Experience: {self.experience}
 - Projects: {self.projects}
+"""
+        return self._prefix
+
+    def construct_prompt(self):
+        """
+        Constructs a clean prompt for the LLM with candidate details and the job description.
+        """
+        return self.prompt_prefix() + f"""
+**Job Description:**
+{self.job}
 
 **Expected Output:**  
 Generate a professional, structured, and ATS-friendly resume that aligns with the job description.
 """
 
+    def for_job(self, job):
+        """The same candidate tailored to another job; shares the formatted prompt prefix."""
+        self.prompt_prefix()  # format once here, not once per copy
+        tailored = copy.copy(self)
+        tailored.job = job
+        tailored.first_token_s = tailored.total_s = None
+        return tailored
+
     def run(self):
         """
-        Sends a prompt to Hugging Face inference API and returns the generated resume.
+        Sends a prompt to the model in one request and returns the generated resume.
         """
-        url = f"https://api-inference.huggingface.co/models/{self.model}"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "inputs": self.construct_prompt(),
-            "parameters": {
-                "max_new_tokens": 800,
-                "temperature": 0.7  # Slightly lower for consistency
-            }
-        }
-
-        logging.info("📤 Sending request to Hugging Face API...")
+        logging.info(f"📤 Sending request to {self.backend}...")
 
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-
-            if response.status_code == 200:
-                response_json = response.json()
-
-                # Handle standard HF inference response format
-                if isinstance(response_json, list) and response_json:
-                    return response_json[0].get("generated_text", "⚠ No response generated.")
-                elif isinstance(response_json, dict) and "generated_text" in response_json:
-                    return response_json["generated_text"]
-                else:
-                    logging.warning("⚠ Unexpected format from Hugging Face API.")
-                    return str(response_json)
-
-            else:
-                logging.error(f"❌ API Error {response.status_code}: {response.text}")
-                return f"⚠ API Error {response.status_code}: {response.text}"
-
-        except requests.exceptions.Timeout:
-            logging.error("❌ API Request Timeout!")
-            return "⚠ The request timed out. Try again later."
-
-        except requests.exceptions.ConnectionError:
-            logging.error("❌ Network Error!")
-            return "⚠ Network error! Please check your internet connection."
-
-        except requests.exceptions.RequestException as e:
+            if self.backend == "local":
+                return get_local_model().generate(self.construct_prompt(), max_new_tokens=800, temperature=0.7)
+            if self.backend == "ollama":
+                return get_gateway().ollama_chat(self.model, self.construct_prompt())
+            return get_gateway().hf_generate(
+                self.model, self.construct_prompt(), max_new_tokens=800,
+                temperature=0.7,  # Slightly lower for consistency
+                api_key=self.api_key,
+            )
+        except GatewayError as e:
             logging.error(f"❌ Request Failed: {e}")
-            return f"⚠ Request failed: {e}"
-
+            if e.status is None:
+                return "⚠ Network error or timeout! Please check your internet connection and try again."
+            return f"⚠ API Error {e}"
+        except LocalModelError as e:
+            logging.error(f"❌ Local generation failed: {e}")
+            return f"⚠ Local model error: {e}"
+
+    def stream(self, cancel=None):
+        """
+        Yields the generated resume piece by piece as the model produces it.
+        Stops early when ``cancel`` (a ``threading.Event``) is set or the
+        generator is closed; raises ``GatewayError`` when the model cannot be
+        reached and ``LocalModelError`` when the local one fails.
+        """
+        gateway = get_gateway()
+        if self.backend == "local":
+            tokens = get_local_model().stream(self.construct_prompt(), max_new_tokens=800,
+                                              temperature=0.7, cancel=cancel)
+        elif self.backend == "ollama":
+            tokens = gateway.ollama_stream(self.model, self.construct_prompt(), cancel=cancel)
+        else:
+            tokens = gateway.hf_stream(self.model, self.construct_prompt(), max_new_tokens=800,
+                                       temperature=0.7, api_key=self.api_key, cancel=cancel)
+
+        logging.info(f"📤 Streaming resume from {self.backend}...")
+        start = time.perf_counter()
+        self.first_token_s = None
+        try:
+            for token in tokens:
+                if self.first_token_s is None:
+                    self.first_token_s = time.perf_counter() - start
+                    logging.info(f"⏱ First token after {self.first_token_s:.2f}s")
+                yield token
+        finally:
+            tokens.close()
+            self.total_s = time.perf_counter() - start
+            logging.info(f"⏱ Stream ended after {self.total_s:.2f}s")
 
 
+def extract_resume(text):
+    """The resume part of a generation (HF echoes the prompt back before it)."""
+    if "**Expected Output:**" in text:
+        _, text = text.split("**Expected Output:**", 1)
+    return text.strip()
 
 
+class GenerationCache:
+    """
+    Generated resumes keyed by (backend, model, prompt), kept in memory and
+    appended to a JSONL file so identical requests are never generated twice.
+    """
 
+    def __init__(self, path=GENERATION_CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    self.entries[entry["key"]] = entry["text"]
+
+    @staticmethod
+    def key(resume):
+        raw = f"{resume.backend}|{resume.model}|{resume.construct_prompt()}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, text):
+        with self.lock:
+            self.entries[key] = text
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"key": key, "text": text}) + "\n")
+
+
+def _generate_cached(resume, key, cache):
+    text = cache.get(key)
+    if text is not None:
+        return {"text": text, "seconds": 0.0, "cached": True}
+    start = time.perf_counter()
+    text = resume.run()
+    if not text.startswith("⚠"):
+        cache.put(key, text)
+    return {"text": text, "seconds": round(time.perf_counter() - start, 2), "cached": False}
+
+
+def tailor_resumes(resume, jobs, workers=None, cache=None):
+    """
+    One tailored resume per job description for the candidate in ``resume``
+    (its own ``job`` is ignored), generated concurrently. Duplicate jobs are
+    generated once and earlier generations come from ``cache``.
 
+    ``workers`` defaults to the gateway's concurrency cap for the backend
+    (the batch size for the local one);
+    raise HF_CONCURRENCY / OLLAMA_CONCURRENCY (and OLLAMA_NUM_PARALLEL on the
+    Ollama server) for a batch to finish in about one generation's time.
 
+    Returns ``{"job", "text", "seconds", "cached"}`` dicts in the order of ``jobs``.
+    """
+    workers = workers or (MAX_BATCH if resume.backend == "local" else PROVIDER_LIMITS[resume.backend][2])
+    cache = cache if cache is not None else GenerationCache()
+    futures = {}
+    ordered = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for job in jobs:
+            tailored = resume.for_job(job)
+            key = GenerationCache.key(tailored)
+            duplicate = key in futures
+            if not duplicate:
+                futures[key] = pool.submit(_generate_cached, tailored, key, cache)
+            ordered.append((job, futures[key], duplicate))
+        results = []
+        for job, future, duplicate in ordered:
+            result = {"job": job, **future.result()}
+            if duplicate:
+                result.update(seconds=0.0, cached=True)
+            results.append(result)
+        return results
@@ -0,0 +1,98 @@
+"""
+Tailor one candidate's resume to many jobs at once.
+
+    python resume_maker/resume_batch.py --profile profile.yaml \\
+        --jobs users/<you>/linkedin_scraped_jobs.csv --top 20 --output-dir tailored_resumes
+
+``profile.yaml`` holds the Resume fields (name, contact, education, skills,
+experience, projects). Jobs come from the matcher's CSV/JSONL output; the
+``--top`` postings by Match Score are tailored concurrently and written as
+Markdown, DOCX and/or PDF (``--formats md,docx,pdf``).
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+import yaml
+
+from resume import Resume, GenerationCache, tailor_resumes, extract_resume
+from resume_export import export_batch
+
+PROFILE_FIELDS = ("name", "contact", "education", "skills", "experience", "projects")
+
+
+def load_jobs(path, top=None):
+    """Postings with an About text, best Match Score first."""
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            jobs = [json.loads(line) for line in f if line.strip()]
+    else:
+        import pandas as pd
+
+        jobs = pd.read_csv(path).to_dict(orient="records")
+    jobs = [job for job in jobs if isinstance(job.get("About"), str) and job["About"].strip()]
+    jobs.sort(key=lambda job: job.get("Match Score") or 0, reverse=True)
+    return jobs[:top] if top else jobs
+
+
+def file_name(index, job):
+    title = re.sub(r"[^A-Za-z0-9]+", "_", str(job.get("Job Title") or "job")).strip("_")
+    return f"{index:02d}_{title[:60]}.md"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a tailored resume for each of the top-N matched jobs.")
+    parser.add_argument("--profile", required=True, help="YAML file with the candidate's resume fields.")
+    parser.add_argument("--jobs", required=True, help="Matcher output as CSV or JSONL.")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--workers", type=int, help="Concurrent generations (default: the backend's cap).")
+    parser.add_argument("--output-dir", default="tailored_resumes")
+    parser.add_argument("--formats", default="md", help="Comma-separated output formats: md, docx, pdf.")
+    parser.add_argument("--export-workers", type=int, default=4, help="Processes rendering DOCX/PDF.")
+    args = parser.parse_args()
+
+    with open(args.profile, "r") as f:
+        profile = yaml.safe_load(f)
+    resume = Resume(**{field: profile.get(field, "Not Provided") for field in PROFILE_FIELDS}, job="")
+    jobs = load_jobs(args.jobs, args.top)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    results = tailor_resumes(resume, [job["About"] for job in jobs], args.workers, GenerationCache())
+    wall = time.perf_counter() - start
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    to_export = {}
+    for index, (job, result) in enumerate(zip(jobs, results), 1):
+        if result["text"].startswith("⚠"):
+            print(f"❌ {job.get('Job Title')}: {result['text']}")
+            continue
+        path = os.path.join(args.output_dir, file_name(index, job))
+        to_export[path] = extract_resume(result["text"])
+        if "md" in formats:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(to_export[path])
+        print(f"{'♻️ ' if result['cached'] else '✅'} {result['seconds']:>6.1f}s  {path}")
+
+    generated = [r["seconds"] for r in results if not r["cached"]]
+    print(f"⏱ {len(results)} resumes in {wall:.1f}s wall time "
+          f"({len(generated)} generated, {sum(generated):.1f}s of generation, "
+          f"{len(results) - len(generated)} from cache)")
+
+    binary_formats = [fmt for fmt in formats if fmt in ("docx", "pdf")]
+    if binary_formats and to_export:
+        start = time.perf_counter()
+        for exported in export_batch(to_export, binary_formats, args.export_workers):
+            base = os.path.splitext(exported["name"])[0]
+            for fmt in binary_formats:
+                with open(f"{base}.{fmt}", "wb") as f:
+                    f.write(exported[fmt])
+            timings = ", ".join(f"{fmt} {exported[f'{fmt}_ms']} ms" for fmt in binary_formats)
+            print(f"📄 {os.path.basename(base)}: {timings}")
+        print(f"⏱ Exported {len(to_export)} resumes in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
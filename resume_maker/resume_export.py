@@ -0,0 +1,144 @@
+"""
+DOCX and PDF export of generated resumes, entirely in memory.
+
+Both formats are built from the same resume text (``### `` headings,
+``**bold**`` lines, ``- `` bullets) into bytes, so nothing touches the disk
+and concurrent exports cannot clobber each other. PDFs are rendered
+in-process with PyMuPDF instead of shelling out to wkhtmltopdf.
+"""
+import html
+import io
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+PDF_CSS = """
+body { font-family: sans-serif; font-size: 10.5pt; }
+h3 { font-size: 14pt; margin: 10px 0 4px 0; }
+h4 { font-size: 12pt; margin: 8px 0 2px 0; }
+p { margin: 0 0 4px 0; }
+ul { margin: 0 0 4px 0; }
+"""
+PAGE_MARGIN = 54  # points (0.75 in)
+
+
+def _blocks(content):
+    """Classify each line as (kind, text): heading, subheading, bullet, text or blank."""
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            yield "blank", ""
+        elif line.startswith("### "):
+            yield "heading", line.replace("### ", "").strip()
+        elif line.startswith("**") and line.endswith("**"):
+            yield "subheading", line.replace("**", "").strip()
+        elif line.startswith("- "):
+            yield "bullet", line[2:].strip()
+        else:
+            yield "text", line
+
+
+def build_docx(content):
+    """DOCX bytes of a resume; returns ``(data, lines_that_failed_to_format)``."""
+    from docx import Document
+    from docx.shared import Pt
+
+    doc = Document()
+    failed = []
+    for kind, text in _blocks(content):
+        try:
+            if kind == "blank":
+                doc.add_paragraph("")
+            elif kind == "bullet":
+                para = doc.add_paragraph(style="List Bullet")
+                para.add_run(text).font.size = Pt(10.5)
+            else:
+                run = doc.add_paragraph().add_run(text)
+                run.bold = kind in ("heading", "subheading")
+                run.font.size = Pt({"heading": 14, "subheading": 12}.get(kind, 10.5))
+        except Exception as e:
+            logging.error(f"⚠ Error formatting line: {text} -> {e}")
+            failed.append(text)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue(), failed
+
+
+def to_html(content):
+    parts, in_list = [], False
+    for kind, text in _blocks(content):
+        if kind == "bullet" and not in_list:
+            parts.append("<ul>")
+            in_list = True
+        elif kind != "bullet" and in_list:
+            parts.append("</ul>")
+            in_list = False
+        text = html.escape(text)
+        if kind == "heading":
+            parts.append(f"<h3>{text}</h3>")
+        elif kind == "subheading":
+            parts.append(f"<h4>{text}</h4>")
+        elif kind == "bullet":
+            parts.append(f"<li>{text}</li>")
+        elif kind == "text":
+            parts.append(f"<p>{text}</p>")
+    if in_list:
+        parts.append("</ul>")
+    return "<html><body>" + "\n".join(parts) + "</body></html>"
+
+
+def build_pdf(content):
+    """A4 PDF bytes of a resume, laid out by PyMuPDF's HTML story engine."""
+    import fitz
+
+    buffer = io.BytesIO()
+    writer = fitz.DocumentWriter(buffer)
+    story = fitz.Story(html=to_html(content), user_css=PDF_CSS)
+    mediabox = fitz.paper_rect("a4")
+    where = mediabox + (PAGE_MARGIN, PAGE_MARGIN, -PAGE_MARGIN, -PAGE_MARGIN)
+    more = True
+    while more:
+        device = writer.begin_page(mediabox)
+        more, _ = story.place(where)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+    return buffer.getvalue()
+
+
+def export_resume(content, formats=("docx", "pdf")):
+    """
+    Render one resume into the requested formats. Returns a dict with the
+    bytes per format, ``"<format>_ms"`` render times and ``"failed_lines"``.
+    """
+    result = {"failed_lines": []}
+    for fmt in formats:
+        start = time.perf_counter()
+        if fmt == "docx":
+            result["docx"], result["failed_lines"] = build_docx(content)
+        elif fmt == "pdf":
+            result["pdf"] = build_pdf(content)
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+        result[f"{fmt}_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def _export_named(item, formats):
+    name, content = item
+    return {"name": name, **export_resume(content, formats)}
+
+
+def export_batch(resumes, formats=("docx", "pdf"), workers=4):
+    """
+    Export many resumes (``{name: content}``) on a process pool; PyMuPDF is
+    not thread-safe, so each worker process renders on its own. Yields one
+    result per resume, in input order.
+    """
+    if workers <= 1 or len(resumes) <= 1:
+        for item in resumes.items():
+            yield _export_named(item, formats)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_export_named, resumes.items(), [formats] * len(resumes))
@@ -1,12 +1,8 @@
-import base64
 import streamlit as st
 import logging
-import os
-from resume import Resume
-from resume_maker_pdfmaker import DocxToPDF
-from docx import Document
-from docx.shared import Pt
-from docx.enum.style import WD_STYLE_TYPE
+from resume import Resume, GatewayError, LocalModelError, RESUME_BACKEND, extract_resume
+from local_llm import get_local_model
+from resume_export import export_resume
 # Configure logging
 logging.basicConfig(filename="resume_generator.log", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -14,18 +10,19 @@ st.set_page_config(page_title="Customizable Resume Maker", page_icon=":invoice:"
 st.title("Customizable ATS-Friendly Resume Generator")
 st.write("Fill in the details below to generate a fully customizable resume.")
 
+# The local model is loaded once per server process and shared by every session and rerun.
+if RESUME_BACKEND == "local":
+    try:
+        local_model = st.cache_resource(show_spinner="Loading the local resume model...")(get_local_model)()
+        with st.sidebar.expander("🧠 Local model"):
+            st.json(local_model.stats())
+    except LocalModelError as e:
+        st.sidebar.error(f"❌ {e}")
+
 def validate_input(inputs):
     """Validate only required fields"""
     return all(inputs)
 
-def generate_download_link(file_path):
-    """Generate a download link for the generated PDF or DOCX file."""
-    with open(file_path, "rb") as f:
-        file_bytes = f.read()
-    b64 = base64.b64encode(file_bytes).decode()
-    file_name = os.path.basename(file_path)
-    return f'<a href="data:application/octet-stream;base64,{b64}" download="{file_name}">Download {file_name}</a>'
-
 # Initialize session state for dynamic fields
 if "education_entries" not in st.session_state:
     st.session_state.education_entries = []
@@ -111,12 +108,24 @@ if submit_button:
             job=job_role
         )
 
-        st.info("📤 Sending request to AI model...")
-        api_response = resume.run()  # Call API
+        st.info("📤 Generating resume with the AI model...")
+        # Any click reruns the script, which interrupts the stream below and closes the request.
+        st.button("⏹ Stop generating", key="stop_generation")
 
-        # 🔹 Display API Response in Streamlit
+        # 🔹 Stream the model output into the page as it is generated
         st.subheader("🔍 API Response:")
-        st.text_area("Raw API Response", api_response, height=200)
+        tokens = resume.stream()
+        try:
+            api_response = st.write_stream(tokens)
+        except (GatewayError, LocalModelError) as e:
+            logging.error(f"❌ Resume generation failed: {e}")
+            api_response = f"⚠ {e}"
+        finally:
+            tokens.close()
+        if not isinstance(api_response, str) or not api_response.strip():
+            api_response = "⚠ No response generated."
+        if resume.first_token_s is not None:
+            st.caption(f"⏱ First token after {resume.first_token_s:.1f}s, complete after {resume.total_s:.1f}s")
 
         # Check if the response is valid
         if api_response.startswith("⚠"):
@@ -124,70 +133,34 @@ if submit_button:
         else:
             st.text_area("Generated Resume", api_response, height=300)
 
-            # 🔹 Save to DOCX with user name
-            # docx_path = f"{name}_resume.docx"
-            # doc = Document()
-            # doc.add_paragraph(api_response)
-            # doc.save(docx_path)
-
-            # st.success(f"✅ Resume generated successfully!")
-            # st.success(f"📄 {docx_path} is saved.")
-            # st.markdown(generate_download_link(docx_path), unsafe_allow_html=True)
-
-            # 🔹 Save to DOCX with user name
-            if "**Expected Output:**" in api_response:
-                _, extracted_resume = api_response.split("**Expected Output:**", 1)
-                extracted_resume = extracted_resume.strip()
-            else:
-                extracted_resume = api_response.strip()
+            # 🔹 Strip the echoed prompt
+            extracted_resume = extract_resume(api_response)
 
             st.write("📄 Extracted Resume Content:")
             st.code(extracted_resume)
 
-            # 📄 Format and Save DOCX
-            docx_path = os.path.join(os.getcwd(), f"{name}_resume.docx")
-            doc = Document()
-
-            def format_resume(doc, content):
-                lines = content.splitlines()
-                for line in lines:
-                    try:
-                        line = line.strip()
-                        if not line:
-                            doc.add_paragraph("")
-                            continue
-                        if line.startswith("### "):
-                            para = doc.add_paragraph(line.replace("### ", "").strip())
-                            run = para.runs[0]
-                            run.bold = True
-                            run.font.size = Pt(14)
-                        elif line.startswith("**") and line.endswith("**"):
-                            para = doc.add_paragraph(line.replace("**", "").strip())
-                            run = para.runs[0]
-                            run.bold = True
-                            run.font.size = Pt(12)
-                        elif line.startswith("- "):
-                            para = doc.add_paragraph(style="List Bullet")
-                            run = para.add_run(line[2:].strip())
-                            run.font.size = Pt(10.5)
-                        else:
-                            para = doc.add_paragraph(line)
-                            run = para.runs[0]
-                            run.font.size = Pt(10.5)
-                    except Exception as e:
-                        logging.error(f"⚠ Error formatting line: {line} -> {e}")
-                        st.warning(f"⚠ Error formatting line: {line}")
-
-            format_resume(doc, extracted_resume)
-
+            # 📄 Build DOCX and PDF in memory; the download buttons below serve the bytes
             try:
-                doc.save(docx_path)
-                st.success(f"✅ DOCX file saved: {docx_path}")
-                st.markdown(generate_download_link(docx_path), unsafe_allow_html=True)
+                export = export_resume(extracted_resume)
+                for line in export["failed_lines"]:
+                    st.warning(f"⚠ Error formatting line: {line}")
+                st.session_state.resume_export = {"name": name, **export}
             except Exception as e:
-                st.error(f"❌ Failed to save DOCX: {e}")
-            
-            
+                logging.error(f"❌ Resume export failed: {e}")
+                st.error(f"❌ Failed to build DOCX/PDF: {e}")
 
     else:
         st.warning("Please fill in all required fields.")
+
+# 🟢 Downloads, kept in the session so they survive the rerun a download click triggers
+if "resume_export" in st.session_state:
+    export = st.session_state.resume_export
+    st.caption(f"⏱ DOCX rendered in {export['docx_ms']} ms, PDF in {export['pdf_ms']} ms")
+    col_docx, col_pdf = st.columns(2)
+    col_docx.download_button(
+        "⬇️ Download DOCX", export["docx"], file_name=f"{export['name']}_resume.docx",
+        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    )
+    col_pdf.download_button(
+        "⬇️ Download PDF", export["pdf"], file_name=f"{export['name']}_resume.pdf", mime="application/pdf",
+    )